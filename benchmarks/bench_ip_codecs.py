@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compare the `socket`-based ip4/ip6 codecs against the former
+`netaddr`-based implementation on typical transport addresses.
+
+Usage: python -m benchmarks.bench_ip_codecs
+"""
+from __future__ import print_function
+import timeit
+
+import netaddr
+import six
+
+from multiaddr import Multiaddr
+from multiaddr import protocols
+from multiaddr.codecs import CODEC_CACHE
+from multiaddr.codecs import codec_by_name
+from multiaddr.codecs._util import packed_net_bytes_to_int
+
+
+ADDRS = [
+    u"/ip4/192.168.10.42/tcp/4001",
+    u"/ip6/2001:db8:85a3::8a2e:370:7334/udp/4001/quic",
+]
+
+
+class NetaddrIP4(object):
+    SIZE = 32
+    IS_PATH = False
+
+    @staticmethod
+    def to_bytes(proto, string):
+        return netaddr.IPAddress(string, version=4).packed
+
+    @staticmethod
+    def to_string(proto, buf):
+        return six.text_type(netaddr.IPAddress(packed_net_bytes_to_int(buf), version=4))
+
+
+class NetaddrIP6(object):
+    SIZE = 128
+    IS_PATH = False
+
+    @staticmethod
+    def to_bytes(proto, string):
+        return netaddr.IPAddress(string, version=6).packed
+
+    @staticmethod
+    def to_string(proto, buf):
+        return six.text_type(netaddr.IPAddress(packed_net_bytes_to_int(buf), version=6))
+
+
+def bench(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def use_codecs(ip4, ip6):
+    CODEC_CACHE["ip4"], CODEC_CACHE["ip6"] = ip4, ip6
+    # Start over with a registry whose dispatch entries pick up the swapped codecs
+    protocols.REGISTRY = protocols.ProtocolRegistry(protocols.REGISTRY.protocols)
+
+
+def run(number=20000):
+    current = (codec_by_name("ip4"), codec_by_name("ip6"))
+    results = []
+    try:
+        for addr in ADDRS:
+            binary = Multiaddr(addr).to_bytes()
+            timings = []
+            for codecs in ((NetaddrIP4, NetaddrIP6), current):
+                use_codecs(*codecs)
+                timings.append((
+                    bench(lambda: Multiaddr(addr), number),
+                    bench(lambda: str(Multiaddr(binary)), number),
+                ))
+            results.append((addr, timings))
+    finally:
+        use_codecs(*current)
+    return results
+
+
+def main():
+    print("{0:<52} {1:>22} {2:>22}".format("address", "parse µs (old/new)", "render µs (old/new)"))
+    for addr, ((old_parse, old_render), (new_parse, new_render)) in run():
+        print("{0:<52} {1:>7.2f} /{2:>6.2f} ({3:.1f}×) {4:>7.2f} /{5:>6.2f} ({6:.1f}×)".format(
+            addr,
+            old_parse, new_parse, old_parse / new_parse,
+            old_render, new_render, old_render / new_render,
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks of the public Multiaddr API over the address corpora.
+
+Each operation is measured on freshly constructed objects (“cold”), so
+results are not skewed by values cached on Multiaddr instances, unless the
+benchmark name says otherwise."""
+from __future__ import unicode_literals
+
+from multiaddr import Multiaddr
+from multiaddr import protocols
+
+from .corpus import ALL
+from .corpus import CORPORA
+from .corpus import PEER_B
+from .runner import benchmark
+
+
+BINARY = dict(
+    (name, [Multiaddr(addr).to_bytes() for addr in addrs]) for name, addrs in CORPORA.items()
+)
+ALL_BINARY = [Multiaddr(addr).to_bytes() for addr in ALL]
+
+
+def _register_parsing(name, addrs, binary):
+    @benchmark("parse_str[{0}]".format(name), addrs)
+    def parse_str():
+        for addr in addrs:
+            Multiaddr(addr)
+
+    @benchmark("parse_bytes[{0}]".format(name), binary)
+    def parse_bytes():
+        for addr in binary:
+            len(Multiaddr(addr))
+
+    @benchmark("render[{0}]".format(name), binary)
+    def render():
+        for addr in binary:
+            str(Multiaddr(addr))
+
+
+for _name in sorted(CORPORA):
+    _register_parsing(_name, CORPORA[_name], BINARY[_name])
+
+
+@benchmark("render_cached[all]", ALL_BINARY)
+def render_cached(_addrs=[Multiaddr(addr) for addr in ALL]):
+    for addr in _addrs:
+        str(addr)
+
+
+@benchmark("split[all]", ALL_BINARY)
+def split():
+    for addr in ALL_BINARY:
+        Multiaddr(addr).split()
+
+
+ENCAPSULATE = [
+    (Multiaddr(addr), Multiaddr("/p2p/" + PEER_B))
+    for addr in CORPORA["ip4"] + CORPORA["ip6"]
+]
+
+
+@benchmark("encapsulate[ip]", ENCAPSULATE)
+def encapsulate():
+    for addr, peer in ENCAPSULATE:
+        addr.encapsulate(peer)
+
+
+DECAPSULATE = [
+    (Multiaddr(addr), Multiaddr("/p2p-circuit")) for addr in CORPORA["circuit"]
+]
+
+
+@benchmark("decapsulate[circuit]", DECAPSULATE)
+def decapsulate():
+    for addr, inner in DECAPSULATE:
+        Multiaddr(addr.to_bytes()).decapsulate(inner)
+
+
+P2P_BINARY = BINARY["p2p"] + BINARY["circuit"]
+
+
+@benchmark("value_for_protocol[p2p]", P2P_BINARY)
+def value_for_protocol():
+    for addr in P2P_BINARY:
+        Multiaddr(addr).value_for_protocol(protocols.P_P2P)
+
+
+@benchmark("protocols[all]", ALL_BINARY)
+def protocols_():
+    for addr in ALL_BINARY:
+        Multiaddr(addr).protocols()[-1]
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Compare the built-in varint implementation against the `varint` package
+it replaced, for value sizes occurring in Multiaddrs.
+
+Usage: python -m benchmarks.bench_varint
+"""
+from __future__ import print_function
+import io
+import timeit
+
+import varint
+
+from multiaddr import _varint
+
+
+VALUES = [
+    ("length (34)", 34),         # p2p multihash
+    ("code (0x01A5)", 0x01A5),   # p2p
+    ("code (0x706C61)", 0x706C61),  # plaintextv2
+]
+
+
+def bench(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def run(number=100000):
+    results = []
+    for label, value in VALUES:
+        data = _varint.encode(value)
+        view = memoryview(data)
+        results.append((label, (
+            (bench(lambda: varint.encode(value), number),
+             bench(lambda: _varint.encode(value), number)),
+            (bench(lambda: varint.decode_stream(io.BytesIO(data)), number),
+             bench(lambda: _varint.decode(view, 0), number)),
+        )))
+    return results
+
+
+def main():
+    print("{0:<20} {1:>24} {2:>24}".format("value", "encode µs (old/new)", "decode µs (old/new)"))
+    for label, ((old_encode, new_encode), (old_decode, new_decode)) in run():
+        print("{0:<20} {1:>7.3f} /{2:>6.3f} ({3:>4.1f}×) {4:>7.3f} /{5:>6.3f} ({6:>4.1f}×)".format(
+            label,
+            old_encode, new_encode, old_encode / new_encode,
+            old_decode, new_decode, old_decode / new_decode,
+        ))
+
+
+if __name__ == "__main__":
+    main()
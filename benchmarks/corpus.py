@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Realistic address corpora used by the benchmarks."""
+from __future__ import unicode_literals
+
+
+PEER_A = "QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC"
+PEER_B = "QmbHVEEepCi7rn7VL7Exxpd2Ci9NNB6ifvqwhsrbRMgQFP"
+
+CORPORA = {
+    "ip4": [
+        "/ip4/192.168.1.10/tcp/4001",
+        "/ip4/10.0.0.5/udp/4001/quic",
+        "/ip4/127.0.0.1/tcp/8080/ws",
+        "/ip4/147.75.83.83/tcp/443/wss",
+    ],
+    "ip6": [
+        "/ip6/2001:db8:85a3::8a2e:370:7334/tcp/4001",
+        "/ip6/::1/udp/4001/quic",
+        "/ip6zone/eth0/ip6/fe80::1/tcp/4001",
+        "/ip6/2604:1380:0:c100::1/tcp/443/wss",
+    ],
+    "dns": [
+        "/dns4/bootstrap.libp2p.io/tcp/443/wss",
+        "/dns6/ipfs.example.com/tcp/4001",
+        "/dnsaddr/bootstrap.libp2p.io",
+        "/dns/node-7.cluster.example.org/udp/4001/quic",
+    ],
+    "p2p": [
+        "/ip4/147.75.83.83/tcp/4001/p2p/" + PEER_A,
+        "/ip6/2604:1380:0:c100::1/tcp/4001/p2p/" + PEER_B,
+        "/dnsaddr/bootstrap.libp2p.io/p2p/" + PEER_A,
+        "/p2p/" + PEER_B,
+    ],
+    "onion3": [
+        "/onion3/vww6ybal4bd7szmgncyruucpgfkqahzddi37ktceo3ah7ngmcopnpyyd:1234",
+        "/onion3/vww6ybal4bd7szmgncyruucpgfkqahzddi37ktceo3ah7ngmcopnpyyd:80/http",
+    ],
+    "unix": [
+        "/unix/var/run/ipfs/api.sock",
+        "/unix/tmp/p2p.sock",
+        "/ip4/127.0.0.1/tcp/5001/unix/run/user/1000/daemon.sock",
+    ],
+    "circuit": [
+        "/ip4/147.75.83.83/tcp/4001/p2p/" + PEER_A + "/p2p-circuit/p2p/" + PEER_B,
+        "/ip6/::1/udp/4001/quic/p2p/" + PEER_B + "/p2p-circuit",
+        "/dns4/relay.example.com/tcp/443/wss/p2p/" + PEER_A + "/p2p-circuit/p2p/" + PEER_B,
+    ],
+}
+
+ALL = [addr for addrs in CORPORA.values() for addr in addrs]
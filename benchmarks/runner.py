@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""Minimal benchmark runner with support for saved baselines.
+
+Benchmarks are plain functions registered through :func:`benchmark`; each
+call processes a whole corpus and the reported time is normalized to one
+address. Results can be saved as JSON and later compared against, in which
+case the runner exits with a non-zero status if any benchmark got slower than
+the allowed threshold.
+"""
+from __future__ import print_function
+import argparse
+import json
+import platform
+import sys
+import timeit
+
+
+BENCHMARKS = []
+
+
+def benchmark(name, corpus):
+    """Register the decorated function as benchmark `name`, processing
+    `len(corpus)` addresses per call."""
+    def decorator(func):
+        BENCHMARKS.append((name, func, len(corpus)))
+        return func
+    return decorator
+
+
+def measure(func, ops, min_time=0.2, repeat=5):
+    """Return the best observed time in seconds per operation."""
+    number = 1
+    while True:
+        elapsed = timeit.timeit(func, number=number)
+        if elapsed >= min_time / repeat:
+            break
+        number *= 2
+    best = min(timeit.repeat(func, number=number, repeat=repeat))
+    return best / (number * ops)
+
+
+def run(pattern=None, min_time=0.2):
+    results = {}
+    for name, func, ops in BENCHMARKS:
+        if pattern and pattern not in name:
+            continue
+        results[name] = measure(func, ops, min_time)
+        print("{0:<40} {1:>10.3f} µs".format(name, results[name] * 1e6))
+    return results
+
+
+def save(path, results):
+    with open(path, "w") as file:
+        json.dump({
+            "python": platform.python_implementation() + " " + platform.python_version(),
+            "results": results,
+        }, file, indent=2, sort_keys=True)
+
+
+def compare(path, results, threshold):
+    """Print the change of every benchmark relative to the baseline stored at
+    `path` and return the names of those that regressed by more than
+    `threshold` (a fraction)."""
+    with open(path) as file:
+        baseline = json.load(file)["results"]
+
+    regressions = []
+    print()
+    print("{0:<40} {1:>10} {2:>10} {3:>8}".format("benchmark", "baseline", "current", "change"))
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        change = results[name] / baseline[name] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print("{0:<40} {1:>8.3f}µs {2:>8.3f}µs {3:>+7.1%}{4}".format(
+            name, baseline[name] * 1e6, results[name] * 1e6, change, flag,
+        ))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("-k", dest="pattern", help="only run benchmarks containing this string")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="minimum total measuring time per benchmark in seconds")
+    parser.add_argument("--save", metavar="FILE", help="store the results as a baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="allowed slowdown relative to the baseline (default: 0.1)")
+    args = parser.parse_args(argv)
+
+    from . import bench_multiaddr  # NOQA: registers the benchmarks
+
+    results = run(args.pattern, args.min_time)
+    if args.save:
+        save(args.save, results)
+    if args.compare:
+        regressions = compare(args.compare, results, args.threshold)
+        if regressions:
+            print("\n{0} benchmark(s) regressed by more than {1:.0%}".format(
+                len(regressions), args.threshold,
+            ))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
+from . import _accel
+_accel.install()  # Must happen before any accelerated module is imported
+
 from .multiaddr import Multiaddr  # NOQA
+from .multiaddr import parse_many  # NOQA
 
 __author__ = 'Steven Buss'
 __email__ = 'steven.buss@gmail.com'
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Selection between the compiled accelerator modules and pure Python.
+
+Building with ``MULTIADDR_COMPILE=1`` compiles the hot modules listed in
+:data:`MODULES` with Cython from their unmodified Python source. The
+resulting extension modules sit next to the ``.py`` files and are preferred
+by the import system whenever they are present, so without them everything
+simply runs as pure Python.
+
+Setting the ``MULTIADDR_PURE_PYTHON`` environment variable (to any non-empty
+value) before importing :mod:`multiaddr` makes it ignore the extensions,
+which allows testing both backends from the same build.
+"""
+import os
+import sys
+
+
+#: Modules compiled by ``setup.py`` when building with ``MULTIADDR_COMPILE=1``
+MODULES = (
+    "multiaddr._varint",
+    "multiaddr.transforms",
+    "multiaddr.codecs.ip4",
+    "multiaddr.codecs.ip6",
+    "multiaddr.codecs.uint16be",
+)
+
+#: Whether compiled modules are used where available
+ENABLED = not os.environ.get("MULTIADDR_PURE_PYTHON")
+
+
+def is_compiled(module):
+    """Return whether the given module was loaded from an extension
+    module rather than from Python source."""
+    return not getattr(module, "__file__", "").endswith((".py", ".pyc"))
+
+
+class PurePythonFinder(object):
+    """Meta path finder loading the accelerated modules from their Python
+    source even if their compiled version is present."""
+
+    @staticmethod
+    def find_spec(fullname, path, target=None):
+        if fullname not in MODULES:
+            return None
+        import importlib.util
+
+        filename = fullname.rpartition(".")[2] + ".py"
+        for entry in path or ():
+            location = os.path.join(entry, filename)
+            if os.path.isfile(location):
+                return importlib.util.spec_from_file_location(fullname, location)
+        return None
+
+
+def install():
+    if not ENABLED and sys.version_info >= (3, 4) and PurePythonFinder not in sys.meta_path:
+        sys.meta_path.insert(0, PurePythonFinder)
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# Generated by tools/generate_protocol_table.py from the multicodec table,
+# do not edit manually.
+"""Built-in multiaddr protocols."""
+
+__all__ = (
+    'P_IP4',
+    'P_TCP',
+    'P_DCCP',
+    'P_IP6',
+    'P_IP6ZONE',
+    'P_IPCIDR',
+    'P_DNS',
+    'P_DNS4',
+    'P_DNS6',
+    'P_DNSADDR',
+    'P_SCTP',
+    'P_UDP',
+    'P_P2P_WEBRTC_STAR',
+    'P_P2P_WEBRTC_DIRECT',
+    'P_P2P_STARDUST',
+    'P_WEBRTC_DIRECT',
+    'P_WEBRTC',
+    'P_P2P_CIRCUIT',
+    'P_UDT',
+    'P_UTP',
+    'P_UNIX',
+    'P_P2P',
+    'P_HTTPS',
+    'P_ONION',
+    'P_ONION3',
+    'P_GARLIC64',
+    'P_GARLIC32',
+    'P_TLS',
+    'P_SNI',
+    'P_NOISE',
+    'P_QUIC',
+    'P_QUIC_V1',
+    'P_WEBTRANSPORT',
+    'P_CERTHASH',
+    'P_WS',
+    'P_WSS',
+    'P_P2P_WEBSOCKET_STAR',
+    'P_HTTP',
+    'P_PLAINTEXTV2',
+    'TABLE',
+)
+
+P_IP4 = 0x0004
+P_TCP = 0x0006
+P_DCCP = 0x0021
+P_IP6 = 0x0029
+P_IP6ZONE = 0x002A
+P_IPCIDR = 0x002B
+P_DNS = 0x0035
+P_DNS4 = 0x0036
+P_DNS6 = 0x0037
+P_DNSADDR = 0x0038
+P_SCTP = 0x0084
+P_UDP = 0x0111
+P_P2P_WEBRTC_STAR = 0x0113
+P_P2P_WEBRTC_DIRECT = 0x0114
+P_P2P_STARDUST = 0x0115
+P_WEBRTC_DIRECT = 0x0118
+P_WEBRTC = 0x0119
+P_P2P_CIRCUIT = 0x0122
+P_UDT = 0x012D
+P_UTP = 0x012E
+P_UNIX = 0x0190
+P_P2P = 0x01A5
+P_HTTPS = 0x01BB
+P_ONION = 0x01BC
+P_ONION3 = 0x01BD
+P_GARLIC64 = 0x01BE
+P_GARLIC32 = 0x01BF
+P_TLS = 0x01C0
+P_SNI = 0x01C1
+P_NOISE = 0x01C6
+P_QUIC = 0x01CC
+P_QUIC_V1 = 0x01CD
+P_WEBTRANSPORT = 0x01D1
+P_CERTHASH = 0x01D2
+P_WS = 0x01DD
+P_WSS = 0x01DE
+P_P2P_WEBSOCKET_STAR = 0x01DF
+P_HTTP = 0x01E0
+P_PLAINTEXTV2 = 0x706C61
+
+#: ``(code, name, codec, vcode)`` of each protocol, ordered by code
+TABLE = (
+    (P_IP4, 'ip4', 'ip4', b'\x04'),
+    (P_TCP, 'tcp', 'uint16be', b'\x06'),
+    (P_DCCP, 'dccp', 'uint16be', b'!'),
+    (P_IP6, 'ip6', 'ip6', b')'),
+    (P_IP6ZONE, 'ip6zone', 'utf8', b'*'),
+    (P_IPCIDR, 'ipcidr', 'uint8', b'+'),
+    (P_DNS, 'dns', 'idna', b'5'),
+    (P_DNS4, 'dns4', 'idna', b'6'),
+    (P_DNS6, 'dns6', 'idna', b'7'),
+    (P_DNSADDR, 'dnsaddr', 'idna', b'8'),
+    (P_SCTP, 'sctp', 'uint16be', b'\x84\x01'),
+    (P_UDP, 'udp', 'uint16be', b'\x91\x02'),
+    (P_P2P_WEBRTC_STAR, 'p2p-webrtc-star', None, b'\x93\x02'),
+    (P_P2P_WEBRTC_DIRECT, 'p2p-webrtc-direct', None, b'\x94\x02'),
+    (P_P2P_STARDUST, 'p2p-stardust', None, b'\x95\x02'),
+    (P_WEBRTC_DIRECT, 'webrtc-direct', None, b'\x98\x02'),
+    (P_WEBRTC, 'webrtc', None, b'\x99\x02'),
+    (P_P2P_CIRCUIT, 'p2p-circuit', None, b'\xa2\x02'),
+    (P_UDT, 'udt', None, b'\xad\x02'),
+    (P_UTP, 'utp', None, b'\xae\x02'),
+    (P_UNIX, 'unix', 'fspath', b'\x90\x03'),
+    (P_P2P, 'p2p', 'p2p', b'\xa5\x03'),
+    (P_HTTPS, 'https', None, b'\xbb\x03'),
+    (P_ONION, 'onion', 'onion', b'\xbc\x03'),
+    (P_ONION3, 'onion3', 'onion3', b'\xbd\x03'),
+    (P_GARLIC64, 'garlic64', 'garlic64', b'\xbe\x03'),
+    (P_GARLIC32, 'garlic32', 'garlic32', b'\xbf\x03'),
+    (P_TLS, 'tls', None, b'\xc0\x03'),
+    (P_SNI, 'sni', 'idna', b'\xc1\x03'),
+    (P_NOISE, 'noise', None, b'\xc6\x03'),
+    (P_QUIC, 'quic', None, b'\xcc\x03'),
+    (P_QUIC_V1, 'quic-v1', None, b'\xcd\x03'),
+    (P_WEBTRANSPORT, 'webtransport', None, b'\xd1\x03'),
+    (P_CERTHASH, 'certhash', 'certhash', b'\xd2\x03'),
+    (P_WS, 'ws', None, b'\xdd\x03'),
+    (P_WSS, 'wss', None, b'\xde\x03'),
+    (P_P2P_WEBSOCKET_STAR, 'p2p-websocket-star', None, b'\xdf\x03'),
+    (P_HTTP, 'http', None, b'\xe0\x03'),
+    (P_PLAINTEXTV2, 'plaintextv2', None, b'\xe1\xd8\xc1\x03'),
+)
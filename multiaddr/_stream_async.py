@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Asynchronous stream functions of :mod:`multiaddr.stream` (Python 3.5+)."""
+from . import exceptions
+from . import stream
+
+
+class read_stream_async(object):
+    """Asynchronously iterate over the Multiaddrs (or component tuples) read
+    from the given :class:`asyncio.StreamReader` (or any object with a
+    coroutine ``read(n)`` method) until it is exhausted::
+
+        >>> async for addr in read_stream_async(reader):
+        ...     print(addr)
+
+    Raises :class:`~multiaddr.exceptions.BinaryParseError` under the same
+    conditions as :func:`~multiaddr.stream.read_stream`."""
+
+    __slots__ = ("_read", "_decoder", "_chunk_size", "_items", "_error", "_done")
+
+    def __init__(self, reader, components=False, chunk_size=stream.CHUNK_SIZE,
+                 max_size=stream.MAX_FRAME_SIZE):
+        self._read = reader.read
+        self._decoder = stream.FrameDecoder(components, max_size)
+        self._chunk_size = chunk_size
+        self._items = []
+        self._error = None
+        self._done = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._items:
+            if self._error is not None:
+                error, self._error = self._error, None
+                raise error
+            if self._done:
+                raise StopAsyncIteration
+            chunk = await self._read(self._chunk_size)
+            if chunk:
+                try:
+                    self._items = self._decoder.feed(chunk)
+                except exceptions.BinaryParseError as exc:
+                    # Still hand out the items preceding the invalid frame
+                    self._items = self._decoder._take_ready()
+                    self._error = exc
+                self._items.reverse()
+            else:
+                self._done = True
+                self._decoder.close()
+        return self._items.pop()
+
+
+async def write_stream_async(writer, addrs, chunk_size=stream.CHUNK_SIZE):
+    """Write the given Multiaddrs to the :class:`asyncio.StreamWriter`
+    `writer` and return the number of bytes written.
+
+    The frames are handed to the writer in chunks of about `chunk_size`
+    bytes, waiting for its buffer to drain after each chunk rather than
+    after each address."""
+    written = 0
+    pending = []
+    pending_size = 0
+    for addr in addrs:
+        frame = stream.encode_frame(addr)
+        pending.append(frame)
+        pending_size += len(frame)
+        if pending_size >= chunk_size:
+            writer.write(b"".join(pending))
+            await writer.drain()
+            written += pending_size
+            pending = []
+            pending_size = 0
+    if pending:
+        writer.write(b"".join(pending))
+        await writer.drain()
+        written += pending_size
+    return written
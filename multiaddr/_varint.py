@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Unsigned varints (LEB128) as specified by multiformats.
+
+Values are limited to 63 bits (at most 9 bytes) and must be minimally
+encoded, see https://github.com/multiformats/unsigned-varint.
+"""
+import six
+
+
+#: Largest value that may be encoded
+MAX_VALUE = 2 ** 63 - 1
+
+#: Maximum number of bytes of an encoded value
+MAX_LENGTH = 9
+
+# Encodings of all single-byte values
+_SMALL = tuple(six.int2byte(value) for value in range(0x80))
+
+
+def encode(value):
+    """Return the varint encoding of the given non-negative integer.
+
+    Raises :class:`ValueError` for negative values and values larger than
+    :data:`MAX_VALUE`."""
+    if 0 <= value < 0x80:
+        return _SMALL[value]
+    if value < 0:
+        raise ValueError("Varints cannot encode negative values")
+    if value > MAX_VALUE:
+        raise ValueError("Varint value {0} exceeds 63 bits".format(value))
+    buf = bytearray()
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+    return bytes(buf)
+
+
+def decode(buf, pos=0):
+    """Decode the varint starting at `pos` of the given buffer and return it
+    together with the position of the next byte.
+
+    `buf` must yield integers when indexed (``bytes`` on Python 3,
+    ``bytearray`` or ``memoryview``). Raises :class:`IndexError` if the
+    varint is truncated, and :class:`ValueError` if it is not minimally
+    encoded or longer than :data:`MAX_LENGTH` bytes."""
+    byte = buf[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+
+    value = byte & 0x7F
+    shift = 7
+    end = pos + MAX_LENGTH
+    pos += 1
+    while True:
+        byte = buf[pos]  # May raise `IndexError` for truncated varints
+        pos += 1
+        if byte < 0x80:
+            if byte == 0:
+                raise ValueError("Varint is not minimally encoded")
+            return value | (byte << shift), pos
+        if pos >= end:
+            raise ValueError("Varint exceeds {0} bytes".format(MAX_LENGTH))
+        value |= (byte & 0x7F) << shift
+        shift += 7
+
+
+def decode_stream(stream):
+    """Decode the varint at the current position of the given binary stream,
+    consuming exactly its bytes.
+
+    Raises :class:`EOFError` if the stream ends before the varint does and
+    :class:`ValueError` like :func:`decode`."""
+    buf = bytearray()
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            raise EOFError("Truncated varint")
+        buf += byte
+        if buf[-1] < 0x80 or len(buf) >= MAX_LENGTH:
+            return decode(buf)[0]
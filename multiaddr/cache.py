@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import collections
+import threading
+
+
+CacheInfo = collections.namedtuple(
+    "CacheInfo", ("hits", "misses", "evictions", "size", "capacity")
+)
+
+
+class LRUCache(object):
+    """Size-bounded, thread-safe least-recently-used mapping.
+
+    Keeps track of hits, misses and evictions so that the effectiveness of
+    the cache can be inspected through :meth:`info`."""
+
+    __slots__ = ("_capacity", "_data", "_lock", "hits", "misses", "evictions")
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("LRU cache capacity must be at least 1")
+
+        self._capacity = capacity
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @capacity.setter
+    def capacity(self, capacity):
+        if capacity < 1:
+            raise ValueError("LRU cache capacity must be at least 1")
+        with self._lock:
+            self._capacity = capacity
+            self._evict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        """Return the value stored for `key` (marking it as most recently
+        used) or `default` if there is none."""
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store `value` for `key`, evicting the least recently used entries
+        if the cache grows beyond its capacity."""
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            self._evict()
+
+    def clear(self):
+        """Drop all entries and reset the statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.evictions, len(self._data), self._capacity)
+
+    def _evict(self):
+        while len(self._data) > self._capacity:
+            self._data.popitem(last=False)
+            self.evictions += 1
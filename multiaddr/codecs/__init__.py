@@ -1,4 +1,21 @@
 # -*- encoding: utf-8 -*-
+"""Codecs converting protocol values between their text and binary form.
+
+A codec is any object (usually a module) providing:
+
+* ``SIZE``: the size of its values in bits, ``0`` for protocols without a
+  value or :data:`LENGTH_PREFIXED_VAR_SIZE` for varint-prefixed ones,
+* ``IS_PATH``: whether its value consumes the remainder of the address,
+* ``to_bytes(proto, string)`` and ``to_string(proto, buf)``.
+
+Besides the built-in codecs of this package, codecs are looked up among the
+``multiaddr.codecs`` entry points of installed distributions (by entry
+point name) and those passed to :func:`register_codec`. Wrapping a codec in
+a :class:`LazyCodec` declares its metadata upfront, so that its
+implementation is only imported once a value actually needs to be
+converted – binary addresses are split into their components using the
+declared sizes alone.
+"""
 from __future__ import absolute_import
 import importlib
 
@@ -6,19 +23,129 @@ import importlib
 # These are special sizes
 LENGTH_PREFIXED_VAR_SIZE = -1
 
+#: Entry point group searched for codecs not built into this package
+ENTRY_POINT_GROUP = "multiaddr.codecs"
+
 
 class NoneCodec:
     SIZE = 0
     IS_PATH = False
 
 
+class LazyCodec(object):
+    """Codec with declared metadata whose implementation, given as the name
+    of a module or as a callable returning the codec, is only loaded on the
+    first conversion."""
+
+    def __init__(self, target, size, is_path=False):
+        self.SIZE = size
+        self.IS_PATH = is_path
+        self._target = target
+        self._codec = None
+
+    @property
+    def loaded(self):
+        return self._codec is not None
+
+    def load(self):
+        """Import the implementation (if not done yet) and return it."""
+        codec = self._codec
+        if codec is None:
+            target = self._target
+            if callable(target):
+                codec = target()
+            else:
+                codec = importlib.import_module(target)
+            # Shadow the forwarding methods below for subsequent calls
+            self.to_bytes = codec.to_bytes
+            self.to_string = codec.to_string
+            self._codec = codec
+        return codec
+
+    def to_bytes(self, proto, string):
+        return self.load().to_bytes(proto, string)
+
+    def to_string(self, proto, buf):
+        return self.load().to_string(proto, buf)
+
+    def __repr__(self):
+        return "<LazyCodec {0!r} (SIZE={1!r}, IS_PATH={2!r})>".format(
+            self._target, self.SIZE, self.IS_PATH,
+        )
+
+
+#: Declared ``(SIZE, IS_PATH)`` of the codecs of this package
+BUILTIN_CODECS = {
+    "certhash": (LENGTH_PREFIXED_VAR_SIZE, False),
+    "fspath": (LENGTH_PREFIXED_VAR_SIZE, True),
+    "garlic32": (LENGTH_PREFIXED_VAR_SIZE, False),
+    "garlic64": (LENGTH_PREFIXED_VAR_SIZE, False),
+    "idna": (LENGTH_PREFIXED_VAR_SIZE, False),
+    "ip4": (32, False),
+    "ip6": (128, False),
+    "onion": (96, False),
+    "onion3": (296, False),
+    "p2p": (LENGTH_PREFIXED_VAR_SIZE, False),
+    "uint16be": (16, False),
+    "uint8": (8, False),
+    "utf8": (LENGTH_PREFIXED_VAR_SIZE, False),
+}
+
+
 CODEC_CACHE = {}
 
+# Entry points of `ENTRY_POINT_GROUP` by name, collected on first use
+_entry_points = None
+
+
+def _iter_entry_points():
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # pragma: no cover (Python < 3.8)
+        try:
+            import pkg_resources
+        except ImportError:
+            return ()
+        return pkg_resources.iter_entry_points(ENTRY_POINT_GROUP)
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        return eps.select(group=ENTRY_POINT_GROUP)
+    return eps.get(ENTRY_POINT_GROUP, ())  # pragma: no cover (Python < 3.10)
+
+
+def _codec_from_entry_point(name):
+    global _entry_points
+    if _entry_points is None:
+        # First come, first served for names provided by several distributions
+        found = {}
+        for ep in _iter_entry_points():
+            found.setdefault(ep.name, ep)
+        _entry_points = found
+    ep = _entry_points.get(name)
+    if ep is None:
+        raise ImportError("No codec named {0!r}".format(name))
+    return ep.load()
+
+
+def register_codec(name, codec):
+    """Make the given codec available under `name`, which must not have
+    been used before.
+
+    Raises :class:`ValueError` if a codec named `name` was already
+    registered or loaded."""
+    if name in CODEC_CACHE or name in BUILTIN_CODECS:
+        raise ValueError("Codec {0!r} already exists".format(name))
+    CODEC_CACHE[name] = codec
+
 
 def codec_by_name(name):
     if name is None:  # Special “do nothing – expect nothing” pseudo-codec
         return NoneCodec
     codec = CODEC_CACHE.get(name)
     if not codec:
-        codec = CODEC_CACHE[name] = importlib.import_module(".{0}".format(name), __name__)
+        if name in BUILTIN_CODECS:
+            codec = LazyCodec("{0}.{1}".format(__name__, name), *BUILTIN_CODECS[name])
+        else:
+            codec = _codec_from_entry_point(name)
+        codec = CODEC_CACHE.setdefault(name, codec)
     return codec
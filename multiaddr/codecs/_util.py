@@ -1,3 +1,6 @@
+import importlib
+
+
 if hasattr(int, 'from_bytes'):
     def packed_net_bytes_to_int(b):
         """Convert the given big-endian byte-string to an int."""
@@ -6,3 +9,24 @@ else:  # pragma: no cover (PY2)
     def packed_net_bytes_to_int(b):
         """Convert the given big-endian byte-string to an int."""
         return int(b.encode('hex'), 16)
+
+
+class LazyModule(object):
+    """Stand-in for a module that is only imported once one of its attributes
+    is first accessed, so that codecs only pay for importing their (often
+    heavy) dependencies when a value actually needs to be converted."""
+
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return "<LazyModule {0!r}>".format(self._name)
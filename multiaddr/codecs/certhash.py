@@ -0,0 +1,71 @@
+from __future__ import absolute_import
+import base64
+import binascii
+
+import six
+
+from . import LENGTH_PREFIXED_VAR_SIZE
+from .. import _varint
+from ._util import LazyModule
+
+
+base58 = LazyModule("base58")
+
+
+SIZE = LENGTH_PREFIXED_VAR_SIZE
+IS_PATH = False
+
+
+def _b64decode(string, altchars=None):
+    return base64.b64decode(string + b"=" * (-len(string) % 4), altchars)
+
+
+def _b32decode(string):
+    return base64.b32decode(string.upper() + b"=" * (-len(string) % 8))
+
+
+# Decoders of the supported multibase encodings, by prefix character
+MULTIBASE_DECODERS = {
+    b"u": lambda string: _b64decode(string, b"-_"),  # base64url
+    b"U": lambda string: _b64decode(string, b"-_"),  # base64urlpad
+    b"m": _b64decode,                                 # base64
+    b"M": _b64decode,                                 # base64pad
+    b"b": _b32decode,                                 # base32
+    b"B": _b32decode,                                 # base32upper
+    b"f": lambda string: base64.b16decode(string.upper()),  # base16
+    b"F": base64.b16decode,                           # base16upper
+    b"z": lambda string: base58.b58decode(string),    # base58btc
+}
+
+
+def _check_multihash(buf):
+    view = bytearray(buf)
+    try:
+        _, pos = _varint.decode(view)  # Hash function code
+        length, pos = _varint.decode(view, pos)
+    except IndexError as exc:
+        six.raise_from(ValueError("Truncated multihash"), exc)
+    if len(view) - pos != length:
+        raise ValueError("Multihash digest length does not match its length prefix")
+
+
+def to_bytes(proto, string):
+    if isinstance(string, six.text_type):
+        string = string.encode("ascii")
+    decoder = MULTIBASE_DECODERS.get(string[:1])
+    if decoder is None:
+        raise ValueError("Unsupported multibase encoding {0!r}".format(string[:1]))
+    try:
+        mh = decoder(string[1:])
+    except (binascii.Error, TypeError, ValueError) as exc:
+        six.raise_from(ValueError("Cannot decode {0!r} as multibase: {1}".format(string, exc)),
+                       exc)
+    _check_multihash(mh)
+    return mh
+
+
+def to_string(proto, buf):
+    buf = bytes(buf)
+    _check_multihash(buf)
+    # Canonical form: multibase base64url without padding
+    return u"u" + base64.urlsafe_b64encode(buf).decode("ascii").rstrip(u"=")
@@ -32,4 +32,4 @@ def to_bytes(proto, string):
 
 
 def to_string(proto, buf):
-    return fsdecode(buf)
+    return fsdecode(bytes(buf))
@@ -0,0 +1,33 @@
+from __future__ import absolute_import
+import base64
+
+import six
+
+from . import LENGTH_PREFIXED_VAR_SIZE
+
+
+SIZE = LENGTH_PREFIXED_VAR_SIZE
+IS_PATH = False
+
+
+def _check_length(buf):
+    # Either a plain 32-byte hash of the destination or an encrypted
+    # leaseset address of at least 35 bytes
+    if len(buf) < 35 and len(buf) != 32:
+        raise ValueError("Invalid garlic32 address length (must be 32 or at least 35 bytes)")
+
+
+def to_bytes(proto, string):
+    # Addresses are base32 encoded without the trailing padding
+    padding = u"=" * (-len(string) % 8)
+    try:
+        garlic_host_bytes = base64.b32decode(string.upper() + padding)
+    except Exception as exc:
+        six.raise_from(ValueError("Cannot decode {0!r} as base32: {1}".format(string, exc)), exc)
+    _check_length(garlic_host_bytes)
+    return garlic_host_bytes
+
+
+def to_string(proto, buf):
+    _check_length(buf)
+    return base64.b32encode(bytes(buf)).decode('ascii').rstrip(u'=').lower()
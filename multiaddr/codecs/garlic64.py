@@ -0,0 +1,39 @@
+from __future__ import absolute_import
+import base64
+import binascii
+
+import six
+
+from . import LENGTH_PREFIXED_VAR_SIZE
+
+
+SIZE = LENGTH_PREFIXED_VAR_SIZE
+IS_PATH = False
+
+# I2P uses base64 with a different alphabet for the last two characters
+ALTCHARS = b"-~"
+
+# Minimum size of a (full) I2P destination
+MIN_LENGTH = 386
+
+
+def to_bytes(proto, string):
+    if six.PY2 and isinstance(string, unicode):  # pragma: no cover (PY2)  # noqa: F821
+        string = string.encode("ascii")
+    try:
+        garlic_host_bytes = base64.b64decode(string, ALTCHARS, validate=True) \
+            if six.PY3 else base64.b64decode(string, ALTCHARS)
+    except (binascii.Error, TypeError, ValueError) as exc:
+        six.raise_from(ValueError("Cannot decode {0!r} as I2P base64: {1}".format(string, exc)),
+                       exc)
+    if len(garlic_host_bytes) < MIN_LENGTH:
+        raise ValueError("Invalid garlic64 address length (must be at least {0} bytes)"
+                         .format(MIN_LENGTH))
+    return garlic_host_bytes
+
+
+def to_string(proto, buf):
+    if len(buf) < MIN_LENGTH:
+        raise ValueError("Invalid garlic64 address length (must be at least {0} bytes)"
+                         .format(MIN_LENGTH))
+    return base64.b64encode(bytes(buf), ALTCHARS).decode('ascii')
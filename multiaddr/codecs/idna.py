@@ -1,8 +1,10 @@
 from __future__ import absolute_import
 
-import idna
-
 from . import LENGTH_PREFIXED_VAR_SIZE
+from ._util import LazyModule
+
+
+idna = LazyModule("idna")
 
 
 SIZE = LENGTH_PREFIXED_VAR_SIZE
@@ -14,4 +16,4 @@ def to_bytes(proto, string):
 
 
 def to_string(proto, buf):
-    return idna.decode(buf)
+    return idna.decode(bytes(buf))
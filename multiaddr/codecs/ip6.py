@@ -1,19 +1,27 @@
 from __future__ import absolute_import
+import socket
 
-import netaddr
 import six
 
-from ._util import packed_net_bytes_to_int
-
 
 SIZE = 128
 IS_PATH = False
 
 
-def to_bytes(proto, string):
-    return netaddr.IPAddress(string, version=6).packed
+if hasattr(socket, "inet_pton"):
+    def to_bytes(proto, string):
+        return socket.inet_pton(socket.AF_INET6, string)
+
+    def to_string(proto, buf):
+        return six.text_type(socket.inet_ntop(socket.AF_INET6, buf))
+else:  # pragma: no cover (PY2 on Windows)
+    import netaddr
+
+    from ._util import packed_net_bytes_to_int
 
+    def to_bytes(proto, string):
+        return netaddr.IPAddress(string, version=6).packed
 
-def to_string(proto, buf):
-    ip_addr = netaddr.IPAddress(packed_net_bytes_to_int(buf), version=6)
-    return six.text_type(ip_addr)
+    def to_string(proto, buf):
+        ip_addr = netaddr.IPAddress(packed_net_bytes_to_int(buf), version=6)
+        return six.text_type(ip_addr)
@@ -1,9 +1,12 @@
 from __future__ import absolute_import
 
-import base58
 import six
 
 from . import LENGTH_PREFIXED_VAR_SIZE
+from ._util import LazyModule
+
+
+base58 = LazyModule("base58")
 
 
 SIZE = LENGTH_PREFIXED_VAR_SIZE
@@ -21,4 +24,4 @@ def to_bytes(proto, string):
 
 
 def to_string(proto, buf):
-    return base58.b58encode(buf).decode('ascii')
+    return base58.b58encode(bytes(buf)).decode('ascii')
@@ -0,0 +1,23 @@
+from __future__ import absolute_import
+import struct
+
+import six
+
+
+SIZE = 8
+IS_PATH = False
+
+
+def to_bytes(proto, string):
+    try:
+        return struct.pack('>B', int(string, 10))
+    except ValueError as exc:
+        six.raise_from(ValueError("Not a base 10 integer"), exc)
+    except struct.error as exc:
+        six.raise_from(ValueError("Integer not in range(256)"), exc)
+
+
+def to_string(proto, buf):
+    if len(buf) != 1:
+        raise ValueError("Invalid integer length (must be 1 byte / 8 bits)")
+    return six.text_type(struct.unpack('>B', buf)[0])
@@ -16,4 +16,4 @@ def to_bytes(proto, string):
 def to_string(proto, buf):
     if len(buf) == 0:
         raise ValueError("invalid length (should be > 0)")
-    return buf.decode('utf-8')
+    return bytes(buf).decode('utf-8')
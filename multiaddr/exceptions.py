@@ -87,3 +87,17 @@ class ProtocolNotFoundError(ProtocolManagerError):
         super(ProtocolNotFoundError, self).__init__(
             "No protocol with {0} {1!r} found".format(kind, value)
         )
+
+
+class ResolutionError(Error):
+    """
+    DNS name of a MultiAddr could not be resolved
+    """
+    def __init__(self, message, name, original=None):
+        self.message = message
+        self.name = name
+        self.original = original
+
+        super(ResolutionError, self).__init__(
+            "Could not resolve {0!r}: {1}".format(name, message)
+        )
@@ -4,90 +4,188 @@ try:
 except ImportError:  # pragma: no cover (PY2)
     import collections
     collections.abc = collections
+import struct
 
 import six
-import varint
 
+from . import _varint
 from . import exceptions, protocols
+from .cache import LRUCache
 
+from .transforms import ShapeEncoder
 from .transforms import bytes_iter
 from .transforms import string_to_bytes
 from .transforms import bytes_to_string
 
 
-__all__ = ("Multiaddr",)
+__all__ = ("Multiaddr", "parse_many")
+
+
+# Shared instances handed out by `Multiaddr.intern`; its capacity may be
+# adjusted by assigning to `INTERN_CACHE.capacity`
+INTERN_CACHE = LRUCache(4096)
+
+# Results of `Multiaddr.to_sockaddr` and `Multiaddr.from_sockaddr`
+SOCKADDR_CACHE = LRUCache(1024)
+
+# Protocol codes of the supported socket types, filled on first use: `socket`
+# is only imported by the socket address conversions, not by `import multiaddr`
+_SOCKET_TYPES = {}
+
+
+def _socket_type_code(type):
+    if not _SOCKET_TYPES:
+        import socket
+        _SOCKET_TYPES.update({
+            socket.SOCK_STREAM: protocols.P_TCP,
+            socket.SOCK_DGRAM: protocols.P_UDP,
+        })
+    return _SOCKET_TYPES.get(type)
+
+
+def _is_af_unix(family):
+    import socket
+    return family == getattr(socket, "AF_UNIX", None)
+
+
+def _zone_to_scope_id(zone):
+    if zone.isdigit():
+        return int(zone)
+    import socket
+    try:
+        return socket.if_nametoindex(zone)
+    except (AttributeError, socket.error) as exc:
+        six.raise_from(ValueError("Unknown network interface {0!r}".format(zone)), exc)
+
+
+def _scope_id_to_zone(scope_id):
+    import socket
+    try:
+        return six.text_type(socket.if_indextoname(scope_id))
+    except (AttributeError, socket.error):
+        return six.text_type(scope_id)
+
+
+def _encode_value(code, value):
+    import socket
+    entry = protocols.dispatch_with_code(code)
+    try:
+        data = entry.to_bytes(entry.proto, value)
+    except (ValueError, socket.error) as exc:
+        six.raise_from(ValueError("Invalid {0} value {1!r}".format(entry.proto.name, value)), exc)
+    if entry.size < 0:
+        return entry.vcode + _varint.encode(len(data)) + data
+    return entry.vcode + data
+
+
+def _sockaddr_host_bytes(family, sockaddr):
+    """Return the binary Multiaddr components of the host part of the given
+    `AF_INET` or `AF_INET6` socket address."""
+    import socket
+    if family == socket.AF_INET:
+        return _encode_value(protocols.P_IP4, sockaddr[0])
+    if family == socket.AF_INET6:
+        # Zones are part of the host on old Pythons and always returned as
+        # scope ID on newer ones
+        host, _, zone = sockaddr[0].partition("%")
+        if not zone and len(sockaddr) > 3 and sockaddr[3]:
+            zone = _scope_id_to_zone(sockaddr[3])
+        data = _encode_value(protocols.P_IP6, host)
+        if zone:
+            data = _encode_value(protocols.P_IP6ZONE, zone) + data
+        return data
+    raise ValueError("Unsupported address family {0!r}".format(family))
+
+
+def _sockaddr_port_bytes(type, port):
+    code = _socket_type_code(type)
+    if code is None:
+        raise ValueError("Unsupported socket type {0!r}".format(type))
+    try:
+        data = struct.pack(">H", port)
+    except struct.error as exc:
+        six.raise_from(ValueError("Invalid port number {0!r}".format(port)), exc)
+    return protocols.dispatch_with_code(code).vcode + data
+
+
+def _sockaddr_bytes(family, sockaddr, type):
+    if _is_af_unix(family):
+        if not sockaddr:
+            raise ValueError("Unnamed Unix sockets have no Multiaddr equivalent")
+        return _encode_value(protocols.P_UNIX, sockaddr)
+    return _sockaddr_host_bytes(family, sockaddr) + _sockaddr_port_bytes(type, sockaddr[1])
+
+
+def _components_to_string(parts):
+    st = [u'']
+    for _, proto, codec, part in parts:
+        st.append(proto.name)
+        if codec.SIZE != 0:
+            value = codec.to_string(proto, part)
+            st.append(value[1:] if codec.IS_PATH and value[0] == u'/' else value)
+    return u'/'.join(st)
+
+
+def _restore(cls, data, registry):
+    """Recreate a pickled Multiaddr that uses a custom registry."""
+    return cls(data, registry=registry)
 
 
 class MultiAddrKeys(collections.abc.KeysView, collections.abc.Sequence):
     def __contains__(self, proto):
-        proto = protocols.protocol_with_any(proto)
+        proto = self._mapping._protocol(proto)
         return collections.abc.Sequence.__contains__(self, proto)
 
     def __getitem__(self, idx):
-        if idx < 0:
-            idx = len(self)+idx
-        for idx2, proto in enumerate(self):
-            if idx2 == idx:
-                return proto
-        raise IndexError("Protocol list index out of range")
+        if isinstance(idx, slice):
+            return self.__class__(self._mapping[idx])
+        try:
+            return self._mapping._components()[idx][1]
+        except IndexError:
+            raise IndexError("Protocol list index out of range")
 
     __hash__ = collections.abc.KeysView._hash
 
     def __iter__(self):
-        for _, proto, _, _ in bytes_iter(self._mapping.to_bytes()):
+        for _, proto, _, _ in self._mapping._components():
             yield proto
 
 
 class MultiAddrItems(collections.abc.ItemsView, collections.abc.Sequence):
     def __contains__(self, item):
         proto, value = item
-        proto = protocols.protocol_with_any(proto)
+        proto = self._mapping._protocol(proto)
         return collections.abc.Sequence.__contains__(self, (proto, value))
 
     def __getitem__(self, idx):
-        if idx < 0:
-            idx = len(self)+idx
-        for idx2, item in enumerate(self):
-            if idx2 == idx:
-                return item
-        raise IndexError("Protocol item list index out of range")
+        if isinstance(idx, slice):
+            return self.__class__(self._mapping[idx])
+        try:
+            component = self._mapping._components()[idx]
+        except IndexError:
+            raise IndexError("Protocol item list index out of range")
+        return component[1], self._mapping._value_of(component)
 
     def __iter__(self):
-        for _, proto, codec, part in bytes_iter(self._mapping.to_bytes()):
-            if codec.SIZE != 0:
-                try:
-                    # If we have an address, return it
-                    yield proto, codec.to_string(proto, part)
-                except Exception as exc:
-                    six.raise_from(
-                        exceptions.BinaryParseError(
-                            str(exc),
-                            self._mapping.to_bytes(),
-                            proto.name,
-                            exc,
-                        ),
-                        exc,
-                    )
-            else:
-                # We were given something like '/utp', which doesn't have
-                # an address, so return None
-                yield proto, None
+        for component in self._mapping._components():
+            yield component[1], self._mapping._value_of(component)
 
 
 class MultiAddrValues(collections.abc.ValuesView, collections.abc.Sequence):
     __contains__ = collections.abc.Sequence.__contains__
 
     def __getitem__(self, idx):
-        if idx < 0:
-            idx = len(self)+idx
-        for idx2, proto in enumerate(self):
-            if idx2 == idx:
-                return proto
-        raise IndexError("Protocol value list index out of range")
+        if isinstance(idx, slice):
+            return self.__class__(self._mapping[idx])
+        try:
+            component = self._mapping._components()[idx]
+        except IndexError:
+            raise IndexError("Protocol value list index out of range")
+        return self._mapping._value_of(component)
 
     def __iter__(self):
-        for _, value in MultiAddrItems(self._mapping):
-            yield value
+        for component in self._mapping._components():
+            yield self._mapping._value_of(component)
 
 
 class Multiaddr(collections.abc.Mapping):
@@ -107,14 +205,26 @@ class Multiaddr(collections.abc.Mapping):
     return new objects rather than modify internal state.
     """
 
-    __slots__ = ("_bytes",)
+    __slots__ = ("_raw", "_parts", "_text", "_hash", "_valid", "_registry")
 
-    def __init__(self, addr):
+    def __init__(self, addr, **kwargs):
         """Instantiate a new Multiaddr.
 
         Args:
             addr : A string-encoded or a byte-encoded Multiaddr
-
+            registry : (keyword-only) The
+                :class:`~multiaddr.protocols.ProtocolRegistry` providing the
+                protocols of this Multiaddr (and of all Multiaddrs derived
+                from it) instead of the global one
+
+        String-encoded Multiaddrs are fully validated while parsing them,
+        while the parts of byte-encoded ones are only checked as they are
+        accessed; see :meth:`validate` and :meth:`from_trusted_bytes` for
+        checking them up front or not at all.
+
+        Byte-encoded Multiaddrs may also be passed as `bytearray` or
+        `memoryview`, in which case the given buffer is wrapped without
+        copying it and must therefore not be modified afterwards.
         """
         # On Python 2 text string will often be binary anyways so detect the
         # obvious case of a “binary-encoded” multiaddr starting with a slash
@@ -122,31 +232,331 @@ class Multiaddr(collections.abc.Mapping):
         if six.PY2 and isinstance(addr, str) and addr.startswith("/"):  # pragma: no cover (PY2)
             addr = addr.decode("utf-8")
 
+        registry = kwargs.pop("registry", None)
+        if kwargs:
+            raise TypeError("Unexpected keyword argument {0!r}".format(next(iter(kwargs))))
+        if registry is None:
+            registry = getattr(addr, "_registry", None)
+        elif not isinstance(registry, protocols.ProtocolRegistry):
+            raise TypeError("registry must be a ProtocolRegistry")
+        self._registry = registry
+
         if isinstance(addr, six.text_type):
-            self._bytes = string_to_bytes(addr)
+            self._bytes = string_to_bytes(addr, registry)
+            self._valid = True
+            return
         elif isinstance(addr, six.binary_type):
             self._bytes = addr
+        elif isinstance(addr, (bytearray, memoryview)):
+            view = memoryview(addr)
+            if hasattr(view, "toreadonly"):
+                view = view.toreadonly()
+            self._bytes = view
         elif isinstance(addr, Multiaddr):
-            self._bytes = addr.to_bytes()
+            self._bytes = addr._bytes
+            if registry is not addr._registry:
+                return
+            # Both objects are immutable, so the parsed index may be shared too
+            self._parts = addr._parts
+            self._text = addr._text
+            self._hash = addr._hash
+            self._valid = addr._valid
         else:
             raise TypeError("MultiAddr must be bytes, str or another MultiAddr instance")
 
+    @property
+    def _bytes(self):
+        return self._raw
+
+    @_bytes.setter
+    def _bytes(self, value):
+        # Replacing the binary representation invalidates everything that was
+        # derived from it
+        self._raw = value
+        self._parts = None
+        self._text = None
+        self._hash = None
+        self._valid = None
+
+    def _components(self):
+        """Returns the tuple of ``(offset, proto, codec, part)`` entries this
+        Multiaddr is made up of.
+
+        The binary representation is only parsed on first access, all later
+        calls (and all views) share the resulting index."""
+        parts = self._parts
+        if parts is None:
+            parts = self._parts = tuple(bytes_iter(self._raw, self._registry))
+        return parts
+
+    def _protocol(self, proto):
+        """Look up the given protocol (name, code or object) in the registry
+        of this Multiaddr."""
+        if self._registry is None:
+            return protocols.protocol_with_any(proto)
+        return self._registry.with_any(proto)
+
+    def _value_of(self, component):
+        """Decodes the value of the given entry of the component index."""
+        _, proto, codec, part = component
+        if codec.SIZE == 0:
+            # We were given something like '/utp', which doesn't have
+            # an address, so return None
+            return None
+        if self._valid:
+            return codec.to_string(proto, part)
+        try:
+            return codec.to_string(proto, part)
+        except Exception as exc:
+            six.raise_from(
+                exceptions.BinaryParseError(str(exc), self._bytes, proto.name, exc),
+                exc,
+            )
+
+    def _slice(self, key):
+        """Returns a new Multiaddr made up of the given contiguous range of
+        components, reusing the already parsed component index."""
+        parts = self._components()
+        start, stop, step = key.indices(len(parts))
+        if step != 1:
+            raise ValueError("Multiaddr slices must be contiguous")
+        if start >= stop:
+            return self.__class__(b"", registry=self._registry)
+
+        begin = parts[start][0]
+        end = parts[stop][0] if stop < len(parts) else len(self._bytes)
+        result = self.__class__(self._bytes[begin:end], registry=self._registry)
+        result._parts = tuple(
+            (offset - begin, proto, codec, part)
+            for offset, proto, codec, part in parts[start:stop]
+        )
+        result._valid = self._valid
+        return result
+
+    @classmethod
+    def from_trusted_bytes(cls, data, **kwargs):
+        """Construct a Multiaddr from a byte-encoded Multiaddr known to be
+        valid, such as one taken from a verified signed peer record.
+
+        Accepts the same keyword arguments as the constructor, so a custom
+        protocol registry is passed as ``registry=``; skipping validation is
+        a separate constructor instead of another keyword argument of
+        ``Multiaddr()`` so that it is always explicit at the call site.
+
+        The data is never checked as a whole, and accessors skip the
+        translation of decoding errors into
+        :class:`~multiaddr.exceptions.BinaryParseError`, so passing invalid
+        data results in arbitrary exceptions or garbage values."""
+        result = cls(data, **kwargs)
+        result._valid = True
+        return result
+
+    def validate(self):
+        """Check the structure and every component value of the binary
+        representation of this Multiaddr.
+
+        A successful result is recorded on the instance, so that later calls
+        return right away and accessors skip their own error handling.
+
+        Returns:
+            This Multiaddr
+
+        Raises:
+            ~multiaddr.exceptions.BinaryParseError : The stored MultiAddr
+                binary representation is invalid
+        """
+        if not self._valid:
+            for component in self._components():
+                self._value_of(component)
+            self._valid = True
+        return self
+
+    @classmethod
+    def intern(cls, addr):
+        """Return a shared Multiaddr instance for the given string-encoded or
+        byte-encoded Multiaddr.
+
+        Identical inputs return the very same (immutable) object for as long
+        as it remains in :data:`INTERN_CACHE`, so repeatedly constructing the
+        same addresses only parses them once."""
+        if isinstance(addr, Multiaddr):
+            key = addr.to_bytes()
+        elif isinstance(addr, (bytearray, memoryview)):
+            # Shared instances must not reference buffers owned by the caller
+            addr = key = six.binary_type(addr)
+        else:
+            key = addr
+        key = (cls, key)
+
+        instance = INTERN_CACHE.get(key)
+        if instance is None:
+            instance = cls(addr)
+            INTERN_CACHE.put(key, instance)
+        return instance
+
+    @classmethod
+    def from_many(cls, addrs, errors="raise"):
+        """Construct Multiaddrs from an iterable of string-encoded or
+        byte-encoded Multiaddrs.
+
+        Protocol lookups are shared between all addresses of the same shape,
+        identical strings are only parsed once and the component index of
+        byte-encoded input is built (and thereby its structure validated)
+        right away.
+
+        Args:
+            addrs : Iterable of values accepted by :class:`Multiaddr`
+            errors : What to do with addresses that cannot be parsed:
+                ``"raise"`` the first error, ``"skip"`` those addresses or
+                ``"collect"`` them
+
+        Returns:
+            The list of Multiaddr objects. In ``"collect"`` mode a tuple of
+            that list, with ``None`` in place of each invalid address, and
+            the list of ``(index, exception)`` pairs describing them instead.
+        """
+        if errors not in ("raise", "skip", "collect"):
+            raise ValueError("errors must be one of 'raise', 'skip' or 'collect'")
+
+        encoder = ShapeEncoder()
+        seen = {}
+        results = []
+        failures = []
+        for idx, addr in enumerate(addrs):
+            try:
+                if isinstance(addr, six.text_type):
+                    result = seen.get(addr)
+                    if result is None:
+                        result = seen[addr] = cls.from_trusted_bytes(encoder.encode(addr))
+                else:
+                    result = cls(addr)
+                    result._components()
+            except (exceptions.ParseError, TypeError) as exc:
+                if errors == "raise":
+                    raise
+                if errors == "collect":
+                    results.append(None)
+                    failures.append((idx, exc))
+                continue
+            results.append(result)
+
+        if errors == "collect":
+            return results, failures
+        return results
+
     @classmethod
     def join(cls, *addrs):
         """Concatenate the values of the given MultiAddr strings or objects,
         encapsulating each successive MultiAddr value with the previous ones."""
-        return cls(b"".join(map(lambda a: cls(a).to_bytes(), addrs)))
+        return cls(b"".join(
+            (a if isinstance(a, Multiaddr) else cls(a)).to_bytes() for a in addrs
+        ))
+
+    @classmethod
+    def from_sockaddr(cls, family, sockaddr, type=None):
+        """Construct a Multiaddr from a socket address, the inverse of
+        :meth:`to_sockaddr`.
+
+        Args:
+            family : Address family (`AF_INET`, `AF_INET6` or `AF_UNIX`)
+            sockaddr : Socket address as returned by ``socket.accept``,
+                ``socket.getpeername`` or ``socket.getaddrinfo``
+            type : Socket type, `SOCK_STREAM` (``tcp``, the default) or
+                `SOCK_DGRAM` (``udp``); ignored for `AF_UNIX`
+
+        Raises:
+            ValueError : The address cannot be expressed as Multiaddr
+        """
+        if type is None:
+            import socket
+            type = socket.SOCK_STREAM
+        key = ("from", cls, family, type, sockaddr)
+        result = SOCKADDR_CACHE.get(key)
+        if result is None:
+            result = cls(_sockaddr_bytes(family, sockaddr, type))
+            SOCKADDR_CACHE.put(key, result)
+        return result
+
+    @classmethod
+    def from_sockaddrs(cls, family, sockaddrs, type=None):
+        """Construct Multiaddrs from many socket addresses of the same family
+        and type (such as the peers of an accept loop), see
+        :meth:`from_sockaddr`.
+
+        The host part of each distinct host is only encoded once; unlike
+        :meth:`from_sockaddr` the results are not cached."""
+        if type is None:
+            import socket
+            type = socket.SOCK_STREAM
+        if _is_af_unix(family):
+            return [cls(_sockaddr_bytes(family, sockaddr, type)) for sockaddr in sockaddrs]
+
+        hosts = {}
+        results = []
+        for sockaddr in sockaddrs:
+            host_key = sockaddr[0] if len(sockaddr) < 4 else (sockaddr[0], sockaddr[3])
+            host = hosts.get(host_key)
+            if host is None:
+                host = hosts[host_key] = _sockaddr_host_bytes(family, sockaddr)
+            results.append(cls(host + _sockaddr_port_bytes(type, sockaddr[1])))
+        return results
 
     def __eq__(self, other):
         """Checks if two Multiaddr objects are exactly equal."""
+        if not isinstance(other, Multiaddr):
+            return NotImplemented
         return self._bytes == other._bytes
 
+    def __ne__(self, other):
+        if not isinstance(other, Multiaddr):
+            return NotImplemented
+        return self._bytes != other._bytes
+
+    def __hash__(self):
+        """Hash of the binary representation, computed only once."""
+        value = self._hash
+        if value is None:
+            value = self._hash = hash(self.to_bytes())
+        return value
+
+    # Multiaddrs are ordered by their binary representation
+    def __lt__(self, other):
+        if not isinstance(other, Multiaddr):
+            return NotImplemented
+        return self.to_bytes() < other.to_bytes()
+
+    def __le__(self, other):
+        if not isinstance(other, Multiaddr):
+            return NotImplemented
+        return self.to_bytes() <= other.to_bytes()
+
+    def __gt__(self, other):
+        if not isinstance(other, Multiaddr):
+            return NotImplemented
+        return self.to_bytes() > other.to_bytes()
+
+    def __ge__(self, other):
+        if not isinstance(other, Multiaddr):
+            return NotImplemented
+        return self.to_bytes() >= other.to_bytes()
+
     def __str__(self):
         """Return the string representation of this Multiaddr.
 
         May raise a :class:`~multiaddr.exceptions.BinaryParseError` if the
         stored MultiAddr binary representation is invalid."""
-        return bytes_to_string(self._bytes)
+        # The text is rendered from the binary form even for Multiaddrs that
+        # were constructed from a string, as that string may not have been
+        # in canonical form (trailing slashes, IPv6 spelling, …)
+        text = self._text
+        if text is None:
+            if self._valid and self._parts is not None:
+                # Render from the existing index without parsing again
+                text = _components_to_string(self._parts)
+            else:
+                text = bytes_to_string(self._bytes, self._registry)
+            self._text = text
+        return text
 
     def __contains__(self, proto):
         return proto in MultiAddrKeys(self)
@@ -155,7 +565,7 @@ class Multiaddr(collections.abc.Mapping):
         return iter(MultiAddrKeys(self))
 
     def __len__(self):
-        return sum((1 for _ in bytes_iter(self.to_bytes())))
+        return len(self._components())
 
     # On Python 2 __str__ needs to return binary text, so expose the original
     # function as __unicode__ and transparently encode its returned text based
@@ -170,9 +580,21 @@ class Multiaddr(collections.abc.Mapping):
     def __repr__(self):
         return "<Multiaddr %s>" % str(self)
 
+    def __reduce__(self):
+        # Only the binary form is serialized: the cached index references
+        # codec modules and buffer views, none of which can be pickled
+        if self._registry is None:
+            return self.__class__, (self.to_bytes(),)
+        return _restore, (self.__class__, self.to_bytes(), self._registry)
+
     def to_bytes(self):
         """Returns the byte array representation of this Multiaddr."""
-        return self._bytes
+        raw = self._raw
+        if not isinstance(raw, six.binary_type):
+            # Materialize wrapped buffers only once they are actually requested
+            # (the component index remains valid as the content is the same)
+            raw = self._raw = six.binary_type(raw)
+        return raw
 
     def protocols(self):
         """Returns a list of Protocols this Multiaddr includes."""
@@ -183,21 +605,22 @@ class Multiaddr(collections.abc.Mapping):
         up of."""
         final_split_offset = -1
         results = []
-        for idx, (offset, proto, codec, part_value) in enumerate(bytes_iter(self._bytes)):
+        for idx, (offset, proto, codec, part_value) in enumerate(self._components()):
             # Split at most `maxplit` times
             if idx == maxsplit:
                 final_split_offset = offset
                 break
 
             # Re-assemble binary MultiAddr representation
-            part_size = varint.encode(len(part_value)) if codec.SIZE < 0 else b""
+            part_size = _varint.encode(len(part_value)) if codec.SIZE < 0 else b""
             part = b"".join((proto.vcode, part_size, part_value))
 
             # Add MultiAddr with the given value
-            results.append(self.__class__(part))
+            results.append(self.__class__(part, registry=self._registry))
         # Add final item with remainder of MultiAddr if there is anything left
         if final_split_offset >= 0:
-            results.append(self.__class__(self._bytes[final_split_offset:]))
+            results.append(self.__class__(self._bytes[final_split_offset:],
+                                          registry=self._registry))
 
         return results
 
@@ -215,22 +638,69 @@ class Multiaddr(collections.abc.Mapping):
         For example:
             /ip4/1.2.3.4 encapsulate /tcp/80 = /ip4/1.2.3.4/tcp/80
         """
-        return self.join(self, other)
+        if not isinstance(other, Multiaddr):
+            other = Multiaddr(other, registry=self._registry)
+        head = self.to_bytes()
+        result = self.__class__(head + other.to_bytes(), registry=self._registry)
+
+        # Combine the component indexes if both have already been parsed
+        # (using the same protocols)
+        if (self._parts is not None and other._parts is not None
+                and self._registry is other._registry):
+            shift = len(head)
+            result._parts = self._parts + tuple(
+                (offset + shift, proto, codec, part)
+                for offset, proto, codec, part in other._parts
+            )
+        if self._valid and other._valid:
+            result._valid = True
+        return result
 
     def decapsulate(self, other):
         """Remove a Multiaddr wrapping.
 
+        Strips the last occurrence of the given Multiaddr's components, and
+        everything following it. Matches are only accepted at component
+        boundaries.
+
         For example:
-            /ip4/1.2.3.4/tcp/80 decapsulate /ip4/1.2.3.4 = /tcp/80
+            /ip4/1.2.3.4/tcp/80 decapsulate /tcp/80 = /ip4/1.2.3.4
         """
-        s1 = self.to_bytes()
-        s2 = Multiaddr(other).to_bytes()
-        try:
-            idx = s1.rindex(s2)
-        except ValueError:
+        if not isinstance(other, Multiaddr):
+            other = Multiaddr(other, registry=self._registry)
+        needle = other.to_bytes()
+        if not needle:
             # if multiaddr not contained, returns a copy
             return Multiaddr(self)
-        return Multiaddr(s1[:idx])
+
+        raw = self._bytes
+        parts = self._components()
+        boundaries = set(offset for offset, _, _, _ in parts)
+        boundaries.add(len(raw))
+        for idx in range(len(parts) - 1, -1, -1):
+            start = parts[idx][0]
+            end = start + len(needle)
+            if end in boundaries and raw[start:end] == needle:
+                return self._slice(slice(0, idx))
+        # if multiaddr not contained, returns a copy
+        return Multiaddr(self)
+
+    def decapsulate_code(self, proto):
+        """Remove the last occurrence of the given protocol and everything
+        following it.
+
+        For example:
+            /ip4/1.2.3.4/tcp/80/p2p/Qm… decapsulate_code "tcp" = /ip4/1.2.3.4
+
+        Returns a copy of this Multiaddr if it does not contain the protocol.
+        """
+        proto = self._protocol(proto)
+        parts = self._components()
+        for idx in range(len(parts) - 1, -1, -1):
+            proto2 = parts[idx][1]
+            if proto2 is proto or proto2 == proto:
+                return self._slice(slice(0, idx))
+        return Multiaddr(self)
 
     def value_for_protocol(self, proto):
         """Return the value (if any) following the specified protocol
@@ -248,10 +718,68 @@ class Multiaddr(collections.abc.Mapping):
         ~multiaddr.exceptions.ProtocolLookupError
             MultiAddr does not contain any instance of this protocol
         """
-        proto = protocols.protocol_with_any(proto)
-        for proto2, value in self.items():
+        proto = self._protocol(proto)
+        for component in self._components():
+            proto2 = component[1]
             if proto2 is proto or proto2 == proto:
-                return value
+                return self._value_of(component)
         raise exceptions.ProtocolLookupError(proto, str(self))
 
-    __getitem__ = value_for_protocol
+    def to_sockaddr(self):
+        """Return the ``(family, type, sockaddr)`` socket address equivalent to
+        this Multiaddr, where `sockaddr` has the format expected by
+        ``socket.connect`` and ``socket.bind`` for `family`.
+
+        Supported are ``/unix/<path>`` and ``/ip4|ip6/<host>/tcp|udp/<port>``
+        addresses, the latter also with an ``/ip6zone/<zone>`` prefix::
+
+            >>> Multiaddr("/ip4/127.0.0.1/udp/53").to_sockaddr()
+            (<AddressFamily.AF_INET: 2>, <SocketKind.SOCK_DGRAM: 2>, ('127.0.0.1', 53))
+
+        Raises
+        ------
+        ValueError
+            The Multiaddr has no socket address equivalent
+        ~multiaddr.exceptions.BinaryParseError
+            The stored MultiAddr binary representation is invalid
+        """
+        key = ("to", self.to_bytes())
+        result = SOCKADDR_CACHE.get(key)
+        if result is None:
+            result = self._to_sockaddr()
+            SOCKADDR_CACHE.put(key, result)
+        return result
+
+    def _to_sockaddr(self):
+        import socket
+        parts = self._components()
+        codes = [proto.code for _, proto, _, _ in parts]
+        if codes == [protocols.P_UNIX] and hasattr(socket, "AF_UNIX"):
+            return socket.AF_UNIX, socket.SOCK_STREAM, self._value_of(parts[0])
+
+        zone = None
+        if codes[:1] == [protocols.P_IP6ZONE]:
+            zone = self._value_of(parts[0])
+            parts, codes = parts[1:], codes[1:]
+        if len(codes) == 2 and codes[1] in (protocols.P_TCP, protocols.P_UDP):
+            type = socket.SOCK_STREAM if codes[1] == protocols.P_TCP else socket.SOCK_DGRAM
+            host = self._value_of(parts[0])
+            port = struct.unpack(">H", parts[1][3])[0]
+            if codes[0] == protocols.P_IP4 and zone is None:
+                return socket.AF_INET, type, (host, port)
+            if codes[0] == protocols.P_IP6:
+                scope_id = _zone_to_scope_id(zone) if zone is not None else 0
+                return socket.AF_INET6, type, (host, port, 0, scope_id)
+        raise ValueError("{0} has no socket address equivalent".format(self))
+
+    def __getitem__(self, key):
+        """Return the value following the given protocol, or, if given
+        a slice, a new Multiaddr made up of that range of components."""
+        if isinstance(key, slice):
+            return self._slice(key)
+        return self.value_for_protocol(key)
+
+
+def parse_many(addrs, errors="raise"):
+    """Construct many Multiaddrs at once, see :meth:`Multiaddr.from_many`."""
+    return Multiaddr.from_many(addrs, errors)
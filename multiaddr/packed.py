@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+"""Compact containers storing many Multiaddrs in one contiguous buffer.
+
+Instead of one Python object (plus one `bytes` object) per address, these
+containers keep the binary representations of all addresses back-to-back in
+a single `bytearray` with an array of end offsets next to it; Multiaddr
+objects are only created when items are accessed.
+
+Both containers serialize to (and load from) a sequence of varint
+length-prefixed binary Multiaddrs. Like ``Multiaddr(bytes)``, binary input
+is stored without validating it.
+"""
+try:
+    import collections.abc
+except ImportError:  # pragma: no cover (PY2)
+    import collections
+    collections.abc = collections
+import array
+
+import six
+
+from . import _varint
+from . import exceptions
+from .multiaddr import Multiaddr
+
+
+__all__ = ("MultiaddrArray", "MultiaddrSet")
+
+
+def _addr_bytes(addr):
+    if isinstance(addr, Multiaddr):
+        return addr.to_bytes()
+    if isinstance(addr, six.text_type):
+        return Multiaddr(addr).to_bytes()
+    if isinstance(addr, (six.binary_type, bytearray, memoryview)):
+        return six.binary_type(addr)
+    raise TypeError("MultiAddr must be bytes, str or another MultiAddr instance")
+
+
+def _member_bytes(addr):
+    """Like `_addr_bytes`, but returns ``None`` for values that cannot be set
+    members (including strings that are no valid Multiaddr) instead of
+    raising."""
+    try:
+        return _addr_bytes(addr)
+    except (TypeError, exceptions.ParseError):
+        return None
+
+
+def _slice_bytes(buf, start, end):
+    # Copy the range only once, instead of slicing `buf` to a new bytearray
+    # first; the temporary view is released right away, so that `buf` may
+    # still be resized afterwards
+    return memoryview(buf)[start:end].tobytes()
+
+
+def _iter_frames(data):
+    view = memoryview(data)
+    pos = 0
+    while pos < len(view):
+        try:
+            size, pos = _varint.decode(view, pos)
+        except IndexError:
+            raise exceptions.BinaryParseError("Truncated length prefix", data, None)
+        except ValueError:
+            raise exceptions.BinaryParseError("Invalid length prefix", data, None)
+        end = pos + size
+        if end > len(view):
+            raise exceptions.BinaryParseError("Truncated Multiaddr", data, None)
+        yield view[pos:end]
+        pos = end
+
+
+class MultiaddrArray(collections.abc.Sequence):
+    """Append-only sequence of Multiaddrs stored in a single buffer."""
+
+    __slots__ = ("_buf", "_offsets")
+
+    def __init__(self, addrs=()):
+        self._buf = bytearray()
+        # Use the smallest offset type first, `append` widens it when needed
+        self._offsets = array.array("I", [0])
+        self.extend(addrs)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return self.__class__(self.raw(i) for i in range(*idx.indices(len(self))))
+        return Multiaddr(self.raw(idx))
+
+    def __repr__(self):
+        return "<{0} {1!r}>".format(self.__class__.__name__, list(self))
+
+    def raw(self, idx):
+        """Return the binary representation of the item at `idx`."""
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("MultiaddrArray index out of range")
+        return _slice_bytes(self._buf, self._offsets[idx], self._offsets[idx + 1])
+
+    def iter_raw(self):
+        """Iterate over the binary representations of all items."""
+        buf = self._buf
+        offsets = self._offsets
+        for idx in range(len(offsets) - 1):
+            yield _slice_bytes(buf, offsets[idx], offsets[idx + 1])
+
+    def _iter_views(self):
+        """Iterate over `memoryview` slices of the items.
+
+        The views are taken from one snapshot of the buffer rather than from
+        the buffer itself, which could not be resized anymore while any of
+        them is alive; the snapshot is kept alive by the views too."""
+        view = memoryview(six.binary_type(self._buf))
+        offsets = self._offsets
+        for idx in range(len(offsets) - 1):
+            yield view[offsets[idx]:offsets[idx + 1]]
+
+    def __iter__(self):
+        for data in self._iter_views():
+            yield Multiaddr(data)
+
+    def append(self, addr):
+        self._append_raw(_addr_bytes(addr))
+
+    def extend(self, addrs):
+        for addr in addrs:
+            self._append_raw(_addr_bytes(addr))
+
+    def _append_raw(self, data):
+        self._buf.extend(data)
+        end = len(self._buf)
+        try:
+            self._offsets.append(end)
+        except OverflowError:
+            self._offsets = array.array("L" if array.array("L").itemsize >= 8 else "Q",
+                                        self._offsets)
+            self._offsets.append(end)
+
+    @property
+    def nbytes(self):
+        """Number of bytes used for storing the items (excluding the constant
+        per-container overhead)."""
+        return len(self._buf) + len(self._offsets) * self._offsets.itemsize
+
+    def to_bytes(self):
+        """Serialize all items as varint length-prefixed binary Multiaddrs."""
+        return b"".join(
+            _varint.encode(len(data)) + data for data in self.iter_raw()
+        )
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Load items serialized by :meth:`to_bytes`.
+
+        Raises :class:`~multiaddr.exceptions.BinaryParseError` if `data` ends
+        within an item."""
+        result = cls()
+        for frame in _iter_frames(data):
+            result._append_raw(frame)
+        return result
+
+
+# Hash table slot markers of `MultiaddrSet`
+_EMPTY = -1
+_DELETED = -2
+
+# Signed typecodes for the hash table of `MultiaddrSet`, from narrowest to
+# widest
+_INDEX_TYPECODES = ("b", "h", "i", "l" if array.array("l").itemsize >= 8 else "q")
+
+
+def _index_typecode(max_index):
+    """Return the narrowest typecode able to hold item indexes up to
+    `max_index` (and the negative slot markers)."""
+    for typecode in _INDEX_TYPECODES:
+        if max_index < 1 << (8 * array.array(typecode).itemsize - 1):
+            return typecode
+    raise OverflowError("Too many items for MultiaddrSet")
+
+
+class MultiaddrSet(collections.abc.MutableSet):
+    """Set of Multiaddrs stored in a single buffer.
+
+    Members are located through an open-addressing hash table of item
+    indexes, hashing the stored binary representations, so that no per-item
+    Python objects are kept around. The table is kept at most two thirds
+    full and uses the narrowest integer type able to hold the indexes.
+    Removed items leave a gap in the buffer until enough of them accumulate,
+    at which point the storage is compacted.
+
+    Lookups accept the same values as :meth:`add`."""
+
+    __slots__ = ("_items", "_alive", "_table", "_len", "_deleted")
+
+    def __init__(self, addrs=()):
+        self._items = MultiaddrArray()
+        self._alive = bytearray()
+        self._table = array.array(_index_typecode(0), [_EMPTY]) * 8
+        self._len = 0
+        self._deleted = 0  # Deleted markers in the table
+        for addr in addrs:
+            self.add(addr)
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        alive = self._alive
+        for idx, data in enumerate(self._items._iter_views()):
+            if alive[idx]:
+                yield Multiaddr(data)
+
+    def __contains__(self, addr):
+        data = _member_bytes(addr)
+        return data is not None and self._find(data)[0] is not None
+
+    def __repr__(self):
+        return "<MultiaddrSet {0!r}>".format(list(self))
+
+    @property
+    def nbytes(self):
+        """Number of bytes used for storing the items and the hash table."""
+        return (self._items.nbytes + len(self._alive)
+                + len(self._table) * self._table.itemsize)
+
+    def add(self, addr):
+        data = _addr_bytes(addr)
+        slot, free = self._find(data)
+        if slot is not None:
+            return
+        if self._table[free] == _DELETED:
+            self._deleted -= 1
+        idx = len(self._items)
+        try:
+            self._table[free] = idx
+        except OverflowError:
+            self._table = array.array(_index_typecode(idx), self._table)
+            self._table[free] = idx
+        self._items._append_raw(data)
+        self._alive.append(1)
+        self._len += 1
+        if (self._len + self._deleted) * 3 > len(self._table) * 2:
+            self._rebuild()
+
+    def discard(self, addr):
+        data = _member_bytes(addr)
+        if data is None:
+            return
+        slot, _ = self._find(data)
+        if slot is None:
+            return
+        self._alive[self._table[slot]] = 0
+        self._table[slot] = _DELETED
+        self._len -= 1
+        self._deleted += 1
+        if len(self._items) > 2 * self._len + 8:
+            self._rebuild()
+
+    def clear(self):
+        self.__init__()
+
+    def to_bytes(self):
+        """Serialize all members as varint length-prefixed binary
+        Multiaddrs."""
+        alive = self._alive
+        return b"".join(
+            _varint.encode(len(data)) + data
+            for idx, data in enumerate(self._items.iter_raw()) if alive[idx]
+        )
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Load members serialized by :meth:`to_bytes` (or
+        :meth:`MultiaddrArray.to_bytes`), dropping duplicates."""
+        result = cls()
+        for frame in _iter_frames(data):
+            result.add(frame)
+        return result
+
+    def _find(self, data):
+        """Return the table slot holding `data` (or ``None``) and the slot it
+        would be inserted at."""
+        table = self._table
+        offsets = self._items._offsets
+        # Compare against views of the stored items instead of copying them;
+        # the view is released on return, before the buffer may be resized
+        view = memoryview(self._items._buf)
+        mask = len(table) - 1
+        slot = hash(data) & mask
+        free = None
+        while True:
+            idx = table[slot]
+            if idx == _EMPTY:
+                return None, (slot if free is None else free)
+            if idx == _DELETED:
+                if free is None:
+                    free = slot
+            elif view[offsets[idx]:offsets[idx + 1]] == data:
+                return slot, slot
+            slot = (slot + 1) & mask
+
+    def _rebuild(self):
+        # Drop removed items and re-insert everything into the smallest table
+        # that is at most two thirds full with the current members
+        items = [data for idx, data in enumerate(self._items.iter_raw()) if self._alive[idx]]
+        size = 8
+        while size * 2 < len(items) * 3:
+            size *= 2
+
+        self._items = MultiaddrArray()
+        self._alive = bytearray(b"\x01" * len(items))
+        self._table = array.array(_index_typecode(len(items)), [_EMPTY]) * size
+        self._deleted = 0
+        mask = size - 1
+        for idx, data in enumerate(items):
+            slot = hash(data) & mask
+            while self._table[slot] != _EMPTY:
+                slot = (slot + 1) & mask
+            self._table[slot] = idx
+            self._items._append_raw(data)
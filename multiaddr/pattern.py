@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""Matching of Multiaddrs against protocol stack patterns.
+
+A pattern is a ``/``-separated list of elements, each matching one component
+of an address by its protocol only – component values are never decoded:
+
+* ``tcp`` – the given protocol
+* ``ip4|ip6|dns*`` – any of the given protocols; ``*`` globs are expanded
+  against the protocols registered at compile time
+* ``*`` – any single protocol
+* ``**`` – any number (including zero) of protocols
+* ``<element>?`` – the element may be absent
+* ``{label:<element>}`` – capture the matched component as `label`
+
+For example ``/{host:ip4|ip6|dns*}/tcp/ws/p2p?`` matches WebSocket
+addresses with an optional trailing peer ID::
+
+    >>> matcher = compile("/{host:ip4|ip6|dns*}/tcp/ws/p2p?")
+    >>> match = matcher.match(Multiaddr("/dns4/example.com/tcp/443/ws"))
+    >>> match.value("host")
+    'example.com'
+"""
+import fnmatch
+import re
+
+from . import protocols
+from .multiaddr import Multiaddr
+
+
+__all__ = ("compile", "Pattern", "Match")
+
+
+_LABEL_RE = re.compile(r"^\{([A-Za-z_][A-Za-z0-9_]*):(.+)\}$")
+
+
+class _Element(object):
+    __slots__ = (
+        "codes",     # frozenset of protocol codes or None for any protocol
+        "optional",  # bool
+        "repeat",    # bool: matches any number of components (`**`)
+        "label",     # str or None
+    )
+
+    def __init__(self, codes, optional=False, repeat=False, label=None):
+        self.codes = codes
+        self.optional = optional
+        self.repeat = repeat
+        self.label = label
+
+
+def _parse_alternatives(text, pattern):
+    codes = set()
+    for alternative in text.split("|"):
+        if alternative == "*":
+            return None
+        if "*" in alternative:
+            names = fnmatch.filter([proto.name for proto in protocols.REGISTRY], alternative)
+            if not names:
+                raise ValueError("No protocol matches {0!r} in pattern {1!r}".format(
+                    alternative, pattern,
+                ))
+            codes.update(protocols.protocol_with_name(name).code for name in names)
+        else:
+            codes.add(protocols.protocol_with_name(alternative).code)
+    return frozenset(codes)
+
+
+def _parse_element(text, pattern):
+    optional = text.endswith("?")
+    if optional:
+        text = text[:-1]
+
+    label = None
+    match = _LABEL_RE.match(text)
+    if match:
+        label, text = match.groups()
+    if not text or "{" in text or "}" in text or "?" in text:
+        raise ValueError("Invalid element {0!r} in pattern {1!r}".format(text, pattern))
+
+    if text == "**":
+        if label is not None:
+            raise ValueError("Cannot capture `**` in pattern {0!r}".format(pattern))
+        # Matching zero components already makes `**` optional
+        return _Element(None, repeat=True)
+    return _Element(_parse_alternatives(text, pattern), optional, label=label)
+
+
+class Match(object):
+    """Result of successfully matching a :class:`Pattern`.
+
+    Captured components are stored undecoded; :meth:`value` decodes the
+    value of a captured component on request."""
+
+    __slots__ = ("addr", "_captures")
+
+    def __init__(self, addr, captures):
+        self.addr = addr
+        self._captures = captures
+
+    def __contains__(self, label):
+        return self._captures.get(label) is not None
+
+    def protocol(self, label):
+        """Return the protocol of the component captured as `label`, or
+        ``None`` if that (optional) element was not matched."""
+        component = self._captures[label]
+        return component[1] if component is not None else None
+
+    def value(self, label):
+        """Return the decoded value of the component captured as `label`, or
+        ``None`` if that (optional) element was not matched or the protocol
+        has no value."""
+        component = self._captures[label]
+        return self.addr._value_of(component) if component is not None else None
+
+    def __repr__(self):
+        return "<Match {0} {1!r}>".format(self.addr, dict(
+            (label, self.protocol(label)) for label in self._captures
+        ))
+
+
+class Pattern(object):
+    """Compiled Multiaddr protocol stack pattern, see :func:`compile`."""
+
+    __slots__ = ("pattern", "_elements", "_min_length", "_max_length", "_labels")
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+
+        # Normalize pattern the same way as `protocols.protocols_with_string`
+        while "//" in pattern:
+            pattern = pattern.replace("//", "/")
+        pattern = pattern.strip("/")
+        elements = []
+        if pattern:
+            elements = [_parse_element(text, self.pattern) for text in pattern.split("/")]
+        self._elements = tuple(elements)
+
+        self._labels = tuple(element.label for element in elements if element.label)
+        if len(set(self._labels)) != len(self._labels):
+            raise ValueError("Duplicate capture label in pattern {0!r}".format(self.pattern))
+
+        # Bounds on the number of components of matching addresses, to reject
+        # most candidates without walking their components at all
+        self._min_length = sum(1 for e in elements if not e.optional and not e.repeat)
+        if any(element.repeat for element in elements):
+            self._max_length = None
+        else:
+            self._max_length = len(elements)
+
+    def __repr__(self):
+        return "Pattern({0!r})".format(self.pattern)
+
+    def match(self, addr):
+        """Match the complete protocol stack of the given Multiaddr (or
+        binary Multiaddr representation) against this pattern.
+
+        Returns a :class:`Match` or ``None``."""
+        if not isinstance(addr, Multiaddr):
+            addr = Multiaddr(addr)
+        parts = addr._components()
+
+        count = len(parts)
+        if count < self._min_length or (self._max_length is not None and count > self._max_length):
+            return None
+
+        codes = [proto.code for _, proto, _, _ in parts]
+        captures = dict((label, None) for label in self._labels)
+        if not self._match(codes, 0, 0, captures, parts, set()):
+            return None
+        return Match(addr, captures)
+
+    def filter(self, addrs):
+        """Yield those of the given Multiaddrs that match this pattern."""
+        for addr in addrs:
+            if self.match(addr) is not None:
+                yield addr
+
+    def _match(self, codes, pos, idx, captures, parts, failed):
+        # Backtracking matcher; `failed` remembers states already known not
+        # to match, which keeps patterns with several `**` polynomial
+        elements = self._elements
+        while idx < len(elements):
+            if (pos, idx) in failed:
+                return False
+            element = elements[idx]
+            if element.repeat:
+                for end in range(len(codes), pos - 1, -1):
+                    if self._match(codes, end, idx + 1, captures, parts, failed):
+                        return True
+                failed.add((pos, idx))
+                return False
+
+            matches = pos < len(codes) and (element.codes is None or codes[pos] in element.codes)
+            if element.optional:
+                if matches and self._match(codes, pos + 1, idx + 1, captures, parts, failed):
+                    if element.label is not None:
+                        captures[element.label] = parts[pos]
+                    return True
+                if element.label is not None:
+                    captures[element.label] = None
+                idx += 1
+                continue
+            if not matches:
+                failed.add((pos, idx))
+                return False
+            if element.label is not None:
+                captures[element.label] = parts[pos]
+            pos += 1
+            idx += 1
+        return pos == len(codes)
+
+
+def compile(pattern):
+    """Compile the given pattern string into a reusable :class:`Pattern`."""
+    return Pattern(pattern)
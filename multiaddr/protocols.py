@@ -1,71 +1,16 @@
 # -*- coding: utf-8 -*-
+import threading
+
 import six
-import varint
 
+from . import _varint
 from . import exceptions
 from .codecs import codec_by_name
-
-
-# source of protocols https://github.com/multiformats/multicodec/blob/master/table.csv#L382
-# replicating table here to:
-# 1. avoid parsing the csv
-# 2. ensuring errors in the csv don't screw up code.
-# 3. changing a number has to happen in two places.
-P_IP4 = 0x04
-P_IP6 = 0x29
-P_IP6ZONE = 0x2A
-P_TCP = 0x06
-P_UDP = 0x0111
-P_DCCP = 0x21
-P_SCTP = 0x84
-P_UDT = 0x012D
-P_UTP = 0x012E
-P_P2P = 0x01A5
-P_HTTP = 0x01E0
-P_HTTPS = 0x01BB
-P_QUIC = 0x01CC
-P_WS = 0x01DD
-P_WSS = 0x01DE
-P_ONION = 0x01BC
-P_ONION3 = 0x01BD
-P_P2P_CIRCUIT = 0x0122
-P_DNS = 0x35
-P_DNS4 = 0x36
-P_DNS6 = 0x37
-P_DNSADDR = 0x38
-P_P2P_WEBSOCKET_STAR = 0x01DF
-P_P2P_WEBRTC_STAR = 0x0113
-P_P2P_WEBRTC_DIRECT = 0x0114
-P_UNIX = 0x0190
-
-_CODES = [
-    P_IP4,
-    P_IP6,
-    P_IP6ZONE,
-    P_TCP,
-    P_UDP,
-    P_DCCP,
-    P_SCTP,
-    P_UDT,
-    P_UTP,
-    P_P2P,
-    P_HTTP,
-    P_HTTPS,
-    P_QUIC,
-    P_WS,
-    P_WSS,
-    P_ONION,
-    P_ONION3,
-    P_P2P_CIRCUIT,
-    P_DNS,
-    P_DNS4,
-    P_DNS6,
-    P_DNSADDR,
-    P_P2P_WEBSOCKET_STAR,
-    P_P2P_WEBRTC_STAR,
-    P_P2P_WEBRTC_DIRECT,
-    P_UNIX,
-]
+# The built-in protocols and their `P_*` codes are generated from the
+# multicodec table (https://github.com/multiformats/multicodec/blob/master/table.csv)
+# by `tools/generate_protocol_table.py`
+from ._protocol_table import *  # NOQA: F401,F403
+from ._protocol_table import TABLE
 
 
 class Protocol(object):
@@ -89,15 +34,18 @@ class Protocol(object):
 
     @property
     def size(self):
-        return codec_by_name(self.codec).SIZE
+        return _dispatch_for(self).size
 
     @property
     def path(self):
-        return codec_by_name(self.codec).IS_PATH
+        return _dispatch_for(self).path
 
     @property
     def vcode(self):
-        return varint.encode(self.code)
+        snapshot = REGISTRY._snapshot
+        if snapshot.codes.get(self.code) is self:
+            return snapshot.vcodes[self.code]
+        return _varint.encode(self.code)
 
     def __eq__(self, other):
         if not isinstance(other, Protocol):
@@ -119,75 +67,274 @@ class Protocol(object):
         )
 
 
-# Protocols is the list of multiaddr protocols supported by this module.
-PROTOCOLS = [
-    Protocol(P_IP4, 'ip4', 'ip4'),
-    Protocol(P_TCP, 'tcp', 'uint16be'),
-    Protocol(P_UDP, 'udp', 'uint16be'),
-    Protocol(P_DCCP, 'dccp', 'uint16be'),
-    Protocol(P_IP6, 'ip6', 'ip6'),
-    Protocol(P_IP6ZONE, 'ip6zone', 'utf8'),
-    Protocol(P_DNS, 'dns', 'idna'),
-    Protocol(P_DNS4, 'dns4', 'idna'),
-    Protocol(P_DNS6, 'dns6', 'idna'),
-    Protocol(P_DNSADDR, 'dnsaddr', 'idna'),
-    Protocol(P_SCTP, 'sctp', 'uint16be'),
-    Protocol(P_UDT, 'udt', None),
-    Protocol(P_UTP, 'utp', None),
-    Protocol(P_P2P, 'p2p', 'p2p'),
-    Protocol(P_ONION, 'onion', 'onion'),
-    Protocol(P_ONION3, 'onion3', 'onion3'),
-    Protocol(P_QUIC, 'quic', None),
-    Protocol(P_HTTP, 'http', None),
-    Protocol(P_HTTPS, 'https', None),
-    Protocol(P_WS, 'ws', None),
-    Protocol(P_WSS, 'wss', None),
-    Protocol(P_P2P_WEBSOCKET_STAR, 'p2p-websocket-star', None),
-    Protocol(P_P2P_WEBRTC_STAR, 'p2p-webrtc-star', None),
-    Protocol(P_P2P_WEBRTC_DIRECT, 'p2p-webrtc-direct', None),
-    Protocol(P_P2P_CIRCUIT, 'p2p-circuit', None),
-    Protocol(P_UNIX, 'unix', 'fspath'),
-]
-
-_names_to_protocols = dict((proto.name, proto) for proto in PROTOCOLS)
-_codes_to_protocols = dict((proto.code, proto) for proto in PROTOCOLS)
+# Protocols is the list of multiaddr protocols supported by this module,
+# including those added by `add_protocol`; it mirrors the global `REGISTRY`
+PROTOCOLS = [Protocol(code, name, codec) for code, name, codec, _ in TABLE]
 
+# Varint encodings of the built-in protocol codes, precomputed by the generator
+_VCODES = dict((code, vcode) for code, _, _, vcode in TABLE)
 
-def add_protocol(proto):
-    if proto.name in _names_to_protocols:
-        raise exceptions.ProtocolExistsError(proto, "name")
 
-    if proto.code in _codes_to_protocols:
-        raise exceptions.ProtocolExistsError(proto, "code")
+class ProtocolDispatch(object):
+    """Everything needed to encode or decode values of one protocol, resolved
+    once so that the transforms only need a single lookup per component."""
+    __slots__ = [
+        "proto",      # Protocol
+        "vcode",      # bytes: varint-encoded protocol code
+        "codec",      # module: resolved codec
+        "size",       # int: codec SIZE
+        "path",       # bool: codec IS_PATH
+        "to_bytes",   # callable or None
+        "to_string",  # callable or None
+    ]
+
+    def __init__(self, proto, vcode=None):
+        codec = codec_by_name(proto.codec)
+
+        self.proto = proto
+        self.vcode = vcode or _varint.encode(proto.code)
+        self.codec = codec
+        self.size = codec.SIZE
+        self.path = codec.IS_PATH
+        if not getattr(codec, "loaded", True):
+            # Only import the codec implementation once a value is converted
+            self.to_bytes = self._load_to_bytes
+            self.to_string = self._load_to_string
+        else:
+            self.to_bytes = getattr(codec, "to_bytes", None)
+            self.to_string = getattr(codec, "to_string", None)
+
+    def _load(self):
+        codec = self.codec.load()
+        self.to_bytes = codec.to_bytes
+        self.to_string = codec.to_string
+
+    def _load_to_bytes(self, proto, string):
+        self._load()
+        return self.to_bytes(proto, string)
+
+    def _load_to_string(self, proto, buf):
+        self._load()
+        return self.to_string(proto, buf)
+
+    def __repr__(self):
+        return "ProtocolDispatch(proto={proto!r})".format(proto=self.proto)
+
+
+class _Snapshot(object):
+    """Immutable state of a :class:`ProtocolRegistry`.
+
+    Only the dispatch tables are filled in after publishing a snapshot, on
+    first use of each protocol (so that codecs are only imported when
+    needed). Entries are fully determined by the protocol, so threads racing
+    to compile the same one merely store equivalent objects."""
+    __slots__ = [
+        "protocols",       # tuple of Protocol in registration order
+        "names",           # dict: name → Protocol
+        "codes",           # dict: code → Protocol
+        "vcodes",          # dict: code → bytes (varint-encoded code)
+        "names_dispatch",  # dict: name → ProtocolDispatch
+        "codes_dispatch",  # dict: code → ProtocolDispatch
+    ]
+
+    def __init__(self, protos):
+        self.protocols = ()
+        self.names = {}
+        self.codes = {}
+        self.vcodes = {}
+        self.names_dispatch = {}
+        self.codes_dispatch = {}
+        for proto in protos:
+            self._add(proto)
+
+    def _add(self, proto):
+        if proto.name in self.names:
+            raise exceptions.ProtocolExistsError(proto, "name")
+        if proto.code in self.codes:
+            raise exceptions.ProtocolExistsError(proto, "code")
+        vcode = _VCODES.get(proto.code) or _varint.encode(proto.code)
+        self.protocols += (proto,)
+        self.names[proto.name] = proto
+        self.codes[proto.code] = proto
+        self.vcodes[proto.code] = vcode
+
+    def with_protocol(self, proto):
+        """Return a new snapshot that also contains `proto`."""
+        result = _Snapshot(())
+        result.protocols = self.protocols
+        result.names = self.names.copy()
+        result.codes = self.codes.copy()
+        result.vcodes = self.vcodes.copy()
+        result._add(proto)
+        # Entries compiled so far remain valid as no protocol is replaced
+        result.names_dispatch = self.names_dispatch.copy()
+        result.codes_dispatch = self.codes_dispatch.copy()
+        return result
+
+    def compile(self, proto):
+        entry = ProtocolDispatch(proto, self.vcodes[proto.code])
+        self.names_dispatch[proto.name] = entry
+        self.codes_dispatch[proto.code] = entry
+        return entry
+
+
+class ProtocolRegistry(object):
+    """Set of protocols known when parsing and rendering Multiaddrs.
+
+    The registered protocols are kept in an immutable snapshot that is
+    replaced as a whole when a protocol is added. Lookups therefore never
+    lock and always see a consistent state, even while other threads add
+    protocols; only adding protocols is serialized.
+
+    The module-level functions of :mod:`multiaddr.protocols` operate on the
+    global :data:`REGISTRY`. Separate registries, for example created using
+    :meth:`copy`, may be passed to :class:`~multiaddr.multiaddr.Multiaddr`
+    and the :mod:`~multiaddr.transforms` functions instead, so that
+    protocols added to them remain invisible everywhere else."""
+    __slots__ = ["_snapshot", "_lock"]
+
+    def __init__(self, protos=()):
+        self._snapshot = _Snapshot(protos)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._snapshot.protocols)
+
+    def __iter__(self):
+        return iter(self._snapshot.protocols)
 
-    PROTOCOLS.append(proto)
-    _names_to_protocols[proto.name] = proto
-    _codes_to_protocols[proto.code] = proto
+    def __contains__(self, proto):
+        return self._snapshot.codes.get(getattr(proto, "code", None)) is proto
+
+    def __repr__(self):
+        return "<ProtocolRegistry of {0} protocols>".format(len(self))
+
+    def __reduce__(self):
+        # The lock cannot be pickled, and compiled dispatch entries are only
+        # a cache, so just keep the protocols
+        return self.__class__, (self.protocols,)
+
+    @property
+    def protocols(self):
+        """Tuple of all registered protocols, in registration order."""
+        return self._snapshot.protocols
+
+    def copy(self):
+        """Return a new registry initially containing the same protocols."""
+        result = ProtocolRegistry()
+        result._snapshot = self._snapshot
+        return result
+
+    def add(self, proto):
+        """Register the given protocol.
+
+        Raises :class:`~multiaddr.exceptions.ProtocolExistsError` if a
+        protocol with the same name or code is already registered, and
+        :class:`ValueError` if its code cannot be varint-encoded."""
+        with self._lock:
+            self._snapshot = self._snapshot.with_protocol(proto)
+
+    def with_name(self, name):
+        name = str(name)  # PY2: Convert Unicode strings to native/binary representation
+        proto = self._snapshot.names.get(name)
+        if proto is None:
+            raise exceptions.ProtocolNotFoundError(name, "name")
+        return proto
+
+    def with_code(self, code):
+        proto = self._snapshot.codes.get(code)
+        if proto is None:
+            raise exceptions.ProtocolNotFoundError(code, "code")
+        return proto
+
+    def with_any(self, proto):
+        if isinstance(proto, Protocol):
+            return proto
+        elif isinstance(proto, int):
+            return self.with_code(proto)
+        elif isinstance(proto, six.string_types):
+            return self.with_name(proto)
+        else:
+            raise TypeError("Protocol object, name or code expected, got {0!r}".format(proto))
+
+    def dispatch_with_name(self, name):
+        """Return the :class:`ProtocolDispatch` entry of the protocol with
+        the given name.
+
+        Raises :class:`~multiaddr.exceptions.ProtocolNotFoundError` for
+        unknown protocols and :class:`ImportError` if the protocol's codec is
+        missing."""
+        snapshot = self._snapshot
+        entry = snapshot.names_dispatch.get(name)
+        if entry is None:
+            proto = snapshot.names.get(str(name))
+            if proto is None:
+                raise exceptions.ProtocolNotFoundError(name, "name")
+            entry = snapshot.compile(proto)
+        return entry
+
+    def dispatch_with_code(self, code):
+        """Return the :class:`ProtocolDispatch` entry of the protocol with
+        the given code.
+
+        Raises :class:`~multiaddr.exceptions.ProtocolNotFoundError` for
+        unknown protocols and :class:`ImportError` if the protocol's codec is
+        missing."""
+        snapshot = self._snapshot
+        entry = snapshot.codes_dispatch.get(code)
+        if entry is None:
+            proto = snapshot.codes.get(code)
+            if proto is None:
+                raise exceptions.ProtocolNotFoundError(code, "code")
+            entry = snapshot.compile(proto)
+        return entry
+
+
+#: The global registry used by default
+REGISTRY = ProtocolRegistry(PROTOCOLS)
+
+
+def _dispatch_for(proto):
+    snapshot = REGISTRY._snapshot
+    entry = snapshot.codes_dispatch.get(proto.code)
+    if entry is not None and entry.proto is proto:
+        return entry
+    if snapshot.codes.get(proto.code) is proto:
+        return snapshot.compile(proto)
+    # Not a protocol of the global registry – resolve without caching
+    return ProtocolDispatch(proto)
+
+
+def add_protocol(proto):
+    registry = REGISTRY
+    with registry._lock:
+        registry._snapshot = registry._snapshot.with_protocol(proto)
+        PROTOCOLS.append(proto)
     return None
 
 
 def protocol_with_name(name):
-    name = str(name)  # PY2: Convert Unicode strings to native/binary representation
-    if name not in _names_to_protocols:
-        raise exceptions.ProtocolNotFoundError(name, "name")
-    return _names_to_protocols[name]
+    return REGISTRY.with_name(name)
 
 
 def protocol_with_code(code):
-    if code not in _codes_to_protocols:
-        raise exceptions.ProtocolNotFoundError(code, "code")
-    return _codes_to_protocols[code]
+    return REGISTRY.with_code(code)
+
+
+def dispatch_with_name(name):
+    """Return the :class:`ProtocolDispatch` entry of the protocol with the
+    given name, see :meth:`ProtocolRegistry.dispatch_with_name`."""
+    return REGISTRY.dispatch_with_name(name)
+
+
+def dispatch_with_code(code):
+    """Return the :class:`ProtocolDispatch` entry of the protocol with the
+    given code, see :meth:`ProtocolRegistry.dispatch_with_code`."""
+    return REGISTRY.dispatch_with_code(code)
 
 
 def protocol_with_any(proto):
-    if isinstance(proto, Protocol):
-        return proto
-    elif isinstance(proto, int):
-        return protocol_with_code(proto)
-    elif isinstance(proto, six.string_types):
-        return protocol_with_name(proto)
-    else:
-        raise TypeError("Protocol object, name or code expected, got {0!r}".format(proto))
+    return REGISTRY.with_any(proto)
 
 
 def protocols_with_string(string):
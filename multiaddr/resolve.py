@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""Asynchronous DNS resolution of Multiaddrs (Python 3.5+ only).
+
+:func:`resolve` expands the ``dns``, ``dns4``, ``dns6`` and ``dnsaddr``
+components of an address into concrete ``ip4``/``ip6`` addresses::
+
+    >>> await resolve(Multiaddr("/dnsaddr/bootstrap.libp2p.io"))
+    [<Multiaddr /ip4/147.75.83.83/tcp/4001/p2p/Qm...>, ...]
+
+``dnsaddr`` names are looked up as ``TXT`` records of ``_dnsaddr.<name>``
+containing ``dnsaddr=<multiaddr>`` entries, which are resolved recursively
+up to a depth limit. If the ``dnsaddr`` component is followed by further
+components (usually ``/p2p/<peer-id>``), only records ending with those same
+components are used.
+
+Lookups are run concurrently (up to a configurable limit), identical lookups
+in flight are shared and results are cached for the TTL of their records.
+The actual DNS queries are delegated to a backend object, see
+:class:`SystemBackend` for the interface.
+
+This module is not imported by :mod:`multiaddr` itself, as it requires
+Python 3.5 or newer.
+"""
+import asyncio
+import socket
+import time
+
+from . import exceptions
+from . import protocols
+from .cache import LRUCache
+from .multiaddr import Multiaddr
+
+
+__all__ = ("resolve", "Resolver", "SystemBackend")
+
+
+#: TTL in seconds used for results whose actual TTL is unknown
+DEFAULT_TTL = 60.0
+
+#: Default maximum number of lookups performed at the same time
+MAX_CONCURRENCY = 16
+
+#: Default maximum number of nested ``dnsaddr`` lookups
+MAX_DEPTH = 8
+
+_FAMILIES = {
+    protocols.P_DNS: socket.AF_UNSPEC,
+    protocols.P_DNS4: socket.AF_INET,
+    protocols.P_DNS6: socket.AF_INET6,
+}
+
+_DNSADDR_PREFIX = "dnsaddr="
+
+# `asyncio.get_event_loop()` returns the running loop within coroutines on
+# the Python versions lacking `get_running_loop()`
+_running_loop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)
+
+
+class SystemBackend(object):
+    """Default DNS backend.
+
+    Host names are resolved through the event loop's ``getaddrinfo``, which
+    does not report TTLs, so these results are cached for `ttl` seconds.
+    ``TXT`` lookups (needed for ``dnsaddr``) require the optional `aiodns`
+    package.
+
+    Custom backends implement the same two coroutine methods, returning
+    lists of ``(value, ttl)`` tuples and raising
+    :class:`~multiaddr.exceptions.ResolutionError` on failure."""
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._aiodns = None
+        self._dns = None
+        self._dns_loop = None
+
+    async def lookup_ip(self, host, family):
+        """Return the IP addresses of `host` of the given address family
+        (``AF_INET``, ``AF_INET6`` or ``AF_UNSPEC``) as strings. IPv6
+        addresses may carry a ``%zone`` suffix."""
+        loop = _running_loop()
+        try:
+            infos = await loop.getaddrinfo(host, None, family=family, type=socket.SOCK_STREAM)
+        except socket.gaierror as exc:
+            raise exceptions.ResolutionError(exc.strerror or str(exc), host, exc) from exc
+        return [(info[4][0], self.ttl) for info in infos]
+
+    async def lookup_txt(self, name):
+        """Return the ``TXT`` record strings of `name`."""
+        if self._aiodns is None:
+            try:
+                import aiodns
+            except ImportError as exc:
+                raise exceptions.ResolutionError(
+                    "TXT lookups require the `aiodns` package", name, exc,
+                ) from exc
+            self._aiodns = aiodns
+        loop = _running_loop()
+        if self._dns_loop is not loop:
+            # Resolvers are bound to the event loop they were created in
+            self._dns = self._aiodns.DNSResolver(loop=loop)
+            self._dns_loop = loop
+        try:
+            records = await self._dns.query(name, "TXT")
+        except self._aiodns.error.DNSError as exc:
+            raise exceptions.ResolutionError(str(exc), name, exc) from exc
+        return [
+            (r.text.decode("utf-8") if isinstance(r.text, bytes) else r.text, r.ttl)
+            for r in records
+        ]
+
+
+def _unique(values):
+    seen = set()
+    return [value for value in values if not (value in seen or seen.add(value))]
+
+
+def _ip_bytes(address):
+    if ":" not in address:
+        return Multiaddr("/ip4/" + address).to_bytes()
+    address, _, zone = address.partition("%")
+    if zone:
+        return Multiaddr("/ip6zone/{0}/ip6/{1}".format(zone, address)).to_bytes()
+    return Multiaddr("/ip6/" + address).to_bytes()
+
+
+def _endswith(addr, components):
+    tail = addr._components()[-len(components):]
+    return len(tail) == len(components) and all(
+        a[1].code == b[1].code and a[3] == b[3] for a, b in zip(tail, components)
+    )
+
+
+class Resolver(object):
+    """Resolves the DNS components of Multiaddrs.
+
+    `backend` performs the actual lookups (:class:`SystemBackend` by
+    default), at most `max_concurrency` of them at the same time. Results
+    are kept in an LRU cache of `cache_size` entries until their TTL
+    expires, as measured by `clock`."""
+
+    def __init__(self, backend=None, max_concurrency=MAX_CONCURRENCY, max_depth=MAX_DEPTH,
+                 cache_size=1024, clock=time.monotonic):
+        self.backend = backend if backend is not None else SystemBackend()
+        self.max_depth = max_depth
+        self._max_concurrency = max_concurrency
+        # Loop-bound state, (re)created on first use within each event loop
+        self._loop = None
+        self._semaphore = None
+        self._pending = {}
+        self._cache = LRUCache(cache_size)
+        self._clock = clock
+
+    def cache_info(self):
+        """Return the statistics of the lookup cache as a
+        :class:`~multiaddr.cache.CacheInfo`."""
+        return self._cache.info()
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    async def resolve(self, addr):
+        """Return the list of addresses `addr` resolves to.
+
+        Addresses without DNS components resolve to themselves; names
+        without any matching records resolve to an empty list. Raises
+        :class:`~multiaddr.exceptions.ResolutionError` if a lookup fails or
+        ``dnsaddr`` records are nested deeper than `max_depth`."""
+        if not isinstance(addr, Multiaddr):
+            addr = Multiaddr(addr)
+        return _unique(await self._resolve(addr, 0))
+
+    async def resolve_many(self, addrs):
+        """Resolve all given addresses concurrently and return a list with
+        the result of each."""
+        return list(await asyncio.gather(*[self.resolve(addr) for addr in addrs]))
+
+    async def _resolve(self, addr, depth):
+        parts = addr._components()
+        for idx, component in enumerate(parts):
+            if component[1].code in _FAMILIES or component[1].code == protocols.P_DNSADDR:
+                break
+        else:
+            return [addr]
+
+        data = addr.to_bytes()
+        end = parts[idx + 1][0] if idx + 1 < len(parts) else len(data)
+        prefix, suffix = data[:component[0]], data[end:]
+        name = addr._value_of(component)
+
+        if component[1].code == protocols.P_DNSADDR:
+            if depth >= self.max_depth:
+                raise exceptions.ResolutionError("Too many nested dnsaddr records", name)
+            addrs = []
+            for text in await self._lookup("txt", "_dnsaddr." + name, None):
+                if not text.startswith(_DNSADDR_PREFIX):
+                    continue
+                try:
+                    record = Multiaddr(text[len(_DNSADDR_PREFIX):])
+                except exceptions.ParseError:
+                    continue  # Skip malformed records instead of failing the whole lookup
+                if suffix and not _endswith(record, parts[idx + 1:]):
+                    continue
+                addrs.append(Multiaddr(prefix + record.to_bytes()))
+            depth += 1
+        else:
+            addresses = await self._lookup("ip", name, _FAMILIES[component[1].code])
+            addrs = [Multiaddr(prefix + _ip_bytes(address) + suffix) for address in addresses]
+
+        # Resolved addresses may contain further DNS components
+        results = await asyncio.gather(*[self._resolve(addr, depth) for addr in addrs])
+        return [addr for result in results for addr in result]
+
+    async def _lookup(self, kind, name, family):
+        key = (kind, name, family)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > self._clock():
+            return cached[1]
+
+        loop = _running_loop()
+        if loop is not self._loop:
+            # Semaphores and tasks cannot be shared across event loops, so
+            # start over whenever the resolver is used from another one
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+            self._pending = {}
+
+        # Share lookups already in flight instead of repeating them
+        pending = self._pending
+        task = pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._query(key, self._semaphore))
+            pending[key] = task
+            task.add_done_callback(lambda _: pending.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _query(self, key, semaphore):
+        kind, name, family = key
+        async with semaphore:
+            if kind == "ip":
+                records = await self.backend.lookup_ip(name, family)
+            else:
+                records = await self.backend.lookup_txt(name)
+
+        values = tuple(_unique(value for value, _ in records))
+        if records:
+            ttl = min(ttl for _, ttl in records)
+            if ttl > 0:
+                self._cache.put(key, (self._clock() + ttl, values))
+        return values
+
+
+_default_resolver = None
+
+
+async def resolve(addr, resolver=None):
+    """Resolve `addr` using `resolver`, or a shared default
+    :class:`Resolver` if not given; see :meth:`Resolver.resolve`."""
+    global _default_resolver
+    if resolver is None:
+        if _default_resolver is None:
+            _default_resolver = Resolver()
+        resolver = _default_resolver
+    return await resolver.resolve(addr)
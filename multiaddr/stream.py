@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""Reading and writing streams of varint length-prefixed binary Multiaddrs.
+
+This is the framing used by peer exchange messages and peerstores, and by
+:meth:`multiaddr.packed.MultiaddrArray.to_bytes`. Streams are consumed in
+chunks, so memory use stays bounded by the chunk size plus one frame no
+matter how long the stream is::
+
+    >>> with open("peers.bin", "rb") as file:
+    ...     for addr in read_stream(file):
+    ...         print(addr)
+
+With ``components=True`` the readers yield the ``(offset, proto, codec,
+part)`` component tuples of :func:`multiaddr.transforms.bytes_iter` instead
+of Multiaddr objects. Splitting frames into components already checks their
+structure (known protocol codes, complete values), but like Multiaddr objects
+(and ``Multiaddr(bytes)``) the values themselves are only checked once they
+are decoded.
+
+On Python 3.5+ :func:`read_stream_async` and :func:`write_stream_async`
+provide the same for :mod:`asyncio` streams.
+"""
+import sys
+
+import six
+
+from . import _varint
+from . import exceptions
+from .multiaddr import Multiaddr
+from .packed import _addr_bytes
+from .transforms import bytes_iter
+
+
+__all__ = ("FrameDecoder", "encode_frame", "read_stream", "write_stream")
+
+
+#: Default upper bound on the size of a single frame, protecting readers
+#: against corrupt or hostile length prefixes
+MAX_FRAME_SIZE = 64 * 1024
+
+#: Default number of bytes requested from the stream at once
+CHUNK_SIZE = 64 * 1024
+
+
+def encode_frame(addr):
+    """Return the varint length-prefixed binary representation of the given
+    Multiaddr (or string or binary Multiaddr representation)."""
+    data = _addr_bytes(addr)
+    return _varint.encode(len(data)) + data
+
+
+class FrameDecoder(object):
+    """Incremental decoder for streams of length-prefixed Multiaddrs.
+
+    Chunks of arbitrary size are passed to :meth:`feed`, which returns the
+    items completed by that chunk; partial frames are kept until the rest of
+    them arrives. Call :meth:`close` at the end of the stream to detect
+    truncated input.
+
+    A frame that cannot be decoded is dropped when raising the error for it,
+    so decoding may resume with the next frame; the items completed before it
+    are returned by the next call to :meth:`feed`. Invalid or excessive
+    length prefixes make it impossible to find the next frame, so they drop
+    all buffered input instead."""
+
+    __slots__ = ("_buf", "_components", "_max_size", "_ready")
+
+    def __init__(self, components=False, max_size=MAX_FRAME_SIZE):
+        self._buf = bytearray()
+        self._components = components
+        self._max_size = max_size
+        self._ready = []
+
+    @property
+    def pending(self):
+        """Number of buffered bytes not yet decoded into an item."""
+        return len(self._buf)
+
+    def feed(self, data):
+        buf = self._buf
+        buf.extend(data)
+
+        items = self._take_ready()
+        pos = 0
+        length = len(buf)
+        try:
+            while pos < length:
+                try:
+                    size, start = _varint.decode(buf, pos)
+                except IndexError:
+                    break  # Wait for the rest of the length prefix
+                except ValueError as exc:
+                    pos = length
+                    six.raise_from(
+                        exceptions.BinaryParseError("Invalid length prefix", bytes(buf), None),
+                        exc,
+                    )
+                if self._max_size is not None and size > self._max_size:
+                    header = bytes(buf[pos:start])
+                    pos = length
+                    raise exceptions.BinaryParseError(
+                        "Frame of {0} bytes exceeds the limit of {1} bytes".format(
+                            size, self._max_size,
+                        ),
+                        header, None,
+                    )
+                end = start + size
+                if end > length:
+                    break
+                frame = bytes(buf[start:end])
+                pos = end  # Consume the frame even if it turns out to be invalid
+                items.append(self._decode(frame))
+        except Exception:
+            self._ready = items
+            raise
+        finally:
+            del buf[:pos]
+        return items
+
+    def _take_ready(self):
+        """Return (and forget) the items decoded before the last error."""
+        items, self._ready = self._ready, []
+        return items
+
+    def close(self):
+        if self._buf:
+            data = bytes(self._buf)
+            del self._buf[:]
+            raise exceptions.BinaryParseError("Truncated Multiaddr stream", data, None)
+
+    def _decode(self, data):
+        if self._components:
+            return tuple(bytes_iter(data))
+        return Multiaddr(data)
+
+
+def _reader(stream):
+    read = getattr(stream, "read", None)
+    if read is None:
+        read = getattr(stream, "recv", None)
+    if read is None:
+        raise TypeError("Stream must be a binary file object or a socket")
+    return read
+
+
+def read_stream(stream, components=False, chunk_size=CHUNK_SIZE, max_size=MAX_FRAME_SIZE):
+    """Yield the Multiaddrs (or component tuples) read from the given binary
+    file object or socket until it is exhausted.
+
+    Raises :class:`~multiaddr.exceptions.BinaryParseError` if the stream
+    ends within a frame or announces a frame larger than `max_size`."""
+    read = _reader(stream)
+    decoder = FrameDecoder(components, max_size)
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        try:
+            items = decoder.feed(chunk)
+        except exceptions.BinaryParseError:
+            exc_info = sys.exc_info()
+            # Still hand out the items preceding the invalid frame
+            for item in decoder._take_ready():
+                yield item
+            six.reraise(*exc_info)
+        for item in items:
+            yield item
+    decoder.close()
+
+
+def write_stream(stream, addrs):
+    """Write the given Multiaddrs to the binary file object or socket
+    `stream` and return the number of bytes written."""
+    write = getattr(stream, "write", None)
+    if write is None:
+        write = getattr(stream, "sendall", None)
+    if write is None:
+        raise TypeError("Stream must be a binary file object or a socket")
+
+    written = 0
+    for addr in addrs:
+        frame = encode_frame(addr)
+        write(frame)
+        written += len(frame)
+    return written
+
+
+if sys.version_info >= (3, 5):
+    from ._stream_async import read_stream_async  # NOQA
+    from ._stream_async import write_stream_async  # NOQA
+
+    __all__ += ("read_stream_async", "write_stream_async")
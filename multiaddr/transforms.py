@@ -1,103 +1,298 @@
 # -*- encoding: utf-8 -*-
-import io
 import six
-import varint
 
+from . import _varint
 from . import exceptions
+from .cache import LRUCache
 
 from .codecs import LENGTH_PREFIXED_VAR_SIZE
-from .codecs import codec_by_name
 
+from .protocols import dispatch_with_code
+from .protocols import dispatch_with_name
 from .protocols import protocol_with_code
-from .protocols import protocol_with_name
 
 
-def string_to_bytes(string):
-    bs = []
-    for proto, codec, value in string_iter(string):
-        bs.append(varint.encode(proto.code))
+# Opt-in caches for text↔binary conversion results, see `set_cache_size`
+_string_cache = None
+_bytes_cache = None
+
+
+def set_cache_size(capacity):
+    """Enable caching of :func:`string_to_bytes` and :func:`bytes_to_string`
+    results for up to `capacity` distinct inputs each (dropping the least
+    recently used ones first), or disable caching if `capacity` is ``None``
+    or ``0``.
+
+    Only successful conversions are cached. Changing the size of enabled caches
+    keeps their current contents and statistics."""
+    global _string_cache, _bytes_cache
+    if not capacity:
+        _string_cache = _bytes_cache = None
+    elif _string_cache is None:
+        _string_cache = LRUCache(capacity)
+        _bytes_cache = LRUCache(capacity)
+    else:
+        _string_cache.capacity = _bytes_cache.capacity = capacity
+
+
+def cache_info():
+    """Return a ``(string_to_bytes, bytes_to_string)`` tuple of
+    :class:`~multiaddr.cache.CacheInfo` statistics, or ``None`` if caching
+    is not enabled."""
+    if _string_cache is None:
+        return None
+    return _string_cache.info(), _bytes_cache.info()
+
+
+def string_to_bytes(string, registry=None):
+    """Encode the given Multiaddr string, using the protocols of the given
+    :class:`~multiaddr.protocols.ProtocolRegistry` rather than those of the
+    global one if passed (which also bypasses the conversion cache)."""
+    cache = _string_cache
+    if cache is None or registry is not None:
+        return _string_to_bytes(string, registry)
+    buf = cache.get(string)
+    if buf is None:
+        buf = _string_to_bytes(string)
+        cache.put(string, buf)
+    return buf
+
+
+def bytes_to_string(buf, registry=None):
+    """Decode the given binary Multiaddr, see :func:`string_to_bytes` for
+    `registry`."""
+    cache = _bytes_cache
+    if cache is None or registry is not None:
+        return _bytes_to_string(buf, registry)
+    if not isinstance(buf, six.binary_type):
+        buf = six.binary_type(buf)
+    string = cache.get(buf)
+    if string is None:
+        string = _bytes_to_string(buf)
+        cache.put(buf, string)
+    return string
+
+
+def _string_to_bytes(string, registry=None):
+    # Components are appended to a single buffer as they are encoded
+    result = bytearray()
+    for entry, value in _string_dispatch_iter(string, registry):
+        result += entry.vcode
         if value is not None:
             try:
-                buf = codec.to_bytes(proto, value)
+                buf = entry.to_bytes(entry.proto, value)
             except Exception as exc:
-                six.raise_from(exceptions.StringParseError(str(exc), string, proto.name, exc), exc)
-            if codec.SIZE == LENGTH_PREFIXED_VAR_SIZE:
-                bs.append(varint.encode(len(buf)))
-            bs.append(buf)
-    return b''.join(bs)
+                six.raise_from(
+                    exceptions.StringParseError(str(exc), string, entry.proto.name, exc),
+                    exc,
+                )
+            if entry.size == LENGTH_PREFIXED_VAR_SIZE:
+                result += _varint.encode(len(buf))
+            result += buf
+    return bytes(result)
 
 
-def bytes_to_string(buf):
+def _bytes_to_string(buf, registry=None):
     st = [u'']  # start with empty string so we get a leading slash on join()
-    for _, proto, codec, part in bytes_iter(buf):
-        st.append(proto.name)
-        if codec.SIZE != 0:
+    for _, entry, part in _bytes_dispatch_iter(buf, registry):
+        st.append(entry.proto.name)
+        if entry.size != 0:
             try:
-                value = codec.to_string(proto, part)
+                value = entry.to_string(entry.proto, part)
             except Exception as exc:
-                six.raise_from(exceptions.BinaryParseError(str(exc), buf, proto.name, exc), exc)
-            if codec.IS_PATH and value[0] == u'/':
+                six.raise_from(
+                    exceptions.BinaryParseError(str(exc), buf, entry.proto.name, exc),
+                    exc,
+                )
+            if entry.path and value[0] == u'/':
                 st.append(value[1:])
             else:
                 st.append(value)
     return u'/'.join(st)
 
 
+class ShapeEncoder(object):
+    """Encodes many address strings, caching the protocol lookups for every
+    distinct address “shape” (sequence of protocol names) encountered.
+
+    Addresses made up only of protocols taking exactly one (non-path) value,
+    like ``/ip4/…/tcp/…/p2p/…``, are encoded in a single pass using the
+    cached shape; everything else, as well as any address that fails to
+    encode that way, goes through :func:`string_to_bytes`, so results and
+    errors are always identical to it."""
+
+    __slots__ = ("_shapes", "_registry")
+
+    def __init__(self, registry=None):
+        self._shapes = {}
+        self._registry = registry
+
+    def encode(self, string):
+        if string.startswith(u'/'):
+            sp = string.rstrip(u'/').split(u'/')
+            if len(sp) % 2 == 1:
+                entries = self._shape(tuple(sp[1::2]))
+                if entries is not None:
+                    try:
+                        return self._encode(entries, sp[2::2])
+                    except Exception:
+                        pass  # Let the generic path report the error
+        return string_to_bytes(string, self._registry)
+
+    def _shape(self, names):
+        try:
+            return self._shapes[names]
+        except KeyError:
+            pass
+
+        lookup = dispatch_with_name if self._registry is None else self._registry.dispatch_with_name
+        entries = []
+        try:
+            for name in names:
+                entry = lookup(name)
+                if entry.size == 0 or entry.path:
+                    entries = None
+                    break
+                entries.append(entry)
+        except (ImportError, exceptions.ProtocolNotFoundError):
+            entries = None
+        if entries is not None:
+            entries = tuple(entries)
+        self._shapes[names] = entries
+        return entries
+
+    @staticmethod
+    def _encode(entries, values):
+        bs = []
+        for entry, value in zip(entries, values):
+            buf = entry.to_bytes(entry.proto, value)
+            bs.append(entry.vcode)
+            if entry.size == LENGTH_PREFIXED_VAR_SIZE:
+                bs.append(_varint.encode(len(buf)))
+            bs.append(buf)
+        return b''.join(bs)
+
+
 def size_for_addr(codec, buf_io):
     if codec.SIZE >= 0:
         return codec.SIZE // 8
     else:
-        return varint.decode_stream(buf_io)
+        return _varint.decode_stream(buf_io)
 
 
-def string_iter(string):
+def string_iter(string, registry=None):
+    for entry, value in _string_dispatch_iter(string, registry):
+        yield entry.proto, entry.codec, value
+
+
+def _string_dispatch_iter(string, registry=None):
+    """Tokenize the given Multiaddr string in a single pass.
+
+    Every protocol name and value is sliced directly out of `string` by
+    searching for the next separator from the current position, so the work
+    done is linear in the length of the string no matter how many
+    components it has."""
+    lookup = dispatch_with_name if registry is None else registry.dispatch_with_name
+
     if not string.startswith(u'/'):
         raise exceptions.StringParseError("Must begin with /", string)
     # consume trailing slashes
     string = string.rstrip(u'/')
-    sp = string.split(u'/')
+    length = len(string)
+    find = string.find
 
-    # skip the first element, since it starts with /
-    sp.pop(0)
-    while sp:
-        element = sp.pop(0)
+    pos = 1  # skip the leading slash
+    while pos < length:
+        end = find(u'/', pos)
+        if end < 0:
+            end = length
+        element = string[pos:end]
         try:
-            proto = protocol_with_name(element)
-            codec = codec_by_name(proto.codec)
+            entry = lookup(element)
         except (ImportError, exceptions.ProtocolNotFoundError) as exc:
             six.raise_from(exceptions.StringParseError("Unknown Protocol", string, element), exc)
         value = None
-        if codec.SIZE != 0:
-            if len(sp) < 1:
-                raise exceptions.StringParseError("Protocol requires address", string, proto.name)
-            if codec.IS_PATH:
-                value = "/" + "/".join(sp)
-                if not six.PY2:
-                    sp.clear()
-                else:  # pragma: no cover (PY2)
-                    sp = []
+        if entry.size != 0:
+            if end >= length:
+                raise exceptions.StringParseError(
+                    "Protocol requires address", string, entry.proto.name
+                )
+            if entry.path:
+                # The value is the remainder of the string, including its slash
+                value = string[end:]
+                end = length
             else:
-                value = sp.pop(0)
-        yield proto, codec, value
+                start = end + 1
+                end = find(u'/', start)
+                if end < 0:
+                    end = length
+                value = string[start:end]
+        yield entry, value
+        pos = end + 1
+
 
+if six.PY2:  # pragma: no cover (PY2)
+    # Indexing a PY2 `memoryview` yields 1-character strings rather than
+    # integers, so fall back to a (copying) `bytearray` there
+    _buffer_view = bytearray
+else:
+    _buffer_view = memoryview
 
-def bytes_iter(buf):
-    buf_io = io.BytesIO(buf)
-    while buf_io.tell() < len(buf):
-        offset = buf_io.tell()
-        code = varint.decode_stream(buf_io)
-        proto = None
+
+def bytes_iter(buf, registry=None):
+    """Iterate over the ``(offset, proto, codec, part)`` components of the
+    given binary Multiaddr, using the protocols of `registry` if given.
+
+    `buf` may be any bytes-like object; the yielded `part` values are
+    `memoryview` slices of it, so no component data is copied."""
+    for offset, entry, part in _bytes_dispatch_iter(buf, registry):
+        yield offset, entry.proto, entry.codec, part
+
+
+def _bytes_dispatch_iter(buf, registry=None):
+    if registry is None:
+        lookup, lookup_proto = dispatch_with_code, protocol_with_code
+    else:
+        lookup, lookup_proto = registry.dispatch_with_code, registry.with_code
+    view = _buffer_view(buf)
+    length = len(view)
+    pos = 0
+    while pos < length:
+        offset = pos
+        code = None
         try:
-            proto = protocol_with_code(code)
-            codec = codec_by_name(proto.codec)
-        except (ImportError, exceptions.ProtocolNotFoundError) as exc:
+            code, pos = _varint.decode(view, pos)
+            entry = lookup(code)
+        except IndexError as exc:
+            six.raise_from(
+                exceptions.BinaryParseError("Truncated protocol code", buf, None),
+                exc,
+            )
+        except ValueError as exc:
+            six.raise_from(exceptions.BinaryParseError(str(exc), buf, None), exc)
+        except exceptions.ProtocolNotFoundError as exc:
+            six.raise_from(exceptions.BinaryParseError("Unknown Protocol", buf, code), exc)
+        except ImportError as exc:
             six.raise_from(
                 exceptions.BinaryParseError(
-                    "Unknown Protocol",
-                    buf,
-                    proto.name if proto else code,
+                    "Unknown Protocol", buf, lookup_proto(code).name
                 ),
                 exc,
             )
-        size = size_for_addr(codec, buf_io)
-        yield offset, proto, codec, buf_io.read(size)
+        if entry.size >= 0:
+            size = entry.size // 8
+        else:
+            try:
+                size, pos = _varint.decode(view, pos)
+            except IndexError as exc:
+                six.raise_from(
+                    exceptions.BinaryParseError("Truncated value length", buf, entry.proto.name),
+                    exc,
+                )
+            except ValueError as exc:
+                six.raise_from(exceptions.BinaryParseError(str(exc), buf, entry.proto.name), exc)
+        end = pos + size
+        if end > length:
+            raise exceptions.BinaryParseError("Truncated value", buf, entry.proto.name)
+        yield offset, entry, view[pos:end]
+        pos = end
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+try:
+    import collections.abc
+except ImportError:  # pragma: no cover (PY2)
+    import collections
+    collections.abc = collections
+
+import six
+
+from . import exceptions
+from . import protocols
+from .multiaddr import Multiaddr
+
+
+__all__ = ("MultiaddrTrie",)
+
+
+class _Node(object):
+    __slots__ = (
+        "children",  # dict: protocol code → dict: raw value → _Node
+        "addr",      # Multiaddr ending at this node or None
+    )
+
+    def __init__(self):
+        self.children = {}
+        self.addr = None
+
+    def iter_addrs(self):
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.addr is not None:
+                yield node.addr
+            for values in node.children.values():
+                stack.extend(values.values())
+
+
+def _key(component):
+    _, proto, _, part = component
+    return proto.code, six.binary_type(part)
+
+
+class MultiaddrTrie(collections.abc.MutableSet):
+    """Set of Multiaddrs indexed by their sequence of components.
+
+    Addresses sharing leading components share the corresponding trie nodes,
+    so that all addresses below a given prefix, the longest stored prefix of
+    an address, or all addresses whose protocol stack starts in a certain way
+    can be found without scanning the whole set::
+
+        >>> trie = MultiaddrTrie([Multiaddr("/ip4/10.0.0.1/tcp/4001")])
+        >>> list(trie.startswith("/ip4/10.0.0.1"))
+        [<Multiaddr /ip4/10.0.0.1/tcp/4001>]
+        >>> list(trie.walk([("ip4", lambda raw: raw[0] == 10), "tcp"]))
+        [<Multiaddr /ip4/10.0.0.1/tcp/4001>]
+    """
+
+    __slots__ = ("_root", "_len")
+
+    def __init__(self, addrs=()):
+        self._root = _Node()
+        self._len = 0
+        for addr in addrs:
+            self.add(addr)
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return self._root.iter_addrs()
+
+    def __contains__(self, addr):
+        # Accept the same values as `add`, anything invalid is no member
+        try:
+            if not isinstance(addr, Multiaddr):
+                addr = Multiaddr(addr)
+            node = self._find(addr)
+        except (TypeError, exceptions.ParseError):
+            return False
+        return node is not None and node.addr is not None
+
+    def __repr__(self):
+        return "<MultiaddrTrie {0!r}>".format(list(self))
+
+    def add(self, addr):
+        if not isinstance(addr, Multiaddr):
+            addr = Multiaddr(addr)
+        node = self._root
+        for component in addr._components():
+            code, value = _key(component)
+            values = node.children.get(code)
+            if values is None:
+                values = node.children[code] = {}
+            child = values.get(value)
+            if child is None:
+                child = values[value] = _Node()
+            node = child
+        if node.addr is None:
+            self._len += 1
+        node.addr = addr
+
+    def discard(self, addr):
+        if not isinstance(addr, Multiaddr):
+            addr = Multiaddr(addr)
+
+        # Remember the path so that branches left empty can be pruned
+        path = []
+        node = self._root
+        for component in addr._components():
+            code, value = _key(component)
+            child = node.children.get(code, {}).get(value)
+            if child is None:
+                return
+            path.append((node, code, value))
+            node = child
+        if node.addr is None:
+            return
+        node.addr = None
+        self._len -= 1
+
+        while path and node.addr is None and not node.children:
+            parent, code, value = path.pop()
+            values = parent.children[code]
+            del values[value]
+            if not values:
+                del parent.children[code]
+            node = parent
+
+    def startswith(self, prefix):
+        """Yield all stored Multiaddrs whose leading components are exactly
+        those of `prefix`."""
+        if not isinstance(prefix, Multiaddr):
+            prefix = Multiaddr(prefix)
+        node = self._find(prefix)
+        if node is not None:
+            for addr in node.iter_addrs():
+                yield addr
+
+    def longest_prefix(self, addr):
+        """Return the stored Multiaddr with the most components that forms a
+        prefix of `addr` (possibly `addr` itself), or ``None``."""
+        if not isinstance(addr, Multiaddr):
+            addr = Multiaddr(addr)
+        node = self._root
+        best = node.addr
+        for component in addr._components():
+            code, value = _key(component)
+            node = node.children.get(code, {}).get(value)
+            if node is None:
+                break
+            if node.addr is not None:
+                best = node.addr
+        return best
+
+    def walk(self, steps):
+        """Yield all stored Multiaddrs whose leading components match the given
+        steps.
+
+        Each step is either ``"*"`` matching any component, a protocol (name,
+        code or object) matching any value of that protocol, or a
+        ``(protocol, value)`` tuple where `value` is ``None`` (any value),
+        a string-encoded value or a predicate called with the raw binary
+        value."""
+        nodes = [self._root]
+        for step in steps:
+            if step == "*":
+                nodes = [
+                    child
+                    for node in nodes
+                    for values in node.children.values()
+                    for child in values.values()
+                ]
+                continue
+
+            if isinstance(step, tuple):
+                proto, value = step
+            else:
+                proto, value = step, None
+            proto = protocols.protocol_with_any(proto)
+            if isinstance(value, six.string_types):
+                value = protocols.dispatch_with_code(proto.code).to_bytes(proto, value)
+
+            matched = []
+            for node in nodes:
+                values = node.children.get(proto.code)
+                if not values:
+                    continue
+                if value is None:
+                    matched.extend(values.values())
+                elif callable(value):
+                    matched.extend(child for raw, child in values.items() if value(raw))
+                elif value in values:
+                    matched.append(values[value])
+            nodes = matched
+
+        for node in nodes:
+            for addr in node.iter_addrs():
+                yield addr
+
+    def _find(self, addr):
+        node = self._root
+        for component in addr._components():
+            code, value = _key(component)
+            node = node.children.get(code, {}).get(value)
+            if node is None:
+                return None
+        return node
@@ -1,11 +1,17 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+import ast
+import os
+import warnings
+
 import setuptools
 
 try:
     from setuptools import setup
+    from setuptools.command.build_ext import build_ext
 except ImportError:
     from distutils.core import setup
+    from distutils.command.build_ext import build_ext
 
 
 with open('README.rst') as readme_file:
@@ -18,6 +24,47 @@ with open('HISTORY.rst') as history_file:
 
 version = '0.0.8'
 
+
+def read_accelerated_modules():
+    """Read `multiaddr._accel.MODULES` without importing the package, whose
+    dependencies may not be installed yet."""
+    with open(os.path.join('multiaddr', '_accel.py')) as accel_file:
+        tree = ast.parse(accel_file.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and [getattr(target, 'id', None)
+                                             for target in node.targets] == ['MODULES']:
+            return list(ast.literal_eval(node.value))
+    raise RuntimeError("No MODULES defined in multiaddr/_accel.py")
+
+
+class optional_build_ext(build_ext):
+    """Leave the pure Python version of modules in place if their extension
+    cannot be built."""
+
+    def build_extension(self, ext):
+        try:
+            build_ext.build_extension(self, ext)
+        except Exception as exc:
+            warnings.warn("Not compiling {0}: {1}".format(ext.name, exc))
+
+
+def accelerator_options():
+    """Compile the hot modules from their Python source with Cython when
+    building with MULTIADDR_COMPILE=1; see `multiaddr/_accel.py`."""
+    if os.environ.get('MULTIADDR_COMPILE') != '1':
+        return {}
+    from Cython.Build import cythonize
+
+    extensions = [
+        setuptools.Extension(name, [name.replace('.', '/') + '.py'])
+        for name in read_accelerated_modules()
+    ]
+    return {
+        'ext_modules': cythonize(extensions, compiler_directives={'language_level': '3str'}),
+        'cmdclass': {'build_ext': optional_build_ext},
+    }
+
+
 setup(
     name='multiaddr',
     version=version,
@@ -29,7 +76,9 @@ setup(
     url='https://github.com/multiformats/py-multiaddr',
     download_url=(
         'https://github.com/multiformats/py-multiaddr/tarball/%s' % version),
-    packages=setuptools.find_packages(exclude=["*.tests", "*.tests.*", "tests.*", "tests"]),
+    packages=setuptools.find_packages(exclude=[
+        "*.tests", "*.tests.*", "tests.*", "tests", "benchmarks", "benchmarks.*",
+    ]),
     package_dir={'multiaddr': 'multiaddr'},
     include_package_data=True,
     license='MIT License',
@@ -53,13 +102,18 @@ setup(
         'pytest-runner',
     ],
     install_requires=[
-        'varint',
         'six',
         'base58',
-        'netaddr',
+        # Only needed where `socket.inet_pton` is unavailable
+        'netaddr; python_version < "3" and sys_platform == "win32"',
     ],
+    extras_require={
+        # `TXT` lookups of `multiaddr.resolve` (for `dnsaddr`)
+        'dns': ['aiodns; python_version >= "3.5"'],
+    },
     test_suite='tests',
     tests_require=[
         'pytest',
     ],
+    **accelerator_options()
 )
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+import sys
+
+
+# Modules testing Python 3 only functionality using `async`/`await` syntax
+collect_ignore = ["test_resolve.py"] if sys.version_info < (3, 5) else []
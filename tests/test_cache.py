@@ -0,0 +1,30 @@
+import pytest
+
+from multiaddr.cache import CacheInfo
+from multiaddr.cache import LRUCache
+
+
+def test_lru_cache():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used entry
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.info() == CacheInfo(hits=2, misses=1, evictions=1, size=2, capacity=2)
+
+    cache.capacity = 1
+    assert len(cache) == 1 and "c" in cache
+    assert cache.info().evictions == 2
+
+    cache.clear()
+    assert cache.info() == CacheInfo(hits=0, misses=0, evictions=0, size=0, capacity=1)
+
+
+@pytest.mark.parametrize("capacity", [0, -1])
+def test_lru_cache_invalid_capacity(capacity):
+    with pytest.raises(ValueError):
+        LRUCache(capacity)
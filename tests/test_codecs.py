@@ -0,0 +1,116 @@
+# -*- encoding: utf-8 -*-
+import importlib
+import struct
+
+import pytest
+
+from multiaddr import codecs
+from multiaddr import protocols
+from multiaddr.multiaddr import Multiaddr
+
+
+@pytest.fixture
+def codec_cache(monkeypatch):
+    monkeypatch.setattr(codecs, "CODEC_CACHE", {})
+    monkeypatch.setattr(codecs, "_entry_points", None)
+
+
+class Uint32Codec(object):
+    SIZE = 32
+    IS_PATH = False
+
+    @staticmethod
+    def to_bytes(proto, string):
+        return struct.pack(">I", int(string))
+
+    @staticmethod
+    def to_string(proto, buf):
+        return str(struct.unpack(">I", buf)[0])
+
+
+class FakeEntryPoint(object):
+    def __init__(self, name, obj):
+        self.name = name
+        self.loads = 0
+        self._obj = obj
+
+    def load(self):
+        self.loads += 1
+        return self._obj
+
+
+@pytest.mark.parametrize("name", sorted(codecs.BUILTIN_CODECS))
+def test_builtin_metadata(name):
+    module = importlib.import_module("multiaddr.codecs." + name)
+    declared = codecs.BUILTIN_CODECS[name]
+    assert (module.SIZE, module.IS_PATH) == declared
+
+    codec = codecs.codec_by_name(name)
+    assert (codec.SIZE, codec.IS_PATH) == declared
+
+
+def test_lazy_codec():
+    loads = []
+
+    def load():
+        loads.append(None)
+        return Uint32Codec
+
+    codec = codecs.LazyCodec(load, 32)
+    assert (codec.SIZE, codec.IS_PATH) == (32, False)
+    assert not codec.loaded and not loads
+
+    assert codec.to_bytes(None, "258") == b"\x00\x00\x01\x02"
+    assert codec.loaded and codec.load() is Uint32Codec
+    assert codec.to_string(None, b"\x00\x00\x01\x02") == "258"
+    assert codec.to_string is Uint32Codec.to_string
+    assert len(loads) == 1
+
+
+def test_register_codec(codec_cache):
+    loads = []
+
+    def load():
+        loads.append(None)
+        return Uint32Codec
+
+    codecs.register_codec("uint32be", codecs.LazyCodec(load, 32))
+    with pytest.raises(ValueError):
+        codecs.register_codec("uint32be", Uint32Codec)
+    with pytest.raises(ValueError):
+        codecs.register_codec("ip4", Uint32Codec)
+
+    registry = protocols.REGISTRY.copy()
+    registry.add(protocols.Protocol(0x300001, "test-uint32", "uint32be"))
+
+    # Splitting binary addresses only needs the declared size
+    binary = b"\x81\x80\xc0\x01\x00\x00\x01\x02\x06\x00\x50"
+    ma = Multiaddr(binary, registry=registry)
+    assert [proto.name for proto in ma.protocols()] == ["test-uint32", "tcp"]
+    assert ma.value_for_protocol("tcp") == "80"
+    assert not loads
+
+    assert str(ma) == "/test-uint32/258/tcp/80"
+    assert Multiaddr("/test-uint32/258/tcp/80", registry=registry).to_bytes() == binary
+    assert len(loads) == 1
+
+
+def test_codec_from_entry_point(codec_cache, monkeypatch):
+    plugin = FakeEntryPoint("uint32be", Uint32Codec)
+    other = FakeEntryPoint("uint32be", None)
+    monkeypatch.setattr(codecs, "_iter_entry_points", lambda: [plugin, other])
+
+    assert codecs.codec_by_name("uint32be") is Uint32Codec
+    assert codecs.codec_by_name("uint32be") is Uint32Codec
+    assert (plugin.loads, other.loads) == (1, 0)
+
+
+def test_codec_not_found(codec_cache, monkeypatch):
+    monkeypatch.setattr(codecs, "_iter_entry_points", lambda: [])
+    with pytest.raises(ImportError):
+        codecs.codec_by_name("no-such-codec")
+
+
+def test_iter_entry_points():
+    # No installed distribution is expected to provide codecs
+    assert [ep.name for ep in codecs._iter_entry_points()] == []
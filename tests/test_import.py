@@ -0,0 +1,121 @@
+# -*- encoding: utf-8 -*-
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+# Upper bound for the cumulative import time of the `multiaddr` package, in
+# microseconds: about twice the 17-20 ms measured for it (best of several
+# runs), so that heavy imports creeping back in are caught rather than the
+# speed of the machine running the tests
+IMPORT_TIME_BUDGET = 40000
+IMPORT_TIME_RUNS = 5
+
+HEAVY_MODULES = ("base58", "idna", "netaddr")
+
+# Modules that `import multiaddr` alone must never load; those of the standard
+# library are only needed by the socket address conversions and the resolver
+IMPORT_FREE_MODULES = HEAVY_MODULES + ("asyncio", "socket")
+
+
+def run_python(args, env=None):
+    if env is not None:
+        env = dict(os.environ, **env)
+    return subprocess.check_output(
+        [sys.executable] + args,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+        env=env,
+    )
+
+
+def loaded_heavy_modules(code, modules=HEAVY_MODULES):
+    """Run `code` in a fresh interpreter and return which of the given
+    (by default: heavy third-party) modules it ended up importing."""
+    output = run_python(["-c", code + "\nimport sys; print(' '.join(sorted(sys.modules)))"])
+    return set(modules) & set(output.splitlines()[-1].split())
+
+
+def import_time():
+    output = run_python(["-X", "importtime", "-c", "import multiaddr"])
+    for line in output.splitlines():
+        _, cumulative, name = line.split("|")
+        if name.strip() == "multiaddr":
+            return int(cumulative)
+    pytest.fail("No import time reported for multiaddr")
+
+
+def test_import_loads_no_heavy_modules():
+    assert loaded_heavy_modules("import multiaddr", IMPORT_FREE_MODULES) == set()
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="Requires `-X importtime`")
+def test_import_time_budget():
+    assert min(import_time() for _ in range(IMPORT_TIME_RUNS)) < IMPORT_TIME_BUDGET
+
+
+@pytest.mark.parametrize("code, needed", [
+    ("import multiaddr", ()),
+    ("Multiaddr('/unix/tmp/p2p.sock')", ()),
+    ("str(Multiaddr('/ip4/127.0.0.1/tcp/4001'))", ()),
+    ("str(Multiaddr('/ip6/::1/udp/4001/quic'))", ()),
+    # Parsing the structure of a binary address must not load value codecs
+    ("len(Multiaddr(b'\\xa5\\x03\\x22\\x12\\x20' + b'\\x00' * 32))", ()),
+    ("Multiaddr('/dns4/example.com/tcp/443')", ("idna",)),
+    ("Multiaddr('/p2p/QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC')", ("base58",)),
+])
+def test_heavy_modules_loaded_on_demand(code, needed):
+    assert loaded_heavy_modules("from multiaddr import Multiaddr\n" + code) == set(needed)
+
+
+def test_codecs_loaded_on_demand():
+    output = run_python(["-c", "\n".join([
+        "import sys",
+        "from multiaddr import Multiaddr",
+        "ma = Multiaddr(b'\\x04\\x7f\\x00\\x00\\x01\\x06\\x10\\xe1')",
+        "ma.protocols()",
+        "print(sorted(name for name in sys.modules if name.startswith('multiaddr.codecs.')))",
+        "ma.value_for_protocol('tcp')",
+        "print(sorted(name for name in sys.modules if name.startswith('multiaddr.codecs.')))",
+    ])])
+    assert output.splitlines() == [
+        "[]",
+        "['multiaddr.codecs.uint16be']",
+    ]
+
+
+@pytest.mark.skipif(sys.version_info < (3, 4), reason="Requires `importlib.util`")
+@pytest.mark.parametrize("pure_python", ["1", ""])
+def test_accelerator_selection(pure_python):
+    from importlib.machinery import EXTENSION_SUFFIXES
+    from multiaddr import _accel
+
+    # Compiled modules are only present after building them in place
+    root = os.path.dirname(os.path.dirname(os.path.abspath(_accel.__file__)))
+    available = all(
+        any(os.path.exists(os.path.join(root, *module.split(".")) + suffix)
+            for suffix in EXTENSION_SUFFIXES)
+        for module in _accel.MODULES
+    )
+    output = run_python(["-c", "\n".join([
+        "import importlib",
+        "from multiaddr import _accel, Multiaddr",
+        "str(Multiaddr('/ip4/127.0.0.1/tcp/1'))",
+        "print(sorted(set(_accel.is_compiled(importlib.import_module(name))",
+        "                 for name in _accel.MODULES)))",
+    ])], env={"MULTIADDR_PURE_PYTHON": pure_python})
+    assert output.strip() == str([bool(available and not pure_python)])
+
+
+@pytest.mark.skipif(os.environ.get("MULTIADDR_COMPILE") != "1",
+                    reason="Only for builds with compiled modules")
+def test_compiled_modules_loaded():
+    import importlib
+    from multiaddr import _accel
+
+    # Guards the compiled test environment against silently testing pure Python
+    assert _accel.ENABLED
+    assert [name for name in _accel.MODULES
+            if not _accel.is_compiled(importlib.import_module(name))] == []
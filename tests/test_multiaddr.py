@@ -1,10 +1,15 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
+import copy
+import pickle
+import socket
 
 import pytest
 import six
 
+import multiaddr
+
 from multiaddr.exceptions import BinaryParseError
 from multiaddr.exceptions import ProtocolLookupError
 from multiaddr.exceptions import ProtocolNotFoundError
@@ -64,6 +69,12 @@ from multiaddr.protocols import P_UNIX
      "/dns",
      "/dns4",
      "/dns6",
+     "/ipcidr/256",
+     "/certhash/xyz",
+     "/certhash/uAA",
+     "/garlic32/566niximlxdzpanmn4qouucvua3k7neniwss47li5r6ugoertzu",
+     "/garlic32/aaaa",
+     "/garlic64/jT~",
      "/cancer"])
 def test_invalid(addr_str):
     with pytest.raises(StringParseError):
@@ -104,6 +115,13 @@ def test_invalid(addr_str):
      "/unix/a/b/c/d/e",
      "/unix/Überrschung!/大柱",
      "/unix/stdio",
+     "/ip4/1.2.3.4/ipcidr/24",
+     "/ip4/127.0.0.1/udp/1234/quic-v1/webtransport/certhash/"
+     "uEiDDq4_xNyDorZBH3TlGazyJdOWSwvo4PUo5YHFMrvDE8g",
+     "/ip4/1.2.3.4/udp/1234/webrtc-direct",
+     "/dns/example.com/tcp/443/tls/sni/example.com/http",
+     "/garlic32/566niximlxdzpanmn4qouucvua3k7neniwss47li5r6ugoertzuq",
+     "/garlic64/-~" + "A" * 518,
      "/ip4/1.2.3.4/tcp/80/unix/a/b/c/d/e/f",
      "/ip4/127.0.0.1/p2p/QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC/tcp/1234/unix/stdio",
      "/ip4/127.0.0.1/tcp/9090/http/p2p-webrtc-direct",
@@ -133,6 +151,58 @@ def test_eq():
     assert m3 == m4
     assert m4 == m3
 
+    assert m1 != "/ip4/127.0.0.1/udp/1234"
+    assert not (m1 == m1.to_bytes())
+
+
+def test_hash():
+    m1 = Multiaddr("/ip4/127.0.0.1/tcp/1234")
+    m2 = Multiaddr("/ip4/127.0.0.1/tcp/1234/")
+    m3 = Multiaddr(bytearray(m1.to_bytes()))
+
+    assert hash(m1) == hash(m2) == hash(m3)
+    assert len({m1, m2, m3, Multiaddr("/ip4/127.0.0.1/udp/1234")}) == 2
+    assert {m1: "a"}[m3] == "a"
+
+
+@pytest.mark.parametrize("make", [
+    lambda: Multiaddr("/ip4/127.0.0.1/tcp/1234/p2p/QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC"),
+    lambda: Multiaddr(memoryview(Multiaddr("/ip6/::1/udp/53").to_bytes())),
+    lambda: Multiaddr.from_trusted_bytes(Multiaddr("/dns4/example.com").to_bytes()),
+])
+def test_pickle_parsed(make):
+    ma = make()
+    # Populate the cached index and text before serializing
+    assert len(ma) > 0 and list(ma.protocols()) and str(ma)
+
+    for copied in (pickle.loads(pickle.dumps(ma, protocol)) for protocol in
+                   range(2, pickle.HIGHEST_PROTOCOL + 1)):
+        assert copied == ma and str(copied) == str(ma)
+    assert copy.deepcopy(ma) == ma
+    assert copy.copy(ma) == ma
+
+
+def test_pickle_registry():
+    registry = multiaddr.protocols.REGISTRY.copy()
+    registry.add(multiaddr.protocols.Protocol(0x300001, "test-pickle", None))
+    ma = Multiaddr("/ip4/1.2.3.4/test-pickle", registry=registry)
+    assert len(ma) == 2
+
+    copied = pickle.loads(pickle.dumps(ma))
+    assert str(copied) == str(ma)
+    assert [proto.name for proto in copied.protocols()] == ["ip4", "test-pickle"]
+    assert copy.deepcopy(ma).to_bytes() == ma.to_bytes()
+
+
+def test_ordering():
+    addrs = [Multiaddr("/tcp/80"), Multiaddr("/ip4/10.0.0.2"), Multiaddr("/ip4/10.0.0.1")]
+    assert sorted(addrs) == sorted(addrs, key=lambda ma: ma.to_bytes())
+    assert addrs[2] < addrs[1] <= addrs[1] < addrs[0]
+    assert addrs[0] > addrs[1] >= addrs[1]
+
+    with pytest.raises(TypeError):
+        addrs[0] < "/tcp/80"
+
 
 def test_protocols():
     ma = Multiaddr("/ip4/127.0.0.1/udp/1234")
@@ -341,6 +411,43 @@ def test_decapsulate():
     assert a.decapsulate(u) == Multiaddr("/ip4/127.0.0.1")
 
 
+def test_decapsulate_component_boundaries():
+    # The binary form of /tcp/80 also occurs inside the IPv4 address value
+    a = Multiaddr("/ip4/6.0.80.1/udp/1234")
+    assert a.decapsulate("/tcp/80") == a
+    assert a.decapsulate("/udp/1234") == Multiaddr("/ip4/6.0.80.1")
+
+    a = Multiaddr("/ip4/6.0.80.1/tcp/80/ip4/127.0.0.1/tcp/80")
+    assert a.decapsulate(Multiaddr("/tcp/80")) == Multiaddr("/ip4/6.0.80.1/tcp/80/ip4/127.0.0.1")
+    assert a.decapsulate("/tcp/80/ip4/127.0.0.1") == Multiaddr("/ip4/6.0.80.1")
+    assert a.decapsulate(b"") == a
+
+
+def test_decapsulate_code():
+    a = Multiaddr("/ip4/127.0.0.1/tcp/4001/p2p/QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC"
+                  "/p2p-circuit/p2p/QmbHVEEepCi7rn7VL7Exxpd2Ci9NNB6ifvqwhsrbRMgQFP")
+    assert a.decapsulate_code(P_P2P) == Multiaddr(
+        "/ip4/127.0.0.1/tcp/4001/p2p/QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC/p2p-circuit"
+    )
+    assert a.decapsulate_code("p2p-circuit").decapsulate_code("p2p") == Multiaddr(
+        "/ip4/127.0.0.1/tcp/4001"
+    )
+    assert a.decapsulate_code(P_IP4) == Multiaddr(b"")
+    assert a.decapsulate_code(P_UDP) == a
+
+
+def test_encapsulate_index():
+    m1 = Multiaddr("/ip4/127.0.0.1/tcp/4001")
+    m2 = Multiaddr("/p2p/QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC")
+    m1._components()
+    m2._components()
+
+    encapsulated = m1.encapsulate(m2)
+    assert encapsulated._parts is not None
+    assert encapsulated._components() == Multiaddr(encapsulated.to_bytes())._components()
+    assert m1.encapsulate("/tcp/80") == Multiaddr("/ip4/127.0.0.1/tcp/4001/tcp/80")
+
+
 def test__repr():
     a = Multiaddr("/ip4/127.0.0.1/udp/1234")
     assert(repr(a) == "<Multiaddr %s>" % str(a))
@@ -355,3 +462,217 @@ def test_zone():
 
     maddr_from_bytes = Multiaddr(ip6_bytes)
     assert str(maddr_from_bytes) == ip6_string
+
+
+def test_components_cached():
+    ma = Multiaddr("/ip4/127.0.0.1/udp/1234")
+    parts = ma._components()
+    assert ma._components() is parts
+    assert [proto.name for _, proto, _, _ in parts] == ["ip4", "udp"]
+
+    # Replacing the binary representation must drop the stale index
+    ma._bytes = Multiaddr("/tcp/80").to_bytes()
+    assert list(ma.protocols()) == [protocol_with_name("tcp")]
+
+
+def test_views_slicing():
+    ma = Multiaddr("/ip4/127.0.0.1/tcp/4001/p2p/QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC")
+
+    assert ma.protocols()[-1] == protocol_with_name("p2p")
+    assert ma[1:] == Multiaddr("/tcp/4001/p2p/QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC")
+    assert ma[:-1] == Multiaddr("/ip4/127.0.0.1/tcp/4001")
+    assert ma[2:1] == Multiaddr(b"")
+    assert ma[1:2]._components() == Multiaddr("/tcp/4001")._components()
+
+    assert list(ma.protocols()[:2]) == [protocol_with_name("ip4"), protocol_with_name("tcp")]
+    assert list(ma.items()[1:2]) == [(protocol_with_name("tcp"), "4001")]
+    assert list(ma.values()[-2:]) == ["4001", "QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC"]
+
+    with pytest.raises(ValueError):
+        ma[::2]
+
+
+@pytest.mark.parametrize("wrap", [bytearray, memoryview])
+def test_buffer_initialization(wrap):
+    raw = Multiaddr("/ip4/127.0.0.1/tcp/4001/dns/example.com").to_bytes()
+    ma = Multiaddr(wrap(raw))
+
+    assert str(ma) == "/ip4/127.0.0.1/tcp/4001/dns/example.com"
+    assert ma.value_for_protocol(P_DNS) == "example.com"
+    assert ma == Multiaddr(raw)
+    assert ma.to_bytes() == raw
+    assert isinstance(ma.to_bytes(), bytes)
+
+
+def test_intern():
+    a = Multiaddr.intern("/ip4/127.0.0.1/tcp/4001")
+    b = Multiaddr.intern("/ip4/127.0.0.1/tcp/4001")
+    c = Multiaddr.intern(a.to_bytes())
+    assert a is b
+    assert c == a
+    assert Multiaddr.intern(c) is c
+    assert Multiaddr.intern(bytearray(a.to_bytes())) is c
+
+
+def test_str_cached():
+    ma = Multiaddr("/ip6/0::1/tcp/80/")
+    assert ma._text is None
+    assert str(ma) == "/ip6/::1/tcp/80"
+    assert ma._text == "/ip6/::1/tcp/80"
+    assert str(Multiaddr(ma)) is str(ma)
+
+
+def test_parse_many():
+    addrs = [
+        "/ip4/127.0.0.1/tcp/4001",
+        "/ip4/127.0.0.2/tcp/4001",
+        "/ip4/127.0.0.1/tcp/65536",
+        Multiaddr("/ip4/127.0.0.1/udp/1234").to_bytes(),
+        b"\x04\x7f\x00",
+        "/ip4/127.0.0.1/tcp/4001",
+        42,
+        "/unix/a/b",
+    ]
+    valid = [0, 1, 3, 5, 7]
+
+    with pytest.raises(StringParseError):
+        multiaddr.parse_many(addrs)
+
+    result = Multiaddr.from_many(addrs, errors="skip")
+    assert result == [Multiaddr(addrs[idx]) for idx in valid]
+    assert result[0] is result[3]  # identical strings are only parsed once
+
+    result, errors = multiaddr.parse_many(addrs, errors="collect")
+    assert [idx for idx, ma in enumerate(result) if ma is not None] == valid
+    assert [(idx, type(exc)) for idx, exc in errors] == [
+        (2, StringParseError), (4, BinaryParseError), (6, TypeError),
+    ]
+
+    with pytest.raises(ValueError):
+        multiaddr.parse_many(addrs, errors="ignore")
+
+
+@pytest.mark.parametrize("addr,expected", [
+    ("/ip4/127.0.0.1/tcp/4001", (socket.AF_INET, socket.SOCK_STREAM, ("127.0.0.1", 4001))),
+    ("/ip4/10.0.0.1/udp/53", (socket.AF_INET, socket.SOCK_DGRAM, ("10.0.0.1", 53))),
+    ("/ip6/::1/tcp/80", (socket.AF_INET6, socket.SOCK_STREAM, ("::1", 80, 0, 0))),
+    ("/ip6zone/7/ip6/fe80::1/udp/5353",
+     (socket.AF_INET6, socket.SOCK_DGRAM, ("fe80::1", 5353, 0, 7))),
+    pytest.param(
+        "/unix/tmp/p2p.sock",
+        (getattr(socket, "AF_UNIX", None), socket.SOCK_STREAM, "/tmp/p2p.sock"),
+        marks=pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="requires AF_UNIX"),
+    ),
+])
+def test_sockaddr(addr, expected):
+    assert Multiaddr(addr).to_sockaddr() == expected
+    assert Multiaddr(addr).to_sockaddr() == expected  # Cached
+    family, type, sockaddr = expected
+    assert Multiaddr.from_sockaddr(family, sockaddr, type) == Multiaddr(addr)
+    assert Multiaddr.from_sockaddrs(family, [sockaddr, sockaddr], type) == [Multiaddr(addr)] * 2
+
+
+def test_from_sockaddr_zone():
+    # Older Pythons report the zone as part of the host
+    assert Multiaddr.from_sockaddr(socket.AF_INET6, ("fe80::1%7", 80)) == \
+        Multiaddr("/ip6zone/7/ip6/fe80::1/tcp/80")
+
+
+@pytest.mark.parametrize("addr", [
+    "/ip4/127.0.0.1",
+    "/ip4/127.0.0.1/tcp/1/ws",
+    "/ip6zone/eth0/ip4/127.0.0.1/tcp/1",
+    "/dns4/example.com/tcp/80",
+    "/udp/53",
+])
+def test_to_sockaddr_unsupported(addr):
+    with pytest.raises(ValueError):
+        Multiaddr(addr).to_sockaddr()
+
+
+@pytest.mark.parametrize("family,sockaddr,type", [
+    (socket.AF_INET, ("not-an-ip", 1), socket.SOCK_STREAM),
+    (socket.AF_INET, ("127.0.0.1", 1), socket.SOCK_RAW),
+    (socket.AF_INET6, ("127.0.0.1", 1, 0, 0), socket.SOCK_STREAM),
+    (-1, ("127.0.0.1", 1), socket.SOCK_STREAM),
+    (socket.AF_INET, ("127.0.0.1", 70000), socket.SOCK_STREAM),
+    (socket.AF_INET, ("127.0.0.1", -1), socket.SOCK_DGRAM),
+])
+def test_from_sockaddr_invalid(family, sockaddr, type):
+    with pytest.raises(ValueError):
+        Multiaddr.from_sockaddr(family, sockaddr, type)
+    with pytest.raises(ValueError):
+        Multiaddr.from_sockaddrs(family, [sockaddr], type)
+
+
+def test_sockaddr_accept():
+    server = socket.socket(*Multiaddr("/ip4/127.0.0.1/tcp/0").to_sockaddr()[:2])
+    try:
+        server.bind(Multiaddr("/ip4/127.0.0.1/tcp/0").to_sockaddr()[2])
+        server.listen(1)
+        listen_addr = Multiaddr.from_sockaddr(server.family, server.getsockname())
+        client = socket.create_connection(listen_addr.to_sockaddr()[2])
+        conn, peer = server.accept()
+        try:
+            assert Multiaddr.from_sockaddrs(server.family, [peer]) == [
+                Multiaddr.from_sockaddr(client.family, client.getsockname()),
+            ]
+        finally:
+            conn.close()
+            client.close()
+    finally:
+        server.close()
+
+
+def test_validate():
+    data = Multiaddr("/ip4/127.0.0.1/tcp/4001/p2p/QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC")
+    ma = Multiaddr(data.to_bytes())
+    assert ma._valid is None
+    assert ma.validate() is ma
+    assert ma._valid
+    assert str(ma) == str(data)
+    assert ma.validate() is ma
+
+    # Derived Multiaddrs keep the result
+    assert ma[:2]._valid
+    assert ma.encapsulate(ma)._valid
+    assert Multiaddr(ma)._valid
+    assert Multiaddr(str(ma))._valid
+
+
+@pytest.mark.parametrize("data", [
+    b"\x04\x7f\x00",       # Truncated value
+    b"\x2a\x02\xff\xfe",   # Zone that is not UTF-8
+])
+def test_validate_invalid(data):
+    ma = Multiaddr(data)
+    for _ in range(2):
+        with pytest.raises(BinaryParseError):
+            ma.validate()
+    assert not ma._valid
+
+
+def test_from_trusted_bytes():
+    data = Multiaddr("/ip4/127.0.0.1/udp/1234/unix/a/b").to_bytes()
+    ma = Multiaddr.from_trusted_bytes(data)
+    assert ma._valid
+    assert ma == Multiaddr(data)
+    assert ma.value_for_protocol(P_IP4) == "127.0.0.1"
+    assert str(ma) == "/ip4/127.0.0.1/udp/1234/unix/a/b"
+
+    # Invalid values are not translated into `BinaryParseError` anymore
+    ma = Multiaddr.from_trusted_bytes(b"\x2a\x02\xff\xfe")
+    with pytest.raises(UnicodeDecodeError):
+        ma.value_for_protocol("ip6zone")
+
+
+def test_from_trusted_bytes_registry():
+    registry = multiaddr.protocols.REGISTRY.copy()
+    registry.add(multiaddr.protocols.Protocol(0x300003, "test-trusted", "utf8"))
+    data = Multiaddr("/ip4/127.0.0.1/test-trusted/a", registry=registry).to_bytes()
+    ma = Multiaddr.from_trusted_bytes(data, registry=registry)
+    assert ma._valid
+    assert ma.value_for_protocol("test-trusted") == "a"
+    # Like in the constructor, the registry is keyword-only
+    with pytest.raises(TypeError):
+        Multiaddr.from_trusted_bytes(data, registry)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import pytest
+
+from multiaddr.exceptions import BinaryParseError
+from multiaddr.multiaddr import Multiaddr
+from multiaddr.packed import MultiaddrArray
+from multiaddr.packed import MultiaddrSet
+
+
+ADDRS = [
+    "/ip4/10.0.0.1/tcp/4001",
+    "/ip6/::1/udp/4001/quic",
+    "/dns4/example.com/tcp/443/wss",
+    "/p2p/QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC",
+    "/unix/tmp/p2p.sock",
+]
+
+
+def test_array():
+    addrs = [Multiaddr(addr) for addr in ADDRS]
+    packed = MultiaddrArray(addrs[:2])
+    packed.append(ADDRS[2])
+    packed.extend(addr.to_bytes() for addr in addrs[3:])
+
+    assert len(packed) == len(ADDRS)
+    assert list(packed) == addrs
+    assert packed[-1] == addrs[-1]
+    assert packed.raw(1) == addrs[1].to_bytes()
+    assert list(packed[1:3]) == addrs[1:3]
+    assert addrs[2] in packed
+    assert packed.nbytes == sum(len(addr.to_bytes()) + 4 for addr in addrs) + 4
+
+    with pytest.raises(IndexError):
+        packed[len(ADDRS)]
+    with pytest.raises(TypeError):
+        packed.append(42)
+
+    restored = MultiaddrArray.from_bytes(packed.to_bytes())
+    assert list(restored) == addrs
+
+
+def test_set():
+    addrs = [Multiaddr(addr) for addr in ADDRS]
+    members = MultiaddrSet(addrs + addrs[:2])
+    assert len(members) == len(ADDRS)
+    assert set(members) == set(addrs)
+    assert addrs[0] in members
+    assert addrs[0].to_bytes() in members
+    assert Multiaddr("/ip4/10.0.0.2/tcp/4001") not in members
+
+    members.remove(addrs[0])
+    members.discard(addrs[0])
+    members.discard("/ip4/10.0.0.1/tcp/4001")
+    assert addrs[0] not in members
+    assert len(members) == len(ADDRS) - 1
+
+    restored = MultiaddrSet.from_bytes(members.to_bytes())
+    assert restored == members
+    assert set(restored) == set(addrs[1:])
+
+
+def test_set_strings():
+    members = MultiaddrSet()
+    members.add("/ip4/1.2.3.4/tcp/80")
+    # Strings are looked up by their binary form, just like they are added
+    assert "/ip4/1.2.3.4/tcp/80" in members
+    assert "/ip4/1.2.3.4/tcp/80/" in members
+    assert Multiaddr("/ip4/1.2.3.4/tcp/80") in members
+    assert "/ip4/1.2.3.4/tcp/81" not in members
+    assert "not a multiaddr" not in members
+    assert 42 not in members
+    members.discard("not a multiaddr")
+
+    members.remove("/ip4/1.2.3.4/tcp/80")
+    assert len(members) == 0
+    with pytest.raises(KeyError):
+        members.remove("/ip4/1.2.3.4/tcp/80")
+
+
+def test_iteration_views():
+    packed = MultiaddrArray(ADDRS)
+    items = list(packed)
+    # Items wrap views of one snapshot of the buffer instead of copies …
+    assert all(isinstance(item._raw, memoryview) for item in items)
+    assert [str(item) for item in items] == ADDRS
+    # … which does not keep the container from growing
+    packed.append(ADDRS[0])
+    assert len(packed) == len(ADDRS) + 1
+    assert [str(item) for item in MultiaddrSet(ADDRS)] == ADDRS
+
+
+def test_set_growth_and_compaction():
+    addrs = [Multiaddr("/ip4/10.0.{0}.{1}/tcp/4001".format(i // 256, i % 256)) for i in range(2000)]
+    members = MultiaddrSet(addrs)
+    assert len(members) == 2000
+    assert all(addr in members for addr in addrs)
+
+    for addr in addrs[:1500]:
+        members.discard(addr)
+    assert len(members) == 500
+    assert len(members._items) < 2000  # Removed items have been compacted
+    assert set(members) == set(addrs[1500:])
+    assert not any(addr in members for addr in addrs[:1500])
+
+    members.add(addrs[0])
+    assert addrs[0] in members and len(members) == 501
+
+
+def test_set_nbytes():
+    addrs = [Multiaddr("/ip4/10.0.{0}.{1}/tcp/4001".format(i // 256, i % 256)) for i in range(1000)]
+    # 8 bytes per address plus a 4 byte end offset
+    assert MultiaddrArray(addrs).nbytes == 12 * len(addrs) + 4
+    # … plus a liveness flag and the hash table of 2 byte indexes
+    members = MultiaddrSet(addrs)
+    assert members._table.itemsize == 2
+    assert members.nbytes <= 18 * len(addrs)
+
+
+@pytest.mark.parametrize("data", [b"\x05\x04\x7f\x00", b"\x80"])
+def test_from_bytes_truncated(data):
+    with pytest.raises(BinaryParseError):
+        MultiaddrArray.from_bytes(data)
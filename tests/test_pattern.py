@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import pytest
+
+from multiaddr import pattern
+from multiaddr.exceptions import ProtocolNotFoundError
+from multiaddr.multiaddr import Multiaddr
+from multiaddr.protocols import protocol_with_name
+
+
+PEER = "QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC"
+
+
+@pytest.mark.parametrize("pattern_str, addr_str, expected", [
+    ("/ip4/tcp", "/ip4/1.2.3.4/tcp/80", True),
+    ("ip4/tcp/", "/ip4/1.2.3.4/tcp/80", True),
+    ("/ip4/tcp", "/ip4/1.2.3.4/tcp/80/ws", False),
+    ("/ip4/tcp", "/ip4/1.2.3.4", False),
+    ("/ip4|ip6|dns*/tcp/ws", "/dns4/example.com/tcp/443/ws", True),
+    ("/ip4|ip6|dns*/tcp/ws", "/dnsaddr/example.com/tcp/443/ws", True),
+    ("/ip4|ip6|dns*/tcp/ws", "/ip6/::1/tcp/443/ws", True),
+    ("/ip4|ip6|dns*/tcp/ws", "/ip6/::1/udp/443/ws", False),
+    ("/*/udp/*/quic", "/ip6/::1/udp/4001/utp/quic", True),
+    ("/*/udp/*/quic", "/ip6/::1/udp/4001/quic", False),
+    ("/ip4/tcp/p2p?", "/ip4/1.2.3.4/tcp/80", True),
+    ("/ip4/tcp/p2p?", "/ip4/1.2.3.4/tcp/80/p2p/" + PEER, True),
+    ("/ip4/tcp?/tcp", "/ip4/1.2.3.4/tcp/80", True),
+    ("/ip4/tcp?/tcp", "/ip4/1.2.3.4/tcp/80/tcp/81", True),
+    ("/**/p2p-circuit/p2p", "/ip4/1.2.3.4/tcp/80/p2p/{0}/p2p-circuit/p2p/{0}".format(PEER), True),
+    ("/**/p2p-circuit/p2p", "/p2p-circuit/p2p/" + PEER, True),
+    ("/**/p2p-circuit/p2p", "/ip4/1.2.3.4/tcp/80/p2p/" + PEER, False),
+    ("/ip4/**", "/ip4/1.2.3.4", True),
+    ("/**/tcp/**/ws/**", "/ip4/1.2.3.4/tcp/80/ws", True),
+    ("", "/ip4/1.2.3.4", False),
+])
+def test_match(pattern_str, addr_str, expected):
+    compiled = pattern.compile(pattern_str)
+    addr = Multiaddr(addr_str)
+    assert (compiled.match(addr) is not None) is expected
+    assert (compiled.match(addr.to_bytes()) is not None) is expected
+
+
+def test_captures():
+    compiled = pattern.compile("/{host:ip4|ip6|dns*}/{port:tcp}/ws?/{peer:p2p}?")
+
+    match = compiled.match(Multiaddr("/dns4/example.com/tcp/443/ws"))
+    assert match.protocol("host") == protocol_with_name("dns4")
+    assert match.value("host") == "example.com"
+    assert match.value("port") == "443"
+    assert "peer" not in match
+    assert match.value("peer") is None
+
+    match = compiled.match(Multiaddr("/ip4/1.2.3.4/tcp/80/p2p/" + PEER).to_bytes())
+    assert match.value("host") == "1.2.3.4"
+    assert match.value("peer") == PEER
+
+
+def test_filter():
+    addrs = [
+        Multiaddr("/ip4/1.2.3.4/tcp/80"),
+        Multiaddr("/ip4/1.2.3.4/udp/80/quic"),
+        Multiaddr("/ip6/::1/tcp/80"),
+    ]
+    assert list(pattern.compile("/*/tcp").filter(addrs)) == [addrs[0], addrs[2]]
+
+
+@pytest.mark.parametrize("pattern_str, exc_type", [
+    ("/ip4/foo", ProtocolNotFoundError),
+    ("/ip4/foo*", ValueError),
+    ("/{host:ip4}/{host:ip6}", ValueError),
+    ("/{peers:**}", ValueError),
+    ("/{host}", ValueError),
+    ("/ip4/?", ValueError),
+])
+def test_invalid_pattern(pattern_str, exc_type):
+    with pytest.raises(exc_type):
+        pattern.compile(pattern_str)
@@ -1,7 +1,7 @@
 import six
 import pytest
-import varint
 
+from multiaddr import _varint as varint
 from multiaddr import exceptions, protocols
 
 
@@ -13,9 +13,9 @@ def test_code_to_varint():
 
 
 def test_varint_to_code():
-    cc = varint.decode_bytes(b'\x05')
+    cc = varint.decode(bytearray(b'\x05'))[0]
     assert cc == 5
-    cc = varint.decode_bytes(b'\x96\x01')
+    cc = varint.decode(bytearray(b'\x96\x01'))[0]
     assert cc == 150
 
 
@@ -129,37 +129,149 @@ def test_protocols_with_string_mixed():
         protocols.protocols_with_string(ins)
 
 
-# add_protocol is stateful, so we need to mock out
-# multiaddr.protocols.PROTOCOLS
+# add_protocol is stateful, so we need to mock out the global registry
+# multiaddr.protocols.REGISTRY and multiaddr.protocols.PROTOCOLS
 @pytest.fixture()
 def patch_protocols(monkeypatch):
     monkeypatch.setattr(protocols, 'PROTOCOLS', [])
-    monkeypatch.setattr(protocols, '_names_to_protocols', {})
-    monkeypatch.setattr(protocols, '_codes_to_protocols', {})
+    monkeypatch.setattr(protocols, 'REGISTRY', protocols.ProtocolRegistry())
 
 
 def test_add_protocol(patch_protocols, valid_params):
     proto = protocols.Protocol(**valid_params)
     protocols.add_protocol(proto)
     assert protocols.PROTOCOLS == [proto]
-    assert proto.name in protocols._names_to_protocols
-    assert proto.code in protocols._codes_to_protocols
-    proto = protocols.Protocol(protocols.P_TCP, "tcp", "uint16be")
+    assert protocols.REGISTRY.protocols == (proto,)
+    assert protocols.protocol_with_name(proto.name) is proto
+    assert protocols.protocol_with_code(proto.code) is proto
+    assert proto in protocols.REGISTRY
 
 
 def test_add_protocol_twice(patch_protocols, valid_params):
     proto = protocols.Protocol(**valid_params)
     protocols.add_protocol(proto)
-    with pytest.raises(exceptions.ProtocolExistsError):
-        protocols.add_protocol(proto)
-    del protocols._names_to_protocols[proto.name]
-    with pytest.raises(exceptions.ProtocolExistsError):
+    with pytest.raises(exceptions.ProtocolExistsError) as excinfo:
         protocols.add_protocol(proto)
-    del protocols._codes_to_protocols[proto.code]
+    assert excinfo.value.kind == "name"
+    with pytest.raises(exceptions.ProtocolExistsError) as excinfo:
+        protocols.add_protocol(protocols.Protocol(proto.code, "other", proto.codec))
+    assert excinfo.value.kind == "code"
+    assert protocols.PROTOCOLS == [proto]
+    assert protocols.REGISTRY.protocols == (proto,)
+
+
+def test_add_protocol_dispatch(patch_protocols, valid_params):
+    proto = protocols.Protocol(protocols.P_TCP, "tcp", "uint16be")
+    protocols.add_protocol(proto)
+    entry = protocols.dispatch_with_name("tcp")
+    assert entry is protocols.dispatch_with_code(protocols.P_TCP)
+    assert entry.proto is proto
+    assert entry.vcode == proto.vcode == varint.encode(protocols.P_TCP)
+    assert (entry.size, entry.path) == (proto.size, proto.path) == (16, False)
+    assert entry.to_bytes(proto, "80") == b"\x00\x50"
+
+    # Protocols whose codec cannot be imported are registered but unusable
+    proto = protocols.Protocol(**valid_params)
     protocols.add_protocol(proto)
-    assert protocols.PROTOCOLS == [proto, proto]
+    with pytest.raises(ImportError):
+        protocols.dispatch_with_name(proto.name)
+    with pytest.raises(exceptions.ProtocolNotFoundError):
+        protocols.dispatch_with_code(1234)
 
 
 def test_protocol_repr():
     proto = protocols.protocol_with_name('ip4')
     assert "Protocol(code=4, name='ip4', codec='ip4')" == repr(proto)
+
+
+def test_registry_isolated():
+    from multiaddr import Multiaddr
+
+    registry = protocols.REGISTRY.copy()
+    proto = protocols.Protocol(0x300001, "tenant", "utf8")
+    registry.add(proto)
+    assert proto in registry and proto not in protocols.REGISTRY
+    assert len(registry) == len(protocols.REGISTRY) + 1
+    with pytest.raises(exceptions.ProtocolNotFoundError):
+        protocols.protocol_with_name("tenant")
+
+    ma = Multiaddr("/ip4/127.0.0.1/tenant/a/tcp/1", registry=registry)
+    assert ma.value_for_protocol("tenant") == "a"
+    assert str(ma) == "/ip4/127.0.0.1/tenant/a/tcp/1"
+    assert "tenant" in ma.protocols()
+    assert str(Multiaddr(ma.to_bytes(), registry=registry)) == str(ma)
+
+    # Derived Multiaddrs keep using the registry
+    assert ma[1:2].value_for_protocol("tenant") == "a"
+    assert [str(part) for part in ma.split()] == ["/ip4/127.0.0.1", "/tenant/a", "/tcp/1"]
+    assert str(ma.decapsulate("/tenant/a/tcp/1")) == "/ip4/127.0.0.1"
+    assert str(ma.decapsulate_code("tenant")) == "/ip4/127.0.0.1"
+    assert str(ma.encapsulate("/tenant/b")) == "/ip4/127.0.0.1/tenant/a/tcp/1/tenant/b"
+    assert Multiaddr(ma).value_for_protocol("tenant") == "a"
+
+    # The global registry does not know the protocol
+    with pytest.raises(exceptions.StringParseError):
+        Multiaddr("/ip4/127.0.0.1/tenant/a/tcp/1")
+    with pytest.raises(exceptions.BinaryParseError):
+        str(Multiaddr(ma.to_bytes()))
+    with pytest.raises(TypeError):
+        Multiaddr("/ip4/127.0.0.1", registry=protocols.PROTOCOLS)
+    # The registry is keyword-only
+    with pytest.raises(TypeError):
+        Multiaddr("/ip4/127.0.0.1", registry)
+    with pytest.raises(TypeError):
+        Multiaddr("/ip4/127.0.0.1", registry=registry, validate=False)
+
+
+def test_registry_snapshot_consistency():
+    registry = protocols.ProtocolRegistry(protocols.PROTOCOLS)
+    before = registry.protocols
+    registry.dispatch_with_name("tcp")
+    registry.add(protocols.Protocol(0x300002, "extra", None))
+    assert registry.protocols == before + (registry.with_name("extra"),)
+    # Compiled entries carry over into the new snapshot
+    assert registry.dispatch_with_name("tcp") is registry.dispatch_with_code(protocols.P_TCP)
+
+
+def test_registry_concurrent_add():
+    import threading
+    from multiaddr.transforms import bytes_to_string
+    from multiaddr.transforms import string_to_bytes
+
+    registry = protocols.REGISTRY.copy()
+    addr = "/ip4/127.0.0.1/tcp/4001/p2p/QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC"
+    errors = []
+    done = threading.Event()
+
+    def add():
+        for idx in range(300):
+            registry.add(protocols.Protocol(0x310000 + idx, "proto{0}".format(idx), None))
+        done.set()
+
+    def parse():
+        try:
+            while not done.is_set():
+                assert bytes_to_string(string_to_bytes(addr, registry), registry) == addr
+        except Exception as exc:  # pragma: no cover (failure)
+            errors.append(exc)
+
+    threads = [threading.Thread(target=parse) for _ in range(3)]
+    threads.append(threading.Thread(target=add))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(registry) == len(protocols.REGISTRY) + 300
+    assert registry.with_code(0x310000 + 299).name == "proto299"
+
+
+def test_generated_table():
+    from multiaddr._protocol_table import TABLE
+
+    assert [proto.code for proto in protocols.PROTOCOLS] == sorted(code for code, _, _, _ in TABLE)
+    for code, name, codec, vcode in TABLE:
+        proto = protocols.protocol_with_code(code)
+        assert (proto.name, proto.codec) == (name, codec)
+        assert proto.vcode == vcode == varint.encode(code)
+        assert protocols.dispatch_with_code(code).vcode == vcode
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import socket
+
+import pytest
+
+from multiaddr import Multiaddr
+from multiaddr.exceptions import ResolutionError
+from multiaddr.resolve import resolve
+from multiaddr.resolve import Resolver
+
+
+PEER = "QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC"
+OTHER_PEER = "QmNnooDu7bfjPFoTZYxMNLWUQJyrVwtbZg5gBMjTezGAJN"
+
+
+class StubBackend(object):
+    def __init__(self, hosts=None, txt=None, ttl=30, delay=0):
+        self.hosts = hosts or {}
+        self.txt = txt or {}
+        self.ttl = ttl
+        self.delay = delay
+        self.queries = []
+        self.active = 0
+        self.peak = 0
+
+    async def _query(self, query, records):
+        self.queries.append(query)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if records is None:
+            raise ResolutionError("NXDOMAIN", query[0])
+        return [(record, self.ttl) for record in records]
+
+    async def lookup_ip(self, host, family):
+        addresses = self.hosts.get(host)
+        if addresses is not None and family != socket.AF_UNSPEC:
+            addresses = [a for a in addresses if (":" in a) == (family == socket.AF_INET6)]
+        return await self._query((host, family), addresses)
+
+    async def lookup_txt(self, name):
+        return await self._query((name, "TXT"), self.txt.get(name))
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+HOSTS = {
+    "example.com": ["192.0.2.1", "2001:db8::1", "fe80::1%eth0"],
+    "node.example.com": ["192.0.2.7"],
+}
+
+TXT = {
+    "_dnsaddr.bootstrap.example.com": [
+        "dnsaddr=/dnsaddr/sjc.example.com/p2p/" + PEER,
+        "dnsaddr=/ip4/192.0.2.9/tcp/4001/p2p/" + OTHER_PEER,
+        "some-other-record",
+        "dnsaddr=/not/a/multiaddr",
+    ],
+    "_dnsaddr.sjc.example.com": [
+        "dnsaddr=/dns4/node.example.com/tcp/4001/p2p/" + PEER,
+        "dnsaddr=/ip6/2001:db8::7/udp/4001/quic/p2p/" + PEER,
+    ],
+    "_dnsaddr.loop.example.com": ["dnsaddr=/dnsaddr/loop.example.com"],
+}
+
+
+@pytest.mark.parametrize("addr,expected", [
+    ("/ip4/127.0.0.1/tcp/1", ["/ip4/127.0.0.1/tcp/1"]),
+    ("/dns4/example.com/tcp/80", ["/ip4/192.0.2.1/tcp/80"]),
+    ("/dns6/example.com/tcp/80", [
+        "/ip6/2001:db8::1/tcp/80", "/ip6zone/eth0/ip6/fe80::1/tcp/80",
+    ]),
+    ("/dns/example.com/tcp/80/ws", [
+        "/ip4/192.0.2.1/tcp/80/ws",
+        "/ip6/2001:db8::1/tcp/80/ws",
+        "/ip6zone/eth0/ip6/fe80::1/tcp/80/ws",
+    ]),
+    ("/dnsaddr/bootstrap.example.com", [
+        "/ip4/192.0.2.7/tcp/4001/p2p/" + PEER,
+        "/ip6/2001:db8::7/udp/4001/quic/p2p/" + PEER,
+        "/ip4/192.0.2.9/tcp/4001/p2p/" + OTHER_PEER,
+    ]),
+    ("/dnsaddr/bootstrap.example.com/p2p/" + OTHER_PEER, [
+        "/ip4/192.0.2.9/tcp/4001/p2p/" + OTHER_PEER,
+    ]),
+    ("/dnsaddr/unknown.example.com", None),
+])
+def test_resolve(addr, expected):
+    resolver = Resolver(StubBackend(HOSTS, TXT))
+    if expected is None:
+        with pytest.raises(ResolutionError):
+            run(resolver.resolve(addr))
+    else:
+        assert run(resolver.resolve(addr)) == [Multiaddr(a) for a in expected]
+
+
+def test_resolve_depth_limit():
+    resolver = Resolver(StubBackend(HOSTS, TXT), max_depth=3)
+    with pytest.raises(ResolutionError):
+        run(resolver.resolve("/dnsaddr/loop.example.com"))
+
+
+def test_resolve_cache():
+    now = [0.0]
+    backend = StubBackend(HOSTS, TXT, ttl=30)
+    resolver = Resolver(backend, clock=lambda: now[0])
+
+    run(resolver.resolve("/dnsaddr/bootstrap.example.com"))
+    assert len(backend.queries) == 3
+    run(resolver.resolve("/dnsaddr/bootstrap.example.com"))
+    assert len(backend.queries) == 3  # Served from the cache
+
+    now[0] = 31.0
+    run(resolver.resolve("/dnsaddr/bootstrap.example.com"))
+    assert len(backend.queries) == 6  # Expired
+
+
+def test_resolve_concurrency():
+    hosts = dict(("host{0}.example.com".format(i), ["192.0.2.{0}".format(i)]) for i in range(20))
+    backend = StubBackend(hosts, delay=0.001)
+    resolver = Resolver(backend, max_concurrency=4)
+    addrs = ["/dns4/{0}/tcp/1".format(host) for host in sorted(hosts)]
+    # Identical lookups in flight are shared
+    results = run(resolver.resolve_many(addrs + addrs))
+
+    assert results[:20] == results[20:]
+    assert sorted(str(addr) for result in results[:20] for addr in result) == sorted(
+        "/ip4/{0}/tcp/1".format(address) for (address,) in hosts.values()
+    )
+    assert len(backend.queries) == 20
+    assert 1 < backend.peak <= 4
+
+
+def test_resolve_default():
+    assert run(resolve("/ip4/127.0.0.1/tcp/1")) == [Multiaddr("/ip4/127.0.0.1/tcp/1")]
+    assert run(resolve("/dns4/example.com/tcp/1", Resolver(StubBackend(HOSTS)))) == [
+        Multiaddr("/ip4/192.0.2.1/tcp/1"),
+    ]
+
+
+def test_resolve_across_event_loops():
+    hosts = dict(("host{0}.example.com".format(i), ["192.0.2.{0}".format(i)]) for i in range(4))
+    addrs = ["/dns4/{0}/tcp/1".format(host) for host in sorted(hosts)]
+    backend = StubBackend(hosts, ttl=0, delay=0.001)
+    resolver = Resolver(backend, max_concurrency=1)
+    # The semaphore is contended in both loops, binding it to the first one
+    for _ in range(2):
+        results = run(resolver.resolve_many(addrs))
+        assert [len(result) for result in results] == [1] * 4
+    assert len(backend.queries) == 8
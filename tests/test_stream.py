@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import io
+import sys
+
+import pytest
+
+from multiaddr.exceptions import BinaryParseError
+from multiaddr.multiaddr import Multiaddr
+from multiaddr.packed import MultiaddrArray
+from multiaddr.stream import encode_frame
+from multiaddr.stream import FrameDecoder
+from multiaddr.stream import read_stream
+from multiaddr.stream import write_stream
+
+
+ADDRS = [
+    Multiaddr("/ip4/10.0.0.1/tcp/4001"),
+    Multiaddr("/ip6/::1/udp/4001/quic"),
+    Multiaddr("/dns4/example.com/tcp/443/wss"),
+    Multiaddr("/p2p/QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC"),
+    Multiaddr("/unix/tmp/p2p.sock"),
+]
+
+
+def test_write_read_roundtrip():
+    file = io.BytesIO()
+    written = write_stream(file, ADDRS)
+    assert written == len(file.getvalue())
+    assert file.getvalue() == MultiaddrArray(ADDRS).to_bytes()
+    assert file.getvalue() == b"".join(encode_frame(addr) for addr in ADDRS)
+
+    # Chunk boundaries falling within length prefixes and values
+    for chunk_size in (1, 2, 3, 7, 1024):
+        file.seek(0)
+        assert list(read_stream(file, chunk_size=chunk_size)) == ADDRS
+
+
+def test_read_components():
+    data = b"".join(encode_frame(addr) for addr in ADDRS)
+    result = list(read_stream(io.BytesIO(data), components=True, chunk_size=5))
+    assert [[proto.name for _, proto, _, _ in parts] for parts in result] == [
+        [proto.name for proto in addr.protocols()] for addr in ADDRS
+    ]
+
+
+def test_read_components_invalid():
+    data = encode_frame(b"\x04\x7f\x00")
+    with pytest.raises(BinaryParseError):
+        list(read_stream(io.BytesIO(data), components=True))
+
+
+def test_decoder_invalid_frame():
+    decoder = FrameDecoder(components=True)
+    with pytest.raises(BinaryParseError):
+        decoder.feed(encode_frame("/ip4/1.2.3.4") + b"\x02\x06\x00")
+    # The bad frame was dropped, the one before it is not lost
+    assert decoder.pending == 0
+    items = decoder.feed(b"")
+    assert [[proto.name for _, proto, _, _ in parts] for parts in items] == [["ip4"]]
+
+    # Decoding resumes with the frames following a bad one
+    with pytest.raises(BinaryParseError):
+        decoder.feed(b"\x02\x06\x00" + encode_frame("/tcp/1"))
+    assert len(decoder.feed(b"")) == 1
+    decoder.close()
+
+
+def test_decoder_invalid_length_prefix():
+    decoder = FrameDecoder()
+    with pytest.raises(BinaryParseError):
+        decoder.feed(encode_frame(ADDRS[0]) + b"\x80" * 10 + encode_frame(ADDRS[1]))
+    assert decoder.pending == 0
+    assert decoder.feed(b"") == [ADDRS[0]]
+    decoder.close()
+
+
+def test_read_stream_invalid_frame():
+    data = encode_frame(ADDRS[0]) + encode_frame(b"\x04\x7f\x00")
+    result = []
+    with pytest.raises(BinaryParseError):
+        for parts in read_stream(io.BytesIO(data), components=True):
+            result.append(parts)
+    assert len(result) == 1
+
+
+def test_decoder_incremental():
+    data = b"".join(encode_frame(addr) for addr in ADDRS)
+    decoder = FrameDecoder()
+    items = []
+    for idx in range(len(data)):
+        items.extend(decoder.feed(data[idx:idx + 1]))
+        assert decoder.pending <= len(encode_frame(ADDRS[3]))
+    decoder.close()
+    assert items == ADDRS
+
+
+@pytest.mark.parametrize("data", [
+    encode_frame(ADDRS[0])[:-1],
+    encode_frame(ADDRS[0]) + b"\x80",
+])
+def test_read_truncated(data):
+    with pytest.raises(BinaryParseError):
+        list(read_stream(io.BytesIO(data)))
+
+
+def test_read_max_size():
+    data = encode_frame(ADDRS[3])
+    with pytest.raises(BinaryParseError):
+        list(read_stream(io.BytesIO(data), max_size=16))
+    assert list(read_stream(io.BytesIO(data), max_size=None)) == ADDRS[3:4]
+
+    with pytest.raises(BinaryParseError):
+        FrameDecoder().feed(b"\xff" * 10)
+
+
+def test_socket():
+    socket = pytest.importorskip("socket")
+    left, right = socket.socketpair()
+    try:
+        write_stream(left, ADDRS)
+        left.close()
+        assert list(read_stream(right, chunk_size=4)) == ADDRS
+    finally:
+        right.close()
+
+
+def test_type_error():
+    with pytest.raises(TypeError):
+        list(read_stream(object()))
+    with pytest.raises(TypeError):
+        write_stream(object(), ADDRS)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 5), reason="requires async/await")
+def test_async_roundtrip():
+    import asyncio
+    from multiaddr.stream import read_stream_async
+    from multiaddr.stream import write_stream_async
+
+    class Writer(object):
+        def __init__(self):
+            self.data = bytearray()
+            self.drains = 0
+
+        def write(self, data):
+            self.data.extend(data)
+
+        def drain(self):
+            self.drains += 1
+            return asyncio.sleep(0)
+
+    class Reader(object):
+        def __init__(self, data):
+            self.file = io.BytesIO(data)
+
+        def read(self, size):
+            return asyncio.sleep(0, result=self.file.read(size))
+
+    loop = asyncio.new_event_loop()
+    try:
+        writer = Writer()
+        written = loop.run_until_complete(write_stream_async(writer, ADDRS))
+        assert written == len(writer.data)
+        assert writer.drains == 1
+
+        # The writer is drained once per chunk, not once per address
+        chunked = Writer()
+        frame_size = len(encode_frame(ADDRS[0]))
+        assert loop.run_until_complete(write_stream_async(
+            chunked, [ADDRS[0]] * 10, chunk_size=4 * frame_size,
+        )) == 10 * frame_size == len(chunked.data)
+        assert chunked.drains == 3
+        assert loop.run_until_complete(write_stream_async(chunked, [])) == 0
+        assert chunked.drains == 3
+
+        stream = read_stream_async(Reader(bytes(writer.data)), chunk_size=3)
+        result = []
+        while True:
+            try:
+                result.append(loop.run_until_complete(stream.__anext__()))
+            except StopAsyncIteration:  # NOQA: F821 (PY2)
+                break
+        assert result == ADDRS
+
+        # Items preceding an invalid frame are still returned before the error
+        data = encode_frame(ADDRS[0]) + encode_frame(b"\x04\x7f\x00")
+        stream = read_stream_async(Reader(data), components=True)
+        assert len(loop.run_until_complete(stream.__anext__())) == 2
+        with pytest.raises(BinaryParseError):
+            loop.run_until_complete(stream.__anext__())
+    finally:
+        loop.close()
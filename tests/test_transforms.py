@@ -1,5 +1,6 @@
 # -*- encoding: utf-8 -*-
 import io
+import timeit
 
 import pytest
 
@@ -8,39 +9,40 @@ from multiaddr.codecs import codec_by_name
 from multiaddr.exceptions import StringParseError
 from multiaddr.exceptions import BinaryParseError
 
+from multiaddr.transforms import ShapeEncoder
 from multiaddr.transforms import bytes_iter
 from multiaddr.transforms import bytes_to_string
 from multiaddr.transforms import size_for_addr
+from multiaddr.transforms import string_iter
 from multiaddr.transforms import string_to_bytes
 
 import multiaddr.protocols
-from multiaddr.protocols import _codes_to_protocols
-from multiaddr.protocols import _names_to_protocols
+from multiaddr.protocols import protocol_with_name
 from multiaddr.protocols import Protocol
 
 # These test values were generated by running them
 # through the go implementation of multiaddr.
 # https://github.com/multiformats/go-multiaddr
 ADDR_BYTES_MAP_STR_TEST_DATA = [
-    (_names_to_protocols['ip4'], b'\x0a\x0b\x0c\x0d', '10.11.12.13'),
-    (_names_to_protocols['ip6'],
+    (protocol_with_name('ip4'), b'\x0a\x0b\x0c\x0d', '10.11.12.13'),
+    (protocol_with_name('ip6'),
      b'\x1a\xa1\x2b\xb2\x3c\xc3\x4d\xd4\x5e\xe5\x6f\xf6\x7a\xb7\x8a\xc8',
      '1aa1:2bb2:3cc3:4dd4:5ee5:6ff6:7ab7:8ac8'),
-    (_names_to_protocols['tcp'], b'\xab\xcd', '43981'),
-    (_names_to_protocols['onion'],
+    (protocol_with_name('tcp'), b'\xab\xcd', '43981'),
+    (protocol_with_name('onion'),
      b'\x9a\x18\x08\x73\x06\x36\x90\x43\x09\x1f\x04\xd2',
      'timaq4ygg2iegci7:1234'),
-    (_names_to_protocols['p2p'],
+    (protocol_with_name('p2p'),
      b'\x12\x20\xd5\x2e\xbb\x89\xd8\x5b\x02\xa2\x84\x94\x82\x03\xa6\x2f\xf2'
      b'\x83\x89\xc5\x7c\x9f\x42\xbe\xec\x4e\xc2\x0d\xb7\x6a\x68\x91\x1c\x0b',
      'QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC'),
 
     # Additional test data
-    (_names_to_protocols['dns4'],
+    (protocol_with_name('dns4'),
      b'xn--4gbrim.xn----ymcbaaajlc6dj7bxne2c.xn--wgbh1c',
      # Explicitly mark this as unicode to force the text to be LTR in editors
      u'موقع.وزارة-الاتصالات.مصر'),
-    (_names_to_protocols['dns4'],
+    (protocol_with_name('dns4'),
      b'xn--fuball-cta.example',
      u'fußball.example'),  # This will fail if IDNA-2003/NamePrep is used
 ]
@@ -66,10 +68,10 @@ def test_size_for_addr(codec_name, buf, expected):
 @pytest.mark.parametrize("buf, expected", [
     # "/ip4/127.0.0.1/udp/1234/ip4/127.0.0.1/tcp/4321"
     (b'\x04\x7f\x00\x00\x01\x91\x02\x04\xd2\x04\x7f\x00\x00\x01\x06\x10\xe1',
-     [(_names_to_protocols["ip4"], b'\x7f\x00\x00\x01'),
-      (_names_to_protocols["udp"], b'\x04\xd2'),
-      (_names_to_protocols["ip4"], b'\x7f\x00\x00\x01'),
-      (_names_to_protocols["tcp"], b'\x10\xe1')]),
+     [(protocol_with_name("ip4"), b'\x7f\x00\x00\x01'),
+      (protocol_with_name("udp"), b'\x04\xd2'),
+      (protocol_with_name("ip4"), b'\x7f\x00\x00\x01'),
+      (protocol_with_name("tcp"), b'\x10\xe1')]),
 ])
 def test_bytes_iter(buf, expected):
     assert list((proto, val) for _, proto, _, val in bytes_iter(buf)) == expected
@@ -96,6 +98,56 @@ def test_bytes_to_string(string, buf):
     assert bytes_to_string(buf) == string
 
 
+@pytest.mark.parametrize("string, expected", [
+    ("/", []),
+    ("///", []),
+    ("/ip4/1.2.3.4///", [("ip4", "1.2.3.4")]),
+    ("/udp/1/quic/p2p-circuit", [("udp", "1"), ("quic", None), ("p2p-circuit", None)]),
+    ("/tcp/1/unix/a//b/", [("tcp", "1"), ("unix", "/a//b")]),
+    ("/ip6zone//ip6/::1", [("ip6zone", ""), ("ip6", "::1")]),
+])
+def test_string_iter(string, expected):
+    assert [(proto.name, value) for proto, _, value in string_iter(string)] == expected
+
+
+@pytest.mark.parametrize("string", ["//ip4/1.2.3.4", "/ip4/1.2.3.4//tcp/1"])
+def test_string_iter_empty_protocol(string):
+    with pytest.raises(StringParseError) as excinfo:
+        list(string_iter(string))
+    assert excinfo.value.protocol == ""
+
+
+class CountingRegistry(multiaddr.protocols.ProtocolRegistry):
+    """Registry counting the protocol lookups done while parsing."""
+    lookups = 0
+
+    def dispatch_with_name(self, name):
+        self.lookups += 1
+        return super(CountingRegistry, self).dispatch_with_name(name)
+
+
+# Long relay chains and paths made of many segments, processed in linear time
+@pytest.mark.parametrize("prefix, component, suffix, names", [
+    ("", "/p2p-circuit", "", 1),
+    ("", "/tcp/1", "", 1),
+    ("/unix", "/a", "", 0),
+    ("/unix", "/", "a", 0),
+])
+def test_string_to_bytes_scaling(prefix, component, suffix, names):
+    def measure(count):
+        # Passing a registry also bypasses the conversion cache
+        registry = CountingRegistry(multiaddr.protocols.REGISTRY.protocols)
+        string = prefix + component * count + suffix
+        string_to_bytes(string, registry)
+        # Every protocol name is looked up exactly once
+        assert registry.lookups == (1 if prefix else 0) + names * count
+        return min(timeit.repeat(lambda: string_to_bytes(string, registry), number=1, repeat=5))
+
+    # 16 times the segments may take up to 64 times as long (instead of about
+    # 256 times for quadratic behavior) to leave ample room for timing noise
+    assert measure(32000) < 64 * measure(2000)
+
+
 class DummyProtocol(Protocol):
     def __init__(self, code, name, codec=None):
         self.code = code
@@ -110,12 +162,10 @@ class UnparsableProtocol(DummyProtocol):
 
 @pytest.fixture
 def protocol_extension(monkeypatch):
-    # “Add” additional non-parsable protocol to protocols from code list
-    names_to_protocols = _names_to_protocols.copy()
-    codes_to_protocols = _codes_to_protocols.copy()
-    names_to_protocols["unparsable"] = codes_to_protocols[333] = UnparsableProtocol()
-    monkeypatch.setattr(multiaddr.protocols, "_names_to_protocols", names_to_protocols)
-    monkeypatch.setattr(multiaddr.protocols, "_codes_to_protocols", codes_to_protocols)
+    # Add additional non-parsable protocol to a copy of the global registry
+    registry = multiaddr.protocols.REGISTRY.copy()
+    registry.add(UnparsableProtocol())
+    monkeypatch.setattr(multiaddr.protocols, "REGISTRY", registry)
 
 
 @pytest.mark.parametrize("string", [
@@ -138,17 +188,21 @@ def test_bytes_to_string_value_error(protocol_extension, bytes):
 
 
 @pytest.mark.parametrize("proto, address", [
-    (_names_to_protocols['ip4'], '1124.2.3'),
-    (_names_to_protocols['ip6'], '123.123.123.123'),
-    (_names_to_protocols['tcp'], 'a'),
-    (_names_to_protocols['tcp'], '100000'),
-    (_names_to_protocols['onion'], '100000'),
-    (_names_to_protocols['onion'], '1234567890123456:0'),
-    (_names_to_protocols['onion'], 'timaq4ygg2iegci7:a'),
-    (_names_to_protocols['onion'], 'timaq4ygg2iegci7:0'),
-    (_names_to_protocols['onion'], 'timaq4ygg2iegci7:71234'),
-    (_names_to_protocols['p2p'], '15230d52ebb89d85b02a284948203a'),
-    (_names_to_protocols['ip6zone'], ""),
+    (protocol_with_name('ip4'), '1124.2.3'),
+    (protocol_with_name('ip6'), '123.123.123.123'),
+    (protocol_with_name('tcp'), 'a'),
+    (protocol_with_name('tcp'), '100000'),
+    (protocol_with_name('onion'), '100000'),
+    (protocol_with_name('onion'), '1234567890123456:0'),
+    (protocol_with_name('onion'), 'timaq4ygg2iegci7:a'),
+    (protocol_with_name('onion'), 'timaq4ygg2iegci7:0'),
+    (protocol_with_name('onion'), 'timaq4ygg2iegci7:71234'),
+    (protocol_with_name('p2p'), '15230d52ebb89d85b02a284948203a'),
+    (protocol_with_name('ip6zone'), ""),
+    (protocol_with_name('ipcidr'), '-1'),
+    (protocol_with_name('certhash'), 'zQmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNK'),
+    (protocol_with_name('certhash'), 'f12'),
+    (protocol_with_name('garlic64'), '-~-~'),
 ])
 def test_codec_to_bytes_value_error(proto, address):
     # Codecs themselves may raise any exception type – it will then be converted
@@ -158,11 +212,108 @@ def test_codec_to_bytes_value_error(proto, address):
 
 
 @pytest.mark.parametrize("proto, buf", [
-    (_names_to_protocols['tcp'], b'\xff\xff\xff\xff'),
-    (_names_to_protocols['ip6zone'], b""),
+    (protocol_with_name('tcp'), b'\xff\xff\xff\xff'),
+    (protocol_with_name('ip6zone'), b""),
+    (protocol_with_name('ipcidr'), b'\x00\x00'),
+    (protocol_with_name('certhash'), b'\x12\x20\x00'),
+    (protocol_with_name('garlic32'), b'\x00' * 33),
+    (protocol_with_name('garlic64'), b'\x00' * 385),
 ])
 def test_codec_to_string_value_error(proto, buf):
     # Codecs themselves may raise any exception type – it will then be converted
     # to `BinaryParseError` by a higher level
     with pytest.raises(Exception):
         codec_by_name(proto.codec).to_string(proto, buf)
+
+
+@pytest.mark.parametrize("buf", [
+    b'\x04\x7f\x00\x00',  # value shorter than the fixed codec size
+    b'\x35\x05ab',  # value shorter than its length prefix
+    b'\x91',  # protocol code varint never terminates
+    b'\x04\x7f\x00\x00\x01\x35',  # length prefix missing
+])
+def test_bytes_iter_truncated(buf):
+    with pytest.raises(BinaryParseError):
+        list(bytes_iter(buf))
+
+
+def test_bytes_iter_zero_copy():
+    buf = bytearray(b'\x04\x7f\x00\x00\x01\x06\x10\xe1')
+    parts = [part for _, _, _, part in bytes_iter(buf)]
+    assert all(isinstance(part, memoryview) for part in parts)
+    assert parts == [b'\x7f\x00\x00\x01', b'\x10\xe1']
+
+
+@pytest.fixture
+def conversion_cache():
+    multiaddr.transforms.set_cache_size(2)
+    yield
+    multiaddr.transforms.set_cache_size(None)
+
+
+def test_conversion_cache(conversion_cache):
+    string, buf = BYTES_MAP_STR_TEST_DATA[0]
+    assert string_to_bytes(string) == buf
+    assert string_to_bytes(string) == buf
+    assert bytes_to_string(buf) == string
+    assert bytes_to_string(bytearray(buf)) == string
+
+    string_info, bytes_info = multiaddr.transforms.cache_info()
+    assert (string_info.hits, string_info.misses) == (1, 1)
+    assert (bytes_info.hits, bytes_info.misses) == (1, 1)
+
+    # Failed conversions are not cached
+    with pytest.raises(StringParseError):
+        string_to_bytes("/ip4/1124.2.3")
+    assert multiaddr.transforms.cache_info()[0].size == 1
+
+    multiaddr.transforms.set_cache_size(None)
+    assert multiaddr.transforms.cache_info() is None
+
+
+@pytest.mark.parametrize("string", [
+    "/ip4/127.0.0.1/tcp/4321",
+    "/ip4/127.0.0.1/tcp/4321/",
+    "/ip4/127.0.0.1/udp/1234/utp",
+    "/ip6zone/eth0/ip6/::1/udp/1234",
+    "/p2p/QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC/unix/a/b",
+    "/",
+    "",
+    "ip4/127.0.0.1",
+    "/ip4/127.0.0.1/tcp/65536",
+    "/ip4//tcp/80",
+    "/ip4/127.0.0.1/foo/80",
+])
+def test_shape_encoder(string):
+    encoder = ShapeEncoder()
+    try:
+        expected = string_to_bytes(string)
+    except StringParseError as exc:
+        with pytest.raises(StringParseError) as excinfo:
+            encoder.encode(string)
+        assert str(excinfo.value) == str(exc)
+    else:
+        assert encoder.encode(string) == expected
+        assert encoder.encode(string) == expected  # now with the shape cached
+
+
+@pytest.mark.parametrize("proto, string", [
+    (protocol_with_name('ip4'), '0.0.0.0'),
+    (protocol_with_name('ip4'), '192.168.100.254'),
+    (protocol_with_name('ip6'), '::'),
+    (protocol_with_name('ip6'), '::1'),
+    (protocol_with_name('ip6'), 'fe80::1:0:0:1'),
+    (protocol_with_name('ip6'), '2001:db8:0:1:1:1:1:1'),
+    (protocol_with_name('ip6'), '::ffff:1.2.3.4'),
+    (protocol_with_name('ip6'), '0:0:0:0:0:0:0:1'),
+    (protocol_with_name('ip6'), 'ABCD:EF01::'),
+])
+def test_ip_codecs_match_netaddr(proto, string):
+    netaddr = pytest.importorskip("netaddr")
+    version = 4 if proto.name == 'ip4' else 6
+    expected = netaddr.IPAddress(string, version=version)
+
+    codec = codec_by_name(proto.codec)
+    buf = codec.to_bytes(proto, string)
+    assert buf == expected.packed
+    assert codec.to_string(proto, buf) == str(expected)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import pytest
+
+from multiaddr.multiaddr import Multiaddr
+from multiaddr.protocols import P_IP4
+from multiaddr.trie import MultiaddrTrie
+
+
+RELAY = "QmcgpsyWgH8Y8ajJz1Cu72KnS5uo2Aa2LpzU7kinSupNKC"
+PEER = "QmbHVEEepCi7rn7VL7Exxpd2Ci9NNB6ifvqwhsrbRMgQFP"
+
+ADDRS = [
+    "/ip4/10.0.0.1/tcp/4001",
+    "/ip4/10.0.0.1/tcp/4002",
+    "/ip4/10.0.0.2/tcp/4001",
+    "/ip4/192.168.0.1/tcp/4001",
+    "/ip4/10.0.0.1/udp/4001/quic",
+    "/ip4/10.0.0.1",
+    "/ip6/::1/tcp/4001/p2p/{0}/p2p-circuit/p2p/{1}".format(RELAY, PEER),
+    "/dns4/relay.example.com/tcp/443/wss/p2p/{0}/p2p-circuit".format(RELAY),
+    "/unix/tmp/p2p.sock",
+]
+
+
+@pytest.fixture
+def trie():
+    return MultiaddrTrie(Multiaddr(addr) for addr in ADDRS)
+
+
+def as_strings(addrs):
+    return sorted(str(addr) for addr in addrs)
+
+
+def test_set_semantics(trie):
+    assert len(trie) == len(ADDRS)
+    assert as_strings(trie) == sorted(ADDRS)
+    assert Multiaddr("/ip4/10.0.0.1/tcp/4001") in trie
+    assert Multiaddr("/ip4/10.0.0.1/tcp/4001/ws") not in trie
+    assert Multiaddr("/ip4/10.0.0.1/tcp/4003") not in trie
+
+    trie.add(Multiaddr("/ip4/10.0.0.1/tcp/4001"))
+    assert len(trie) == len(ADDRS)
+
+    trie.remove(Multiaddr("/ip4/10.0.0.1/tcp/4001"))
+    trie.discard(Multiaddr("/ip4/10.0.0.1/tcp/4001"))
+    trie.discard(Multiaddr("/ip4/10.0.0.3/tcp/4001"))
+    assert len(trie) == len(ADDRS) - 1
+    assert Multiaddr("/ip4/10.0.0.1/tcp/4001") not in trie
+    assert Multiaddr("/ip4/10.0.0.1/tcp/4002") in trie
+    with pytest.raises(KeyError):
+        trie.remove(Multiaddr("/ip4/10.0.0.1/tcp/4001"))
+
+    for addr in list(trie):
+        trie.remove(addr)
+    assert len(trie) == 0
+    assert not trie._root.children
+
+
+def test_strings(trie):
+    # Strings and binary representations are converted, just like for `add`
+    assert "/ip4/10.0.0.1/tcp/4001" in trie
+    assert Multiaddr("/ip4/10.0.0.1/tcp/4001").to_bytes() in trie
+    assert "/ip4/10.0.0.1/tcp/4003" not in trie
+    assert "not a multiaddr" not in trie
+    assert b"\x04\x7f" not in trie
+    assert 42 not in trie
+
+    trie.remove("/ip4/10.0.0.1/tcp/4001")
+    assert "/ip4/10.0.0.1/tcp/4001" not in trie
+    with pytest.raises(KeyError):
+        trie.remove("/ip4/10.0.0.1/tcp/4001")
+    trie.add("/ip4/10.0.0.1/tcp/4001")
+    assert Multiaddr("/ip4/10.0.0.1/tcp/4001") in trie
+
+
+def test_startswith(trie):
+    assert as_strings(trie.startswith("/ip4/10.0.0.1/tcp/4001")) == ["/ip4/10.0.0.1/tcp/4001"]
+    assert as_strings(trie.startswith(Multiaddr("/ip4/10.0.0.1"))) == [
+        "/ip4/10.0.0.1",
+        "/ip4/10.0.0.1/tcp/4001",
+        "/ip4/10.0.0.1/tcp/4002",
+        "/ip4/10.0.0.1/udp/4001/quic",
+    ]
+    assert list(trie.startswith("/ip4/10.0.0.3")) == []
+    assert len(list(trie.startswith(b""))) == len(ADDRS)
+
+
+def test_longest_prefix(trie):
+    assert str(trie.longest_prefix("/ip4/10.0.0.1/tcp/4001/ws")) == "/ip4/10.0.0.1/tcp/4001"
+    assert str(trie.longest_prefix("/ip4/10.0.0.1/tcp/5000")) == "/ip4/10.0.0.1"
+    assert trie.longest_prefix("/ip4/10.0.0.9/tcp/4001") is None
+
+
+def test_walk(trie):
+    private = list(trie.walk([(P_IP4, lambda raw: raw[0] == 10), "tcp"]))
+    assert as_strings(private) == [
+        "/ip4/10.0.0.1/tcp/4001",
+        "/ip4/10.0.0.1/tcp/4002",
+        "/ip4/10.0.0.2/tcp/4001",
+    ]
+    assert as_strings(trie.walk([("ip4", "10.0.0.1"), ("udp", None)])) == [
+        "/ip4/10.0.0.1/udp/4001/quic",
+    ]
+
+    via_relay = trie.walk(["*", "tcp", "*", ("p2p", RELAY), "p2p-circuit"])
+    assert as_strings(via_relay) == [ADDRS[7]]
+    via_relay = trie.walk(["*", "tcp", ("p2p", RELAY), "p2p-circuit"])
+    assert as_strings(via_relay) == [ADDRS[6]]
+    assert as_strings(trie.walk(["*", ("tcp", "443")])) == [ADDRS[7]]
+    assert list(trie.walk(["*", ("tcp", "443"), "ws"])) == []
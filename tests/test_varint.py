@@ -0,0 +1,82 @@
+# -*- encoding: utf-8 -*-
+import io
+
+import pytest
+
+from multiaddr import _varint
+from multiaddr import protocols
+from multiaddr.exceptions import BinaryParseError
+from multiaddr.multiaddr import Multiaddr
+
+
+VALUES = [0, 1, 0x7F, 0x80, 150, 0x3FFF, 0x4000, 0x706C61, 2 ** 32, 2 ** 56 - 1, 2 ** 63 - 1]
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_round_trip(value):
+    data = _varint.encode(value)
+    assert len(data) == max(1, (value.bit_length() + 6) // 7)
+    assert _varint.decode(bytearray(data)) == (value, len(data))
+    assert _varint.decode(bytearray(b"\xff" + data + b"\xff"), 1) == (value, len(data) + 1)
+    assert _varint.decode(memoryview(data)) == (value, len(data))
+
+    stream = io.BytesIO(data + b"\x01")
+    assert _varint.decode_stream(stream) == value
+    assert stream.tell() == len(data)
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_matches_reference(value):
+    varint = pytest.importorskip("varint")
+    assert _varint.encode(value) == varint.encode(value)
+
+
+@pytest.mark.parametrize("value", [-1, 2 ** 63])
+def test_encode_out_of_range(value):
+    with pytest.raises(ValueError):
+        _varint.encode(value)
+
+
+@pytest.mark.parametrize("data", [b"", b"\x80", b"\xff\xff"])
+def test_decode_truncated(data):
+    with pytest.raises(IndexError):
+        _varint.decode(bytearray(data))
+    with pytest.raises(EOFError):
+        _varint.decode_stream(io.BytesIO(data))
+
+
+@pytest.mark.parametrize("data", [
+    b"\x80\x00",            # overlong zero
+    b"\x81\x80\x00",        # overlong one
+    b"\xff" * 9 + b"\x01",  # more than 63 bits
+    b"\x80" * 9,            # more than 9 bytes, even if truncated
+])
+def test_decode_invalid(data):
+    with pytest.raises(ValueError):
+        _varint.decode(bytearray(data))
+    with pytest.raises(ValueError):
+        _varint.decode_stream(io.BytesIO(data))
+
+
+@pytest.mark.parametrize("data", [
+    b"\x80\x00",                     # overlong protocol code
+    b"\x90\x03\x80\x00",             # overlong value length
+    b"\x90\x03" + b"\xff" * 9 + b"\x01",
+])
+def test_invalid_varint_in_multiaddr(data):
+    with pytest.raises(BinaryParseError):
+        list(Multiaddr(data).protocols())
+
+
+def test_protocol_prefixes():
+    for proto in protocols.REGISTRY:
+        assert proto.vcode == _varint.encode(proto.code)
+        assert protocols.REGISTRY._snapshot.vcodes[proto.code] == proto.vcode
+
+    registry = protocols.ProtocolRegistry()
+    registry.add(protocols.Protocol(0x300001, "test-prefix", None))
+    assert registry._snapshot.vcodes[0x300001] == b"\x81\x80\xc0\x01"
+    assert registry.dispatch_with_code(0x300001).vcode == b"\x81\x80\xc0\x01"
+    with pytest.raises(ValueError):
+        registry.add(protocols.Protocol(-1, "test-negative", None))
+    assert len(registry) == 1
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Generate `multiaddr/_protocol_table.py` from the multicodec table.
+
+Usage: python tools/generate_protocol_table.py path/to/table.csv
+
+The table is available at
+https://github.com/multiformats/multicodec/blob/master/table.csv; only its
+``multiaddr`` rows are used. Every such protocol must be listed in `CODECS`
+below, so that protocols newly added to the table are never picked up
+without deciding how their values are encoded.
+"""
+from __future__ import print_function
+import csv
+import io
+import os
+import sys
+
+
+OUTPUT = os.path.join(os.path.dirname(__file__), os.pardir, "multiaddr", "_protocol_table.py")
+
+# Marks protocols whose values cannot be encoded by any of our codecs yet
+UNSUPPORTED = object()
+
+# Codec of each protocol (``None`` for protocols without a value)
+CODECS = {
+    "ip4": "ip4",
+    "tcp": "uint16be",
+    "dccp": "uint16be",
+    "ip6": "ip6",
+    "ip6zone": "utf8",
+    "ipcidr": "uint8",
+    "dns": "idna",
+    "dns4": "idna",
+    "dns6": "idna",
+    "dnsaddr": "idna",
+    "sctp": "uint16be",
+    "udp": "uint16be",
+    "p2p-webrtc-star": None,
+    "p2p-webrtc-direct": None,
+    "p2p-stardust": None,
+    "webrtc-direct": None,
+    "webrtc": None,
+    "p2p-circuit": None,
+    "udt": None,
+    "utp": None,
+    "unix": "fspath",
+    "thread": UNSUPPORTED,
+    "p2p": "p2p",
+    "https": None,
+    "onion": "onion",
+    "onion3": "onion3",
+    "garlic64": "garlic64",
+    "garlic32": "garlic32",
+    "tls": None,
+    "sni": "idna",
+    "noise": None,
+    "shs": UNSUPPORTED,
+    "quic": None,
+    "quic-v1": None,
+    "webtransport": None,
+    "certhash": "certhash",
+    "ws": None,
+    "wss": None,
+    "p2p-websocket-star": None,
+    "http": None,
+    "http-path": UNSUPPORTED,
+    "memory": UNSUPPORTED,
+    "silverpine": UNSUPPORTED,
+    "plaintextv2": None,
+    "scion": UNSUPPORTED,
+}
+
+
+HEADER = '''\
+# -*- coding: utf-8 -*-
+# Generated by tools/generate_protocol_table.py from the multicodec table,
+# do not edit manually.
+"""Built-in multiaddr protocols."""
+
+__all__ = (
+{names}
+)
+
+'''
+
+
+def read_protocols(path):
+    with io.open(path, newline="", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file, skipinitialspace=True))
+
+    protocols = []
+    unknown = []
+    for row in rows:
+        if row["tag"].strip() != "multiaddr":
+            continue
+        name = row["name"].strip()
+        if name not in CODECS:
+            unknown.append(name)
+        elif CODECS[name] is not UNSUPPORTED:
+            protocols.append((int(row["code"], 16), name, CODECS[name]))
+    if unknown:
+        raise SystemExit("No codec defined for protocol(s): " + ", ".join(unknown))
+    return sorted(protocols)
+
+
+def encode_varint(value):
+    buf = bytearray()
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+    return bytes(buf)
+
+
+def constant(name):
+    return "P_" + name.upper().replace("-", "_")
+
+
+def render(protocols):
+    names = [constant(name) for _, name, _ in protocols] + ["TABLE"]
+    lines = [HEADER.format(names="\n".join("    {0!r},".format(name) for name in names))]
+    for code, name, _ in protocols:
+        lines.append("{0} = 0x{1:04X}\n".format(constant(name), code))
+    lines.append("\n")
+    lines.append("#: ``(code, name, codec, vcode)`` of each protocol, ordered by code\n")
+    lines.append("TABLE = (\n")
+    for code, name, codec in protocols:
+        lines.append("    ({0}, {1!r}, {2!r}, {3!r}),\n".format(
+            constant(name), name, codec, encode_varint(code),
+        ))
+    lines.append(")\n")
+    return "".join(lines)
+
+
+def main(argv):
+    if len(argv) != 2:
+        raise SystemExit(__doc__)
+    with io.open(OUTPUT, "w", encoding="utf-8") as file:
+        file.write(render(read_protocols(argv[1])))
+
+
+if __name__ == "__main__":
+    main(sys.argv)